@@ -0,0 +1,114 @@
+# Parse time and memory of very long programs (100k statements by default).
+#
+#   python benchmarks/bench_ast.py [statements] [--baseline DIR]
+#
+# Parse time is the best of three. Every measurement runs in a fresh
+# interpreter so peak RSS is per tree.
+# --baseline points at another checkout (e.g. `git worktree add /tmp/old <rev>`)
+# to compare against; its uptparser.parse() is measured the same way.
+# "downstream" runs what every compile does after parsing (optimize, VM code
+# generation, a cache round trip) and reports the first error, if any.
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# one of these per statement, cycling
+STATEMENTS = (
+    's = s + (i * 3)',
+    'if (s > 1000): s = s - 1000',
+    'i = i + 1',
+    'while (i > 50): i = i - 50',
+    'print(i, s)',
+)
+
+MEASURE = r'''
+import gc, json, resource, sys, tempfile, time, tracemalloc
+source = open(sys.argv[1]).read()
+mode = sys.argv[2]
+import uptparser
+uptparser.parse('program warm; { print(1) }')
+result = {}
+if mode == 'time':
+    best = None
+    for _ in range(3):
+        ast = None
+        gc.collect()
+        start = time.perf_counter()
+        ast = uptparser.parse(source)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    result['parse_s'] = best
+    try:
+        import uptcache, uptopt, uptvm
+        ast1, _ = uptopt.optimize(ast, 1)
+        uptvm.compile_program(ast1)
+        cache = uptcache.CompileCache(tempfile.mkdtemp())
+        cache.put(source, {'ast': ast, 'symbols': {}})
+        assert cache.get(source)['ast'] == ast
+        result['downstream'] = 'ok'
+    except BaseException as e:
+        result['downstream'] = type(e).__name__ + ': ' + str(e)[:60]
+elif mode == 'mem':
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    ast = uptparser.parse(source)
+    after = tracemalloc.take_snapshot()
+    result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+    stats = after.compare_to(before, 'filename')
+    result['ast_bytes'] = sum(s.size_diff for s in stats)
+    result['ast_blocks'] = sum(s.count_diff for s in stats)
+else:
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    ast = uptparser.parse(source)
+    result['rss_kib'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+print(json.dumps(result))
+'''
+
+def program(n):
+    body = '; '.join(STATEMENTS[k % len(STATEMENTS)] for k in range(n))
+    return f'program big; var i: int; var s: int; {{ {body} }}'
+
+def measure(tree, path):
+    result = {}
+    for mode in ('time', 'mem', 'rss'):
+        proc = subprocess.run([sys.executable, '-c', MEASURE, path, mode], cwd=tree,
+                              capture_output=True, text=True)
+        if proc.returncode:
+            result[mode] = proc.stderr.strip().splitlines()[-1]
+            continue
+        result.update(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return result
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('statements', nargs='?', type=int, default=100000)
+    ap.add_argument('--baseline', help='checkout of an older tree to compare against')
+    args = ap.parse_args()
+
+    trees = [('current', ROOT)]
+    if args.baseline:
+        trees.insert(0, ('baseline', args.baseline))
+    with tempfile.NamedTemporaryFile('w', suffix='.upt', delete=False) as f:
+        f.write(program(args.statements))
+    try:
+        print(f"{args.statements} statements, {os.path.getsize(f.name) / 1024:.0f} KiB of source")
+        print(f"{'tree':<10} {'parse (s)':>9} {'AST MiB':>8} {'blocks':>9} {'peak MiB':>9} {'RSS MiB':>8}  downstream")
+        for name, tree in trees:
+            r = measure(tree, f.name)
+            if 'parse_s' not in r:
+                print(f"{name:<10} failed: {r.get('time')}")
+                continue
+            print(f"{name:<10} {r['parse_s']:>9.3f} {r['ast_bytes'] / 2**20:>8.1f} {r['ast_blocks']:>9} "
+                  f"{r['peak_bytes'] / 2**20:>9.1f} {r['rss_kib'] / 1024:>8.1f}  {r['downstream']}")
+    finally:
+        os.unlink(f.name)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+# Batch compilation throughput: one worker vs one per core.
+#
+#   python benchmarks/bench_batch.py [files]
+
+import os
+import sys
+import tempfile
+
+from common import FACT_ITER, FACT_REC, FIB, SQUARE_SUM
+
+import uptbatch
+
+SAMPLES = (FACT_REC, FIB, SQUARE_SUM, FACT_ITER)
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(n):
+            with open(os.path.join(tmp, f'p{i}.upt'), 'w') as f:
+                f.write(SAMPLES[i % len(SAMPLES)])
+        paths = uptbatch.find_sources([tmp])
+        for jobs in sorted({1, os.cpu_count() or 1}):
+            results, summary = uptbatch.compile_batch(paths, jobs)
+            assert summary['failed'] == 0, [r for r in results if not r['ok']][:1]
+            print(f"-j{jobs:<3} {summary['wall_seconds']:7.3f} s wall "
+                  f"{summary['files_per_second']:9.1f} files/s")
+
+if __name__ == '__main__':
+    main()
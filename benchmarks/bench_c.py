@@ -0,0 +1,109 @@
+# Native code from the C back end vs the python back ends, and differential
+# checks of its output against theirs.
+#
+#   python benchmarks/bench_c.py
+#
+# Every program in DIFFERENTIAL runs on the C back end, the transpiled
+# python module and the reference interpreter; their outputs, and runtime
+# errors, must agree. The timing table then compares the samples from
+# uptparser.py at sizes where the python paths take a while, including
+# building each executable into an empty cache and fetching it again.
+
+import io
+import shutil
+import tempfile
+import time
+
+from common import COUNT, SQUARE_SUM, FACT_ITER, FACT_REC, FIB, best_of, capture, parse
+
+import uptcgen
+import uptinterp
+import upttranspile
+
+# (name, source, inputs)
+DIFFERENTIAL = [
+    ('count', COUNT % 100, []),
+    ('count_for', 'program count_for; var i: int; for i = 1 to 10 : print(i)', []),
+    ('square_sum', SQUARE_SUM, [1000]),
+    ('fact_iter', FACT_ITER, [20]),
+    ('fact_rec', FACT_REC, [15]),
+    ('fib', FIB, [15]),
+    ('arithmetic', 'program ar; var a: int; var b: int; { a = read(); b = read(); '
+                   'print(a / b, a % b, (-a) / b, (-a) % b, a / (-b), a % (-b), a ** 3, -a ** 2) }', [17, 5]),
+    ('booleans', 'program bo; var t: bool; var n: int; { n = 3; t = (n > 2) and not (n == 4); '
+                 'print(t, not t, (n != 3) or t, true == t, n <= 3, n >= 4) }', []),
+    ('order', 'program ord; int function bump(k: int): { g = g + k; return g } var g: int; '
+              '{ g = 1; print(read() - read(), g + bump(10), g, bump(1) * g) }', [10, 3]),
+    ('short_circuit', 'program sc; bool function touch(k: int): { g = g + k; return true } var g: int; '
+                      '{ g = 0; if (g > 0) and touch(1): print(1); if (g == 0) or touch(2): print(2); '
+                      'if (g == 0) and touch(4): print(g) }', []),
+    ('assign_expr', 'program ae; var a: int; var b: int; { b = (a = 3) + (a = 4) * a; print(a, b) }', []),
+    ('for_break', 'program fb; var i: int; var s: int; { for i = 1 to 100 : { s = s + i; if s > 50: break }; '
+                  'print(i, s); for i = 5 to 1 : print(i); print(i) }', []),
+    ('void_and_return', 'program vr; void function show(a: int, b: bool): { print(a, b) } '
+                        'bool function even(k: int): { return (k % 2) == 0 } var n: int; '
+                        '{ n = 0; while n < 4: { show(n, even(n)); n = n + 1; if n == 3: return 0 }; print(99) }', []),
+    ('locals_shadow', 'program ls; int function f(x: int): { var y: int; y = x * 2; return y + z } var x: int; '
+                      '{ x = 5; z = 1; print(f(x), x, z) }', []),
+    ('division_by_zero', 'program dz; var a: int; { a = 0; print(1); print(5 / a) }', []),
+    ('negative_exponent', 'program ne; { print(2 ** (0 - 1)) }', []),
+    ('read_past_end', 'program rp; { print(read()) }', []),
+]
+
+# (name, source, inputs) timed on every back end
+# (the factorials overflow 64 bits past 20!, too soon to time)
+TIMED = [
+    ('count', COUNT % 200000, []),
+    ('square_sum', SQUARE_SUM, [2000000]),
+    ('fib', FIB, [28]),
+]
+
+def outcome(run, ast, inputs):
+    # (output, error message)
+    out = io.StringIO()
+    try:
+        run(ast, inputs, out)
+    except Exception as e:
+        return out.getvalue(), str(e)
+    return out.getvalue(), None
+
+def main():
+    directory = tempfile.mkdtemp(prefix='uptc-bench-c-')
+    cache = uptcgen.ExecutableCache(directory)
+    run_c = lambda ast, inputs, out: uptcgen.execute(ast, inputs, out, cache)
+    try:
+        for name, source, inputs in DIFFERENTIAL:
+            ast = parse(source)
+            assert ast is not None, f"{name} does not parse"
+            expected = outcome(upttranspile.execute, ast, inputs)
+            assert outcome(uptinterp.interpret, ast, inputs) == expected, f"{name}: python back ends differ"
+            got = outcome(run_c, ast, inputs)
+            assert got == expected, f"{name}: C back end gave {got}, python {expected}"
+        print(f"{len(DIFFERENTIAL)} differential programs agree")
+
+        # 64-bit overflow is an error, never a wrapped value
+        out, error = outcome(run_c, parse(FACT_ITER), [30])
+        assert error and 'overflow' in error, error
+
+        cache = uptcgen.ExecutableCache(tempfile.mkdtemp(dir=directory))
+        print(f"\n{'program':<12} {'build (s)':>10} {'cached (s)':>11} {'python (s)':>11} {'C (s)':>8} {'vs python':>10}")
+        for name, source, inputs in TIMED:
+            ast = parse(source)
+            start = time.perf_counter()
+            uptcgen.build(ast, cache)
+            t_build = time.perf_counter() - start
+            t_cached = best_of(lambda: uptcgen.build(ast, cache))
+            path = uptcgen.build(ast, cache)
+            module = upttranspile.compile_program(ast)
+            run_python = lambda a, i, o: module(i, o)
+            run_native = lambda a, i, o: uptcgen.run(path, i, o)
+            assert capture(run_native, ast, inputs) == capture(run_python, ast, inputs), name
+            t_python = best_of(lambda: capture(run_python, ast, inputs))
+            t_c = best_of(lambda: capture(run_native, ast, inputs))
+            print(f"{name:<12} {t_build:>10.3f} {t_cached:>11.4f} {t_python:>11.4f} {t_c:>8.4f} "
+                  f"{t_python / t_c:>9.1f}x")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# Parsing every file vs loading it from the compile cache.
+#
+#   python benchmarks/bench_cache.py [number of files]
+
+import shutil
+import sys
+import tempfile
+import time
+
+from common import FACT_REC, SQUARE_SUM
+
+import uptcache
+import uptparser
+
+def sources(n):
+    # distinct programs of realistic size: a few functions plus a main block
+    result = []
+    for i in range(n):
+        funcs = ''.join(
+            f'int function f{i}_{j}(x: int, y: int): {{ var t{j}: int; t{j} = x * {j}; '
+            f'while t{j} < y: {{ t{j} = t{j} + {i + 1}; if t{j} > 1000: break }}; return t{j} }} '
+            for j in range(5))
+        body = '; '.join(f'print(f{i}_{j}(read(), {j * 10}))' for j in range(5))
+        result.append(f'program p{i}; {funcs} var n: int; var s: int; {{ {body} }}')
+    return result
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    programs = sources(n) + [FACT_REC, SQUARE_SUM]
+    directory = tempfile.mkdtemp(prefix='uptc-bench-')
+    try:
+        start = time.perf_counter()
+        parsed = [uptparser.parse(s) for s in programs]
+        t_parse = time.perf_counter() - start
+
+        cache = uptcache.CompileCache(directory)
+        start = time.perf_counter()
+        for s in programs:
+            uptcache.cached_parse(s, cache)
+        t_fill = time.perf_counter() - start
+
+        cache = uptcache.CompileCache(directory)
+        start = time.perf_counter()
+        for s in programs:
+            uptcache.cached_parse(s, cache)
+        t_hit = time.perf_counter() - start
+        assert cache.hits == len(programs)
+        assert [uptcache.cached_parse(s, cache) for s in programs] == parsed, "cached ASTs differ"
+
+        size = cache.disk_usage()
+        print(f"files                 {len(programs)}")
+        print(f"parse every file      {t_parse * 1000:9.1f} ms")
+        print(f"parse + fill cache    {t_fill * 1000:9.1f} ms")
+        print(f"all cache hits        {t_hit * 1000:9.1f} ms  ({t_parse / t_hit:.0f}x faster)")
+        print(f"cache size            {size / 1024:9.1f} KiB")
+
+        # LRU eviction down to a quarter of the current size
+        cache = uptcache.CompileCache(directory, max_bytes=size // 4)
+        removed = cache.evict()
+        print(f"evicted to 1/4 limit  {removed} entries, {cache.disk_usage() / 1024:.1f} KiB left")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# Type checking expressions thousands of operators deep.
+#
+#   python benchmarks/bench_check.py
+#
+# "per reduction" re-checks the whole subtree of every BinOp, which is what
+# calling check_expr from p_Expr at each reduction amounted to: quadratic in
+# the length of an operator chain. "single pass" is uptcheck, which types
+# every node once. The run fails if the single pass time per operator grows
+# more than 2x from the shortest chain to the longest.
+
+import time
+
+from common import best_of, parse
+
+import uptcheck
+import uptscope
+
+def program(n):
+    ints = ' + '.join(['a * 2'] * (n // 2 + 1))
+    bools = ' and '.join(['(a < 3)'] * (n // 2 + 1))
+    return f'program deep; var a: int; var x: int; var b: bool; {{ x = {ints}; b = {bools} }}'
+
+def binops(ast):
+    stack = [cmd.expr for cmd in ast.main.cmds]
+    while stack:
+        e = stack.pop()
+        if isinstance(e, uptcheck.Node):
+            if e.tag == 'BinOp':
+                yield e
+            stack.extend(uptcheck._children(e))
+
+def per_reduction(ast, resolution):
+    scope = resolution.globals
+    for node in binops(ast):
+        uptcheck.TypeChecker(ast, resolution).expr(node, scope)
+
+def single_pass(ast, resolution):
+    uptcheck.TypeChecker(ast, resolution).check()
+
+def main():
+    print(f"{'operators':>9} {'per reduction (s)':>18} {'single pass (s)':>16} {'us/operator':>12}")
+    per_operator = []
+    for n in (1000, 2000, 4000, 8000, 16000):
+        ast = parse(program(n))
+        resolution = uptscope.resolve(ast)
+        operators = sum(1 for _ in binops(ast))
+        types = uptcheck.TypeChecker(ast, resolution).check()
+        assert len(types) >= operators
+        single = best_of(lambda: single_pass(ast, resolution))
+        if n <= 2000:
+            start = time.perf_counter()
+            per_reduction(ast, resolution)
+            rewalk = f"{time.perf_counter() - start:18.3f}"
+        else:
+            rewalk = f"{'(skipped)':>18}"
+        per_operator.append(single / operators)
+        print(f"{operators:>9} {rewalk} {single:16.4f} {single / operators * 1e6:12.2f}")
+    growth = per_operator[-1] / per_operator[0]
+    assert growth < 2, f"single pass time per operator grew {growth:.1f}x"
+    print(f"single pass time per operator grew {growth:.2f}x over 16x the operators")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+# The guarded lexer (uptguard) against the PLY lexer on hostile input:
+# lexing time by input size for each kind of garbage, and the limits.
+#
+#   python benchmarks/bench_guard.py [--max-kib 1024] [--ply-max-kib 64]
+#
+# First the differential check: on generated programs and on random strings
+# of the characters the rules care about, the guarded lexer must give PLY's
+# tokens, and its errors must cover exactly the characters PLY reports as
+# illegal (strings with an unterminated comment, which PLY lexes as '(' '*'
+# and goes on, must give PLY's tokens up to the '(*').
+#
+# Then every adversarial input is lexed at doubling sizes. The guarded
+# lexer's time per MiB must stay flat (at most 2x from the smallest size to
+# the largest); PLY's is shown up to --ply-max-kib, past which the
+# unterminated comments take it minutes.
+
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from common import FACT_REC, FIB, SQUARE_SUM, best_of
+
+from generate import SHAPES, shaped
+
+import uptlexer
+from uptcompiler import Compiler
+from uptguard import COMMENT, ILLEGAL, LIMIT, NUMBER, Limits, LexFailure, tokenize
+
+UNLIMITED = Limits(max_errors=None, max_bytes=None)
+
+def garbage(n):
+    # no '*': the first unclosed '(*' would end it
+    rng = random.Random(n)
+    return ''.join(rng.choice('()#!$@ \n\tab1_=<') for _ in range(n))
+
+# name -> source of about n characters
+ADVERSARIAL = {
+    'unclosed (*': lambda n: '(* x ' * (n // 5),
+    'illegal run': lambda n: '$' * n,
+    'illegal chars': lambda n: '$ ' * (n // 2),
+    'bad words': lambda n: '12abc _x ' * (n // 9),
+    'identifier': lambda n: 'a' * n,
+    'comments': lambda n: '(**)' * (n // 4),
+    'garbage': garbage,
+    'program': lambda n: (FACT_REC + '\n') * (n // (len(FACT_REC) + 1)),
+}
+
+ALPHABET = list('ab_1 9\t\n(*)#!=<>+-$@é١\r') + ['(*', '*)', 'if', 'int', '**', '!=']
+
+def ply_lex(source):
+    # tokens and the offsets of every illegal character
+    lexer = uptlexer.build_lexer()
+    illegal = []
+    def error(t):
+        illegal.append(t.lexpos)
+        t.lexer.skip(1)
+    lexer.lexerrorf = error
+    lexer.input(source)
+    return [(t.type, t.value, t.lineno, t.lexpos) for t in lexer], illegal
+
+def guarded_lex(source):
+    tokens, errors = tokenize(source, UNLIMITED)
+    illegal = [offset for e in errors if e.kind == ILLEGAL for offset in range(e.offset, e.offset + e.length)]
+    return [(t.type, t.value, t.lineno, t.lexpos) for t in tokens], illegal, errors
+
+def differential(rounds):
+    programs = [FACT_REC, FIB, SQUARE_SUM] + [shaped(name, 8, seed) for name in SHAPES for seed in range(3)]
+    for source in programs:
+        tokens, illegal, errors = guarded_lex(source)
+        assert not errors and (tokens, illegal) == ply_lex(source), f"tokens differ on {source[:40]!r}"
+    rng = random.Random(0)
+    unclosed = 0
+    for _ in range(rounds):
+        source = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 30)))
+        expected = ply_lex(source)
+        tokens, illegal, errors = guarded_lex(source)
+        comment = [e.offset for e in errors if e.kind == COMMENT]
+        if comment:
+            unclosed += 1
+            assert tokens == [t for t in expected[0] if t[3] < comment[0]], source
+            assert illegal == [i for i in expected[1] if i < comment[0]], source
+        else:
+            assert (tokens, illegal) == expected, source
+    print(f"differential: {len(programs)} programs, {rounds} random strings "
+          f"({unclosed} with an unterminated comment), same tokens and errors as PLY")
+
+def quiet(fn):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn()
+
+def scaling(max_kib, ply_max_kib):
+    sizes = []
+    kib = 16
+    while kib <= max_kib:
+        sizes.append(kib)
+        kib *= 2
+    print(f"{'input':<14} {'KiB':>6} {'guarded ms':>11} {'ms/MiB':>8} {'ply ms':>9} {'ms/MiB':>8}")
+    for name, make in ADVERSARIAL.items():
+        per_mib = []
+        for kib in sizes:
+            source = make(kib * 1024)
+            t = best_of(lambda: tokenize(source, UNLIMITED))
+            per_mib.append(t / (len(source) / 2**20))
+            ply = ''
+            if kib <= ply_max_kib:
+                lexer = uptlexer.build_lexer()
+                lexer.lexerrorf = lambda t: t.lexer.skip(1)
+                def run_ply():
+                    lexer.input(source)
+                    for _ in iter(lexer.token, None):
+                        pass
+                t_ply = best_of(run_ply, 1)
+                ply = f"{t_ply * 1e3:>9.1f} {t_ply / (len(source) / 2**20) * 1e3:>8.1f}"
+            print(f"{name:<14} {kib:>6} {t * 1e3:>11.1f} {per_mib[-1] * 1e3:>8.1f} {ply}")
+        growth = per_mib[-1] / per_mib[0]
+        assert growth < 2, f"{name}: time per MiB grew {growth:.2f}x from {sizes[0]} to {sizes[-1]} KiB"
+
+def limits():
+    # each limit stops lexing early, with one 'limit' error last
+    source = '$ ' * 2**20
+    start = time.perf_counter()
+    tokens, errors = tokenize(source, Limits(max_errors=100))
+    t = time.perf_counter() - start
+    assert len(errors) == 101 and errors[-1].kind == LIMIT, errors[-3:]
+    print(f"max_errors=100 on 1M illegal characters: stopped at offset {errors[-1].offset} in {t * 1e3:.2f} ms")
+
+    tokens, errors = tokenize(b'x' * (2**20 + 1), Limits(max_bytes=2**20))
+    assert not tokens and [e.kind for e in errors] == [LIMIT]
+
+    start = time.perf_counter()
+    tokens, errors = tokenize('a + ' * 2**20, Limits(seconds=0.05))
+    t = time.perf_counter() - start
+    assert errors[-1].kind == LIMIT and t < 0.5, (errors, t)
+    print(f"seconds=0.05 on 4 MiB of tokens: stopped after {len(tokens)} tokens in {t * 1e3:.0f} ms")
+
+    tokens, errors = tokenize('1' * 10**6)
+    assert [e.kind for e in errors] == [NUMBER] and not tokens
+
+    # a megabyte identifier goes all the way through the parser
+    name = 'a' * 2**20
+    compiler = Compiler(scanner='guarded')
+    ast = compiler.parse(f"program p; var {name}: int; {{ {name} = 1; print({name}) }}")
+    assert ast.global_vars[0].name == name
+    # garbage never reaches the parser
+    try:
+        quiet(lambda: compiler.parse('program p; { print(1) } $$$ (* '))
+    except LexFailure as e:
+        assert [err.kind for err in e.errors] == [ILLEGAL, COMMENT], e.errors
+        print(f"LexFailure: {e}")
+    else:
+        raise AssertionError("garbage parsed")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--max-kib', type=int, default=1024, help='largest adversarial input')
+    ap.add_argument('--ply-max-kib', type=int, default=64, help='largest input lexed with PLY too')
+    ap.add_argument('--rounds', type=int, default=20000, help='random strings in the differential check')
+    args = ap.parse_args()
+    differential(args.rounds)
+    limits()
+    scaling(args.max_kib, args.ply_max_kib)
+
+if __name__ == '__main__':
+    main()
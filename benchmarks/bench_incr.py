@@ -0,0 +1,65 @@
+# Incremental reparsing: the time from an edit inside one function to the
+# updated AST, against parsing the whole file again.
+#
+#   python benchmarks/bench_incr.py
+#
+# Programs from the 'functions' shape of generate.py grow 64x; each edit
+# changes an int literal in function f12 and the next one puts it back.
+# The generator writes functions in order from one seed, so f12 is the same
+# text in every file, the middle one of the smallest. A reparse confined to
+# one function costs the same whatever the size of the file, so the run
+# fails if the edit latency grows more than 2x from the smallest file to the
+# largest.
+
+from common import best_of, parse
+
+from generate import shaped
+
+from uptincr import Document
+
+def literal_in(doc, index):
+    # the offset and text of an int literal in region index
+    _, start, end = doc.region(index)
+    lexer = doc._lexer
+    lexer.input(doc.text)
+    lexer.lexpos = start
+    for tok in iter(lexer.token, None):
+        if tok.lexpos >= end:
+            break
+        if tok.type == 'INT':
+            return tok.lexpos, str(tok.value)
+    raise Exception("no literal in the region")
+
+def main():
+    print(f"{'functions':>9} {'KiB':>7} {'full parse (ms)':>16} {'edit (ms)':>10} {'speedup':>8}")
+    latencies = []
+    for n in (25, 100, 400, 1600):
+        source = shaped('functions', n)
+        doc = Document(source)
+        index = 1 + 12     # regions: the header, then one per function
+        assert doc.kinds[index] == 'function'
+        offset, literal = literal_in(doc, index)
+        changed = str(int(literal) + 1)
+        # the edited tree is the tree of the edited text
+        doc.edit(offset, offset + len(literal), changed)
+        assert doc.ast == parse(source[:offset] + changed + source[offset + len(literal):])
+        doc.edit(offset, offset + len(changed), literal)
+        assert doc.text == source and doc.ast == parse(source)
+        before = dict(doc.reparsed)
+
+        def edits():
+            for _ in range(10):
+                doc.edit(offset, offset + len(literal), changed)
+                doc.edit(offset, offset + len(changed), literal)
+        t_edit = best_of(edits, 5) / 20
+        assert doc.reparsed['full'] == before['full'], "an edit fell back to a full parse"
+        t_full = best_of(lambda: parse(source))
+        latencies.append(t_edit)
+        print(f"{n:>9} {len(source) / 1024:>7.0f} {t_full * 1e3:>16.2f} {t_edit * 1e3:>10.3f} "
+              f"{t_full / t_edit:>7.0f}x")
+    growth = latencies[-1] / latencies[0]
+    assert growth < 2, f"edit latency grew {growth:.1f}x"
+    print(f"edit latency grew {growth:.2f}x over 64x the functions")
+
+if __name__ == '__main__':
+    main()
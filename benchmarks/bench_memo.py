@@ -0,0 +1,158 @@
+# Memoized calls to pure functions (uptpure) against plain calls, on naive
+# recursive programs that call themselves with the same arguments over and
+# over.
+#
+#   python benchmarks/bench_memo.py [--max-plain 24] [--max-memo 4000]
+#
+# First the checks: the purity analysis must find exactly the pure
+# functions of a program mixing pure ones with every kind of impure one
+# (print, read(), a global read or written, a call to an impure function,
+# recursion through one), impure functions must get no memo and print,
+# read and write as often with memoization as without, on every back end,
+# and a failing call must store nothing. Then fib and binomial coefficients
+# (Pascal's rule) run at growing n, plain and memoized: plain calls grow as
+# fib(n) itself (~1.6x per step), memoized ones as n (fib) or n*k (choose).
+
+import argparse
+import io
+
+from common import FIB, best_of, parse
+
+import upttranspile
+import uptinterp
+import uptvm
+from uptcheck import TypeChecker
+from uptpure import MemoTable, format_stats, pure_functions
+
+CHOOSE = ('program choose; int function choose(n: int, k: int): { '
+          'if (k == 0) or (k == n): return 1; return choose(n - 1, k - 1) + choose(n - 1, k) } '
+          'var n: int; { n = read(); print(choose(n, n / 2)) }')
+
+MIXED = '''program mixed;
+int function fib(k: int): { if k < 2: return k; return fib(k - 1) + fib(k - 2) }
+int function fact(x: int): { var p: int; p = 1; while x > 1: { p = p * x; x = x - 1 }; return p }
+bool function even(n: int): { if n <= 0: return true; return not even(n - 1) }
+int function twice(x: int): { return fib(x) + fact(x) }
+int function shout(x: int): { print(x); return x + 1 }
+int function next(x: int): { return x + read() }
+int function bump(x: int): { count = count + 1; return x + 1 }
+int function scaled(x: int): { return x * count }
+int function loud(x: int): { return shout(x) + fib(x) }
+bool function ping(n: int): { if n <= 0: return true; return ping(n - 1) and (shout(n) > 0) }
+var count: int;
+{
+  print(fib(10), fib(10), fact(5), fact(5), even(7), even(7), twice(6), twice(6));
+  print(shout(1), shout(1), next(1), next(1));
+  print(bump(1), bump(1), count, scaled(2), scaled(2));
+  count = 5;
+  print(scaled(2), loud(3), loud(3), ping(3), ping(3))
+}'''
+
+MIXED_PURE = {'fib', 'fact', 'even', 'twice'}
+
+FAILING = ('program failing; int function inv(x: int): { return 100 / x } '
+           '{ print(inv(read())) }')
+
+BACKENDS = {
+    'vm': uptvm.execute,
+    'python': upttranspile.execute,
+    'interp': uptinterp.interpret,
+}
+
+def run(execute, ast, inputs, memo=None):
+    out = io.StringIO()
+    execute(ast, inputs, out, memo)
+    return out.getvalue()
+
+def checks():
+    ast = parse(MIXED)
+    TypeChecker(ast).check()
+    pure = pure_functions(ast)
+    assert pure == MIXED_PURE, sorted(pure)
+    for name, execute in BACKENDS.items():
+        for entries in (1, 2, 4096):
+            memo = MemoTable(ast, entries)
+            expected = run(execute, ast, [10, 20, 30, 40])
+            assert run(execute, ast, [10, 20, 30, 40], memo) == expected, (name, entries)
+            # impure functions have no memo: nothing to look up or store
+            stats = memo.stats()
+            assert set(stats) == MIXED_PURE, sorted(stats)
+            assert stats['fib']['hits'] > 0 and stats['fact']['hits'] > 0 and stats['twice']['hits'] > 0
+            if entries == 1:
+                assert stats['fib']['evictions'] > 0
+    print(f"purity: {', '.join(sorted(pure))} pure; "
+          f"{', '.join(sorted(f.name for f in ast.funcs if f.name not in pure))} never memoized; "
+          f"same output with and without memoization on {', '.join(BACKENDS)}")
+    print(format_stats(memo))
+
+    # a call that fails stores nothing, and fails again
+    ast = parse(FAILING)
+    for name, execute in BACKENDS.items():
+        memo = MemoTable(ast)
+        for _ in range(2):
+            try:
+                run(execute, ast, [0], memo)
+            except Exception as e:
+                assert 'zero' in str(e).lower(), e
+            else:
+                raise AssertionError(f"{name}: inv(0) did not fail")
+        assert memo.stats()['inv'] == {'hits': 0, 'misses': 2, 'entries': 0, 'evictions': 0}, memo.stats()
+        assert run(execute, ast, [4], memo) == run(execute, ast, [4]) == '25\n'
+
+def sizes(start, stop, step):
+    n = start
+    while n <= stop:
+        yield n
+        n += step
+
+def scaling(name, source, plain_sizes, memo_sizes):
+    ast = parse(source)
+    TypeChecker(ast).check()
+    program = uptvm.compile_program(ast)
+    print(f"\n{name} on the VM")
+    print(f"{'n':>6} {'plain (s)':>10} {'memo (s)':>10} {'speedup':>9} {'memo misses':>12} {'memo hits':>10}")
+    plain_times = []
+    memo_times = []
+    for n in sorted(set(plain_sizes) | set(memo_sizes)):
+        expected = None
+        t_plain = None
+        if n in plain_sizes:
+            out = io.StringIO()
+            t_plain = best_of(lambda: uptvm.run(program, [n], io.StringIO()), 1)
+            uptvm.run(program, [n], out)
+            expected = out.getvalue()
+            plain_times.append(t_plain)
+        # a new table per run, or every run after the first is one hit
+        memo = MemoTable(ast)
+        out = io.StringIO()
+        uptvm.run(program, [n], out, memo)
+        if expected is not None:
+            assert out.getvalue() == expected, f"{name}({n}): memoized output differs"
+        t_memo = best_of(lambda: uptvm.run(program, [n], io.StringIO(), MemoTable(ast)))
+        if n in memo_sizes:
+            memo_times.append((n, t_memo))
+        stats = memo.stats()[name]
+        speedup = f"{t_plain / t_memo:>8.0f}x" if t_plain else f"{'':>9}"
+        plain = f"{t_plain:>10.4f}" if t_plain else f"{'':>10}"
+        print(f"{n:>6} {plain} {t_memo:>10.4f} {speedup} {stats['misses']:>12} {stats['hits']:>10}")
+    return plain_times, memo_times
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--max-plain', type=int, default=24, help='largest fib(n) run without memoization')
+    ap.add_argument('--max-memo', type=int, default=4000, help='largest fib(n) run memoized')
+    args = ap.parse_args()
+    checks()
+
+    plain_sizes = list(sizes(args.max_plain - 8, args.max_plain, 2))
+    memo_sizes = [args.max_memo // 4, args.max_memo // 2, args.max_memo]
+    plain, memo = scaling('fib', FIB, plain_sizes, memo_sizes)
+    # 8 more levels of naive fib make ~47x the calls
+    assert plain[-1] / plain[0] > 10, f"plain fib grew only {plain[-1] / plain[0]:.1f}x"
+    # memoized, 4x n is 4x the calls (and some for bigger ints)
+    (n0, t0), (n1, t1) = memo[0], memo[-1]
+    assert t1 / t0 < 3 * n1 / n0, f"memoized fib grew {t1 / t0:.1f}x from n={n0} to n={n1}"
+    scaling('choose', CHOOSE, list(sizes(12, 20, 2)), [50, 100, 200])
+
+if __name__ == '__main__':
+    main()
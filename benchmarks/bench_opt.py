@@ -0,0 +1,48 @@
+# Run time of -O0 vs -O1 vs -O2 ASTs on the VM and the python back end.
+#
+#   python benchmarks/bench_opt.py
+
+from common import SQUARE_SUM, FIB, parse, best_of, capture
+
+import uptopt
+import upttranspile
+import uptvm
+
+# loops with invariant subexpressions, constant arithmetic and x ** 2
+POLY = ('program poly; var i: int; var k: int; var s: int; '
+        '{ k = read(); i = 0; while i < %d : '
+        '{ s = s + ((k * (60 * 60)) + (i ** 2)); if (false and (i > 3)) : print(i); i = i + 1 }; print(s) }')
+
+NESTED = ('program nested; int function grid(n: int): { var r: int; var c: int; var t: int; '
+          'for r = 1 to n : for c = 1 to n : t = t + ((n * n) - (r * 0)) + (c ** 2); return t } '
+          '{ print(grid(read())) }')
+
+CASES = [
+    ('poly', POLY % 100000, [7]),
+    ('nested', NESTED, [250]),
+    ('square_sum', SQUARE_SUM, [100000]),
+    ('fib', FIB, [20]),
+]
+
+def main():
+    print(f"{'program':<12} {'level':>5} {'changes':>8} {'opt (ms)':>9} {'vm (s)':>9} {'python (s)':>11}")
+    for name, source, inputs in CASES:
+        ast = parse(source)
+        expected = None
+        for level in sorted(uptopt.LEVELS):
+            opt, report = uptopt.optimize(ast, level)
+            program = uptvm.compile_program(opt)
+            module = upttranspile.compile_program(opt)
+            run_vm = lambda a, i, o: uptvm.run(program, i, o)
+            run_python = lambda a, i, o: module(i, o)
+            output = capture(run_vm, opt, inputs)
+            expected = expected or output
+            assert output == expected == capture(run_python, opt, inputs), f"{name}: -O{level} changed the output"
+            t_vm = best_of(lambda: capture(run_vm, opt, inputs))
+            t_python = best_of(lambda: capture(run_python, opt, inputs))
+            changes = sum(r.changes for r in report)
+            seconds = sum(r.seconds for r in report)
+            print(f"{name:<12} {'-O%d' % level:>5} {changes:>8} {seconds * 1000:>9.3f} {t_vm:>9.4f} {t_python:>11.4f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# Parsing one file of thousands of functions across processes (uptparallel)
+# against the serial parse, by number of worker processes.
+#
+#   python benchmarks/bench_parallel.py [--functions 10000] [--jobs 1,2,4,8]
+#
+# The program comes from the 'functions' shape of generate.py. Every
+# parallel parse must give the serial AST. The speedup is bounded by the
+# cores: jobs past os.cpu_count() only add processes taking turns, and the
+# header scan, pickling the chunks' trees back and the pool start up stay
+# serial (the scan column).
+
+import argparse
+import os
+import time
+
+from common import parse
+
+from generate import shaped
+
+import uptparallel
+from uptcompiler import Compiler
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def main():
+    cores = os.cpu_count() or 1
+    default = sorted({2, cores} | {2 ** k for k in range(cores.bit_length())})
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--functions', type=int, default=10000)
+    ap.add_argument('--jobs', default=','.join(map(str, default)), help='comma separated')
+    args = ap.parse_args()
+    jobs = [int(j) for j in args.jobs.split(',') if j]
+
+    source = shaped('functions', args.functions)
+    t_scan, functions = timed(lambda: uptparallel.scan_functions(source))
+    assert len(functions) == args.functions
+    print(f"{args.functions} functions, {len(source) / 2**20:.1f} MiB, {cores} cores, "
+          f"header scan {t_scan * 1e3:.0f} ms")
+    t_serial, expected = timed(lambda: parse(source))
+    print(f"{'jobs':>6} {'parse (s)':>10} {'speedup':>8}")
+    print(f"{'serial':>6} {t_serial:>10.2f} {1:>7.2f}x")
+    for j in jobs:
+        if j == 1:
+            continue
+        compiler = Compiler(jobs=j)
+        t, ast = timed(lambda: compiler.parse(source))
+        assert ast == expected, f"jobs={j}: the parallel parse differs from the serial one"
+        print(f"{j:>6} {t:>10.2f} {t_serial / t:>7.2f}x" + ('  (more jobs than cores)' if j > cores else ''))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# What compile-time profiling costs, on and off.
+#
+#   python benchmarks/bench_profile.py [number of functions]
+#
+# "bare" runs the phases by hand, without a Compiler; "profile off" is
+# Compiler.compile() without a Profile, which has to stay within noise of
+# bare (the run fails if it is more than 10% slower). "profile on" and
+# "profile on, memory" show what counting every production and lexer rule,
+# and tracing allocations, add.
+
+import copy
+import sys
+
+from common import best_of
+
+import uptopt
+import uptvm
+from uptcheck import TypeChecker
+from uptcompiler import Compiler
+from uptlexer import get_lexer
+from uptparser import get_parser
+from uptprofile import Profile
+
+def program(n):
+    funcs = ''.join(
+        f'int function f{j}(x: int, y: int): {{ var t: int; (* step {j} *) t = x * {j % 7 + 1}; '
+        f'while t < y: {{ t = t + (x - 1) * 2; if t > 1000: break }}; return t }} '
+        for j in range(n))
+    body = '; '.join(f'print(f{j}(n, {j * 10}))' for j in range(n))
+    return f'program many; {funcs} var n: int; {{ n = read(); {body} }}'
+
+def bare(source):
+    parser = copy.copy(get_parser())
+    parser.symtab = Compiler().symtab
+    ast = parser.parse(source, lexer=get_lexer().clone())
+    TypeChecker(ast, source=source).check()
+    ast, _ = uptopt.optimize(ast, 1)
+    return uptvm.compile_program(ast)
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    source = program(n)
+
+    off = Compiler().compile(source)
+    profile = Profile()
+    on = Compiler(profile=profile).compile(source)
+    assert off.ok and on.ok, (off.error, on.error)
+    assert off.ast == on.ast
+    report = profile.as_dict()
+    assert report['productions']['p_Function']['calls'] == n
+    assert report['lexer_rules']['t_ignore_COMMENT']['calls'] == n
+    assert report['token_types']['FUNCTION'] == n
+
+    cases = [
+        ('bare', lambda: bare(source)),
+        ('profile off', lambda: Compiler().compile(source)),
+        ('profile on', lambda: Compiler(profile=Profile()).compile(source)),
+        ('profile on, memory', lambda: Compiler(profile=Profile(memory=True)).compile(source)),
+    ]
+    times = {name: best_of(fn, 5) for name, fn in cases}
+    print(f"{n} functions, {report['tokens']} tokens")
+    print(f"{'':<20} {'s':>7} {'vs bare':>8}")
+    for name, _ in cases:
+        print(f"{name:<20} {times[name]:7.3f} {times[name] / times['bare']:8.2f}")
+    overhead = times['profile off'] / times['bare']
+    assert overhead < 1.1, f"compiling without a profile is {overhead:.2f}x bare"
+
+    print(f"\n{'phase':<12} {'s':>8}")
+    for name, seconds in report['totals'].items():
+        print(f"{name:<12} {seconds:8.4f}")
+    print(f"\n{'production':<20} {'calls':>7} {'s':>8}")
+    for name, stats in list(report['productions'].items())[:8]:
+        print(f"{name:<20} {stats['calls']:>7} {stats['seconds']:8.4f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+# Tokens per second: PLY lexer vs the bulk scanner (uptscan), on a
+# multi-megabyte source, after checking that both produce the same tokens.
+#
+#   python benchmarks/bench_scan.py [megabytes]
+#
+# The differential check compares (type, value, lineno, lexpos) of every
+# token and the error messages printed, on the large input and on a few
+# inputs that exercise the odd corners of the rules. The same inputs scanned
+# as bytes, like a mapped file (uptsource), must give the same tokens by
+# offset, and the line index the same line and column as counting newlines
+# in the text.
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from common import FACT_REC, FIB, SQUARE_SUM, best_of
+
+import uptlexer
+import uptscan
+from uptcompiler import Compiler, SCANNERS
+from uptsource import LineIndex, SourceFile
+
+CORNERS = [
+    '',
+    'x\t\t y  ',
+    '12abc 3x y4 _z a_b 007',
+    'a**b***c == = != ! <= >= < > <==>',
+    '# comment to end of line\nx (* a\nmultiline comment *) y (* unterminated',
+    '\n\n\r\n @ $ \\ 99999999999999999999999999 9223372036854775807',
+    'if else while for to true false break print read return and or not var int bool void',
+]
+
+def ply_tokens(source):
+    lexer = uptlexer.build_lexer()
+    lexer.input(source)
+    return [(t.type, t.value, t.lineno, t.lexpos) for t in lexer]
+
+def fast_tokens(source):
+    stream = uptscan.TokenStream()
+    stream.input(source)
+    return [(t.type, t.value, t.lineno, t.lexpos) for t in stream]
+
+def printed(fn, source):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        result = fn(source)
+    return result, out.getvalue()
+
+def differential(sources):
+    for source in sources:
+        expected = printed(ply_tokens, source)
+        actual = printed(fast_tokens, source)
+        assert actual == expected, f"token streams differ on {source[:40]!r}"
+
+        # offsets only: lineno is 0, positions come from the line index
+        tokens, errors = printed(fast_tokens, source.encode())
+        assert errors == expected[1], f"errors differ on mapped {source[:40]!r}"
+        assert [t[:2] + t[3:] for t in tokens] == [t[:2] + t[3:] for t in expected[0]]
+        index = LineIndex(source.encode())
+        for _, _, _, lexpos in expected[0][::997]:
+            # the real line: PLY's lineno does not count newlines in (* *)
+            line = source.count('\n', 0, lexpos) + 1
+            column = lexpos - source.rfind('\n', 0, lexpos)
+            assert index.position(lexpos) == (line, column), (lexpos, index.position(lexpos))
+
+def peak_mib(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2**20
+
+def big_source(megabytes):
+    chunk = '\n'.join([FACT_REC, '# a comment line', FIB, '(* block\ncomment *)', SQUARE_SUM]) + '\n'
+    return chunk * (megabytes * 2**20 // len(chunk) + 1)
+
+def main():
+    megabytes = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    source = big_source(megabytes)
+    differential(CORNERS + [source])
+    ntokens = len(uptscan.scan(source))
+    print(f"{len(source) / 2**20:.1f} MiB, {ntokens} tokens, token streams identical")
+
+    lexer = uptlexer.build_lexer()
+    def run_ply():
+        lexer.input(source)
+        for _ in iter(lexer.token, None):
+            pass
+    def run_stream():
+        stream = uptscan.TokenStream()
+        stream.input(source)
+        for _ in iter(stream.token, None):
+            pass
+    with tempfile.NamedTemporaryFile('w', suffix='.upt', delete=False) as f:
+        f.write(source)
+    def run_read():
+        with open(f.name) as src:
+            uptscan.scan(src.read())
+    def run_mapped():
+        with SourceFile(f.name) as src:
+            uptscan.scan(src.data, None)
+    cases = [
+        ('ply lexer', run_ply),
+        ('scan (arrays only)', lambda: uptscan.scan(source)),
+        ('scan + TokenStream', run_stream),
+        ('read() + scan', run_read),
+        ('mapped file scan', run_mapped),
+    ]
+    try:
+        base = None
+        for name, fn in cases:
+            t = best_of(fn)
+            base = base or t
+            print(f"{name:<20} {t:7.3f} s {ntokens / t / 1e6:7.2f} M tokens/s {base / t:6.2f}x")
+        print(f"peak memory: read() + scan {peak_mib(run_read):.1f} MiB, "
+              f"mapped file scan {peak_mib(run_mapped):.1f} MiB")
+    finally:
+        os.unlink(f.name)
+
+    # end to end parse of one large program, where the parser dominates
+    program = 'program big; var i: int; { ' + '; '.join(['i = i + (2 * 3)'] * 20000) + ' }'
+    for scanner in SCANNERS:
+        compiler = Compiler(scanner=scanner)
+        t = best_of(lambda: compiler.parse(program))
+        print(f"parse 20k statements, {scanner:<4} scanner {t:7.3f} s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# Name lookups by string vs resolved (depth, slot) indexing, and the cost of
+# building the scoped symbol table for programs with thousands of functions
+# and variables.
+#
+#   python benchmarks/bench_scope.py
+#
+# The scaling check parses and resolves programs of n, 2n, 4n and 8n
+# functions (each with parameters, locals and uses of globals) and fails if
+# the time per function grows more than 2x from the smallest to the largest,
+# which linear work stays well under and quadratic work would not.
+
+import time
+
+from common import FACT_REC, best_of, capture, parse
+
+import uptscope
+import uptvm
+
+LOCALS = 8
+
+def program(nfuncs):
+    funcs = []
+    for k in range(nfuncs):
+        decls = ' '.join(f'var v{j}: int;' for j in range(LOCALS))
+        uses = '; '.join(f'v{j} = v{j - 1} + a * g{k % 50}' for j in range(1, LOCALS))
+        call = f'; v0 = f{k - 1}(v1, b)' if k else ''
+        funcs.append(f'int function f{k}(a: int, b: int): {{ {decls} v0 = a{call}; {uses}; return v{LOCALS - 1} }}')
+    globals_ = ' '.join(f'var g{k}: int;' for k in range(50))
+    return f"program many; {' '.join(funcs)} {globals_} {{ g1 = 2; print(f{nfuncs - 1}(1, 2)) }}"
+
+def lookups():
+    # the same 1M reads of 16 variables, two scopes deep
+    names = [f'x{k}' for k in range(16)] * 62500
+    globals_ = {f'x{k}': k for k in range(8)}
+    frame = {f'x{k}': k for k in range(8, 16)}
+    flat = dict(globals_, **frame)
+
+    table = uptscope.SymbolTable()
+    for k in range(8):
+        table.declare(f'x{k}', 'int')
+    table.enter()
+    for k in range(8, 16):
+        table.declare(f'x{k}', 'int')
+    resolved = [table.lookup(name) for name in names[:16]] * 62500
+    frames = [list(range(8)), list(range(8, 16))]
+
+    def by_name_flat():
+        for name in names:
+            flat[name]
+    def by_name_scoped():
+        # the reference interpreter: function frame, then globals
+        for name in names:
+            frame[name] if name in frame else globals_[name]
+    def symbol_table():
+        for name in names:
+            table.lookup(name)
+    def by_slot():
+        for symbol in resolved:
+            frames[symbol.depth][symbol.slot]
+
+    cases = [
+        ('flat dict by name', by_name_flat),
+        ('scoped dicts by name', by_name_scoped),
+        ('SymbolTable.lookup', symbol_table),
+        ('frames[depth][slot]', by_slot),
+    ]
+    print(f"{'1M lookups':<24} {'s':>7}")
+    for name, fn in cases:
+        print(f"{name:<24} {best_of(fn):7.3f}")
+
+def scaling(base=500):
+    print(f"\n{'functions':>9} {'symbols':>8} {'parse (s)':>10} {'resolve (s)':>12} {'us/function':>12}")
+    per_function = []
+    for n in (base, 2 * base, 4 * base, 8 * base):
+        source = program(n)
+        start = time.perf_counter()
+        ast = parse(source)
+        parse_s = time.perf_counter() - start
+        resolve_s = best_of(lambda: uptscope.resolve(ast))
+        resolution = uptscope.resolve(ast)
+        symbols = len(resolution.globals.symbols) + sum(len(s.symbols) for s in resolution.scopes)
+        total = parse_s + resolve_s
+        per_function.append(total / n)
+        print(f"{n:>9} {symbols:>8} {parse_s:>10.3f} {resolve_s:>12.4f} {total / n * 1e6:>12.1f}")
+    growth = per_function[-1] / per_function[0]
+    assert growth < 2, f"time per function grew {growth:.1f}x from {base} to {8 * base} functions"
+    print(f"time per function grew {growth:.2f}x over 8x the functions")
+
+def main():
+    # resolved slots drive the VM: check a program against the interpreter
+    import uptinterp
+    ast = parse(FACT_REC)
+    assert capture(uptvm.execute, ast, [10]) == capture(uptinterp.interpret, ast, [10]) == '3628800\n'
+    lookups()
+    scaling()
+
+if __name__ == '__main__':
+    main()
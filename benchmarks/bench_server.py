@@ -0,0 +1,130 @@
+# Per request latency of the compile server against cold uptc.py runs.
+#
+#   python benchmarks/bench_server.py [--jobs 2] [--rounds 20]
+#
+# Starts uptserver.py on a private socket and compiles the same files four
+# ways: a cold `python uptc.py` per file, a `python uptclient.py` per file
+# (what a build would run: python starts, but imports no PLY), the client's
+# request() from this process (the server's latency alone) and the same
+# from 8 threads at once. Every way uses one warmed parse cache directory,
+# so cold runs get cache hits too and the difference is start up: python,
+# the modules, the parser tables and the lexer. Outputs and exit statuses
+# must match the cold runs'.
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common import FACT_ITER, FACT_REC, FIB, SQUARE_SUM
+
+from generate import shaped
+
+import uptclient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (name, source, extra uptc arguments)
+FILES = [
+    ('fact_iter', FACT_ITER, ['--run', 'vm', '--input', '10']),
+    ('fact_rec', FACT_REC, ['--run', 'python', '--input', '12']),
+    ('fib', FIB, ['--run', 'vm', '--input', '15']),
+    ('square_sum', SQUARE_SUM, ['--run', 'interp', '--input', '100']),
+    ('mixed', shaped('mixed', 8), ['-O2']),
+    ('functions', shaped('functions', 40), []),
+]
+
+def cold(argv):
+    proc = subprocess.run([sys.executable, os.path.join(ROOT, 'uptc.py')] + argv,
+                          capture_output=True, text=True)
+    return proc.returncode, proc.stdout
+
+def client(argv):
+    proc = subprocess.run([sys.executable, os.path.join(ROOT, 'uptclient.py')] + argv,
+                          capture_output=True, text=True, stdin=subprocess.DEVNULL)
+    return proc.returncode, proc.stdout
+
+def in_process(argv):
+    response = uptclient.request(uptclient.uptc_request(argv, stdin=''))
+    return response['status'], response['stdout']
+
+def timed(fn, argv):
+    start = time.perf_counter()
+    result = fn(argv)
+    return time.perf_counter() - start, result
+
+def wait_for(path, server):
+    for _ in range(200):
+        if server.poll() is not None:
+            raise Exception("the server exited")
+        try:
+            return uptclient.request({'op': 'ping'}, path)
+        except OSError:
+            time.sleep(0.05)
+    raise Exception("the server did not come up")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--jobs', type=int, default=2, help='server worker processes')
+    ap.add_argument('--rounds', type=int, default=20, help='compiles of every file per way')
+    args = ap.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='uptc-bench-server-')
+    path = os.path.join(directory, 'server.sock')
+    os.environ['UPTC_SOCKET'] = path
+    os.environ['UPTC_CACHE_DIR'] = os.path.join(directory, 'cache')
+    runs = []
+    for name, source, extra in FILES:
+        file = os.path.join(directory, name + '.upt')
+        with open(file, 'w') as f:
+            f.write(source)
+        runs.append([file] + extra)
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'uptserver.py'), '-j', str(args.jobs)],
+                              stderr=subprocess.DEVNULL)
+    try:
+        t_up = time.perf_counter()
+        wait_for(path, server)
+        t_up = time.perf_counter() - t_up
+        # fills the parse cache, and the results every way must give
+        expected = [cold(argv) for argv in runs]
+        for argv, result in zip(runs, expected):
+            assert result[0] == 0, argv
+            assert client(argv) == result, f"uptclient.py {argv} differs from uptc.py"
+            assert in_process(argv) == result, argv
+
+        print(f"server up in {t_up * 1e3:.0f} ms, {args.jobs} workers, {len(runs)} files x {args.rounds} rounds")
+        print(f"{'way':<22} {'median (ms)':>12} {'p90 (ms)':>10} {'vs cold':>8}")
+        medians = {}
+        for way, fn in (('cold uptc.py', cold), ('uptclient.py', client), ('request() in process', in_process)):
+            times = [timed(fn, argv)[0] for _ in range(args.rounds) for argv in runs]
+            medians[way] = statistics.median(times)
+            p90 = statistics.quantiles(times, n=10)[-1]
+            print(f"{way:<22} {medians[way] * 1e3:>12.1f} {p90 * 1e3:>10.1f} "
+                  f"{medians['cold uptc.py'] / medians[way]:>7.1f}x")
+
+        # 8 clients at once: the workers take them in turns
+        work = [argv for _ in range(args.rounds) for argv in runs]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(in_process, work))
+        wall = time.perf_counter() - start
+        assert results == [expected[runs.index(argv)] for argv in work]
+        print(f"{'8 concurrent clients':<22} {wall / len(work) * 1e3:>12.1f} {'':>10} "
+              f"{medians['cold uptc.py'] / (wall / len(work)):>7.1f}x  (wall per request)")
+        assert medians['uptclient.py'] < medians['cold uptc.py'], "the client is not faster than a cold run"
+        print(uptclient.request({'op': 'stats'}, path))
+    finally:
+        try:
+            uptclient.request({'op': 'shutdown'}, path)
+        except OSError:
+            server.terminate()
+        server.wait(10)
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+# Process start up cost: import time and cold start to first AST.
+#
+#   python benchmarks/bench_startup.py [runs]
+#
+# "prod" loads the pre-generated lexer and parser tables lazily; "dev"
+# (UPTC_DEV=1) validates the rules and checks the grammar signature like the
+# old import time build did.
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from common import FACT_REC
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+def run(code, dev=False, extra=()):
+    env = dict(os.environ)
+    env.pop('UPTC_DEV', None)
+    if dev:
+        env['UPTC_DEV'] = '1'
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, *extra, '-c', code], cwd=ROOT, env=env,
+                          capture_output=True, text=True, check=True)
+    return time.perf_counter() - start, proc
+
+def import_time(module):
+    # cumulative microseconds python -X importtime reports for `module`
+    _, proc = run(f'import {module}', extra=('-X', 'importtime'))
+    for line in proc.stderr.splitlines():
+        parts = [p.strip() for p in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    return None
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    for module in ('uptlexer', 'uptparser'):
+        samples = [import_time(module) for _ in range(runs)]
+        print(f"import {module:<12} {statistics.median(samples):>8} us (python -X importtime, cumulative)")
+
+    first_ast = f'import uptparser; uptparser.parse({FACT_REC!r})'
+    baseline = statistics.median(run('pass')[0] for _ in range(runs))
+    print(f"{'python -c pass':<28} {baseline * 1000:>8.1f} ms")
+    for label, dev in (('prod', False), ('dev', True)):
+        samples = [run(first_ast, dev)[0] for _ in range(runs)]
+        t = statistics.median(samples)
+        print(f"{'cold start to first AST ' + label:<28} {t * 1000:>8.1f} ms  (+{(t - baseline) * 1000:.1f} ms over bare python)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+# Front end throughput, memory and scaling over generated programs, with
+# stored baselines.
+#
+#   python benchmarks/bench_suite.py [--shapes mixed,nesting] [--scale 0.5]
+#   python benchmarks/bench_suite.py --save base.json
+#   python benchmarks/bench_suite.py --baseline base.json [--threshold 0.25]
+#   python benchmarks/bench_suite.py --no-baseline
+#
+# Every shape from generate.SHAPES is generated at four sizes (base, 2x, 4x,
+# 8x). For each program the suite measures lexing alone, parsing (lexing
+# included) and type checking, best of three, and the peak traced memory of
+# parsing and checking it. Throughput is tokens per second (and bytes per
+# second for lexing, which is what the comments shape is about); the scaling
+# column is the parse+check time per token at each size over that at the
+# smallest, which stays near 1 for linear work.
+#
+# --save stores the results as JSON. --baseline (by default the
+# benchmarks/baseline.json checked in next to this file) compares against
+# stored results and exits with status 1 if, for any shape, the lex, parse or check
+# time per token over all its sizes, or its peak memory per token, is more
+# than --threshold (a fraction) above the baseline. Baseline times are first
+# rescaled by a calibration loop timed in both runs, which absorbs some of
+# the difference between a quiet and a busy machine, not between machines:
+# keep one baseline per build machine. Memory compares anywhere with the
+# same python. A missing baseline file, or a shape or size the baseline
+# does not have, is reported rather than passed over.
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tracemalloc
+
+from common import best_of
+
+from generate import SHAPES, shaped
+
+import uptcheck
+from uptcompiler import Compiler, SCANNERS
+from uptlexer import get_lexer
+from uptscan import TokenStream
+
+# size of each shape at --scale 1 (about 12k tokens), doubled three times
+BASE = {
+    'functions': 50,
+    'nesting': 350,
+    'chains': 400,
+    'vars': 800,
+    'comments': 4096,    # few tokens, 70 KiB of comments
+    'mixed': 30,
+}
+STEPS = (1, 2, 4, 8)
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+METRICS = ('lex_us', 'parse_us', 'check_us', 'peak_bytes')   # per token
+
+def tokenize(source, scanner):
+    lexer = TokenStream() if scanner == 'fast' else get_lexer().clone()
+    lexer.input(source)
+    count = 0
+    for _ in iter(lexer.token, None):
+        count += 1
+    return count
+
+def measure(source, scanner):
+    result = {'bytes': len(source.encode()), 'tokens': tokenize(source, scanner)}
+    parsed = []
+    def parse():
+        parsed[:] = [Compiler(scanner=scanner).parse(source)]
+    result['lex_s'] = best_of(lambda: tokenize(source, scanner))
+    result['parse_s'] = best_of(parse)
+    ast = parsed[0]
+    assert ast is not None, "generated program does not parse"
+    result['check_s'] = best_of(lambda: uptcheck.check(ast, source))
+
+    del parsed[:], ast
+    gc.collect()
+    tracemalloc.start()
+    try:
+        ast = Compiler(scanner=scanner).parse(source)
+        uptcheck.check(ast, source)
+        result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    tokens = result['tokens']
+    for phase in ('lex', 'parse', 'check'):
+        result[phase + '_us'] = result[phase + '_s'] / tokens * 1e6
+    result['peak_bytes'] /= tokens
+    return result
+
+def run(shapes, scale, scanner, seed):
+    results = {}
+    for name in shapes:
+        rows = []
+        for step in STEPS:
+            size = max(1, int(BASE[name] * scale * step))
+            row = measure(shaped(name, size, seed), scanner)
+            row['size'] = size
+            rows.append(row)
+            report_row(name, row, rows[0])
+        results[name] = rows
+    return results
+
+def report_row(name, row, first):
+    per_token = row['parse_us'] + row['check_us']
+    scaling = per_token / (first['parse_us'] + first['check_us'])
+    print(f"{name:<10} {row['size']:>6} {row['tokens']:>8} {row['bytes'] / 1024:>8.0f} "
+          f"{row['bytes'] / row['lex_s'] / 2**20:>9.1f} {row['tokens'] / row['lex_s'] / 1e3:>9.0f} {row['tokens'] / row['parse_s'] / 1e3:>9.0f} "
+          f"{row['tokens'] / row['check_s'] / 1e3:>9.0f} {row['peak_bytes']:>9.0f} {scaling:>7.2f}")
+
+def calibrate():
+    # a fixed pure python workload (dicts, strings, a loop), timed alongside
+    # the suite so a baseline from a slower or busier run can be rescaled
+    def work():
+        d = {}
+        for i in range(200000):
+            d[str(i)] = i
+        return sum(len(k) for k in d)
+    return best_of(work, 5)
+
+def totals(rows, sizes):
+    # per token over every size present in both runs: one figure per shape
+    rows = [row for row in rows if row['size'] in sizes]
+    tokens = sum(row['tokens'] for row in rows)
+    result = {m: sum(row[m] * row['tokens'] for row in rows) / tokens for m in METRICS[:-1]}
+    result['peak_bytes'] = max(row['peak_bytes'] for row in rows)
+    return result
+
+def compare(results, calibration, baseline, threshold):
+    # (shape, metric, baseline, current) of every regression, and the shapes
+    # there was nothing to compare against; baseline times are rescaled by
+    # how much faster this run's calibration was
+    regressions = []
+    missing = []
+    speed = calibration / baseline['calibration_s']
+    for name, rows in results.items():
+        old = baseline['results'].get(name)
+        if not old:
+            missing.append(name)
+            continue
+        sizes = {row['size'] for row in rows} & {row['size'] for row in old}
+        if not sizes:
+            missing.append(name)
+            continue
+        now, before = totals(rows, sizes), totals(old, sizes)
+        for metric in METRICS:
+            expected = before[metric] * (speed if metric.endswith('_us') else 1)
+            if now[metric] > expected * (1 + threshold):
+                regressions.append((name, metric, expected, now[metric]))
+    return regressions, missing
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--shapes', default=','.join(BASE), help='comma separated, from ' + ', '.join(BASE))
+    ap.add_argument('--scale', type=float, default=1.0, help='multiply every size (default 1)')
+    ap.add_argument('--scanner', choices=SCANNERS, default='ply')
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--save', metavar='FILE', help='store the results as a baseline')
+    ap.add_argument('--baseline', metavar='FILE', default=BASELINE,
+                    help='compare against stored results (default benchmarks/baseline.json)')
+    ap.add_argument('--no-baseline', dest='baseline', action='store_const', const=None,
+                    help='only measure, compare against nothing')
+    ap.add_argument('--threshold', type=float, default=0.25,
+                    help='allowed slowdown or memory growth per token (default 0.25)')
+    args = ap.parse_args()
+    shapes = [s for s in args.shapes.split(',') if s]
+    for name in shapes:
+        if name not in SHAPES:
+            ap.error(f"unknown shape '{name}'")
+    # read before --save may overwrite it
+    baseline = None
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"{'shape':<10} {'size':>6} {'tokens':>8} {'KiB':>8} {'lex MiB/s':>9} {'lex kt/s':>9} {'parse kt/s':>9} "
+          f"{'check kt/s':>9} {'peak B/t':>9} {'scaling':>7}")
+    calibration = calibrate()
+    results = run(shapes, args.scale, args.scanner, args.seed)
+    record = {
+        'calibration_s': calibration,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'node': platform.node(),
+        'scanner': args.scanner,
+        'scale': args.scale,
+        'seed': args.seed,
+        'results': results,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(record, f, indent=1)
+        print(f"saved to {args.save}")
+    saved_over = args.save and os.path.abspath(args.save) == os.path.abspath(args.baseline or '')
+    if args.baseline and baseline is None and not saved_over:
+        print(f"no baseline at {args.baseline}: nothing was compared "
+              f"(store one with --save {args.baseline})", file=sys.stderr)
+    if baseline is not None:
+        if (baseline['scanner'], baseline['seed']) != (args.scanner, args.seed):
+            print("warning: the baseline was measured with another scanner or seed", file=sys.stderr)
+        if (baseline['node'], baseline['machine']) != (platform.node(), platform.machine()):
+            print(f"warning: the baseline was measured on {baseline['node']} ({baseline['machine']}), "
+                  f"times compare only roughly across machines", file=sys.stderr)
+        regressions, missing = compare(results, calibration, baseline, args.threshold)
+        for name in missing:
+            print(f"warning: {args.baseline} has no results for {name} at these sizes, "
+                  f"not compared", file=sys.stderr)
+        for name, metric, before, now in regressions:
+            print(f"REGRESSION {name}: {metric} per token {before:.3f} -> {now:.3f} "
+                  f"({now / before - 1:+.0%})")
+        if regressions:
+            return 1
+        print(f"no regression above {args.threshold:.0%} against {args.baseline} "
+              f"({len(results) - len(missing)} of {len(results)} shapes compared)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
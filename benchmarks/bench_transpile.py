@@ -0,0 +1,36 @@
+# Python transpiler vs direct AST interpretation (and the bytecode VM).
+#
+#   python benchmarks/bench_transpile.py
+
+from common import COUNT, SQUARE_SUM, FACT_ITER, FACT_REC, FIB, parse, best_of, capture
+
+import uptinterp
+import upttranspile
+import uptvm
+
+CASES = [
+    ('count', COUNT % 20000, []),
+    ('square_sum', SQUARE_SUM, [100000]),
+    ('fact_iter', FACT_ITER, [1000]),
+    ('fact_rec', FACT_REC, [1000]),
+    ('fib', FIB, [20]),
+]
+
+def main():
+    print(f"{'program':<12} {'interp (s)':>11} {'vm (s)':>9} {'python (s)':>11} {'vs interp':>10}")
+    for name, source, inputs in CASES:
+        ast = parse(source)
+        module = upttranspile.compile_program(ast)
+        program = uptvm.compile_program(ast)
+        run_python = lambda a, i, o: module(i, o)
+        run_vm = lambda a, i, o: uptvm.run(program, i, o)
+        expected = capture(uptinterp.interpret, ast, inputs)
+        assert capture(run_python, ast, inputs) == expected, f"{name}: python output differs"
+
+        t_interp = best_of(lambda: capture(uptinterp.interpret, ast, inputs))
+        t_vm = best_of(lambda: capture(run_vm, ast, inputs))
+        t_python = best_of(lambda: capture(run_python, ast, inputs))
+        print(f"{name:<12} {t_interp:>11.4f} {t_vm:>9.4f} {t_python:>11.4f} {t_interp / t_python:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
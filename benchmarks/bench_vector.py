@@ -0,0 +1,86 @@
+# One program over a batch of inputs: vectorized (uptvector, every input a
+# NumPy lane) against running it once per input on the VM and on the python
+# back end.
+#
+#   python benchmarks/bench_vector.py [--lanes 1000,10000]
+#
+# Every lane's output and error must be what the VM gives for its input.
+# The inputs vary per lane, so lanes diverge: loops run for different
+# counts, fib recurses to different depths, collatz branches every step,
+# and fact_iter overflows 64 bits on some lanes, which then run on the VM.
+# tests/test_vector.py checks these and break, return and and/or under
+# divergent lanes against the VM without timing anything.
+
+import argparse
+import io
+import random
+import time
+
+from common import FACT_ITER, FIB, SQUARE_SUM, parse
+
+import upttranspile
+import uptvm
+from uptcheck import TypeChecker
+from uptvector import VectorMachine
+
+COLLATZ = ('program collatz; var n: int; var steps: int; '
+           '{ n = read(); while n != 1: { if (n % 2) == 0: n = n / 2 else: n = (3 * n) + 1; '
+           'steps = steps + 1 }; print(steps) }')
+
+# (name, source, input vector of one lane)
+CASES = [
+    ('square_sum', SQUARE_SUM, lambda rng: [rng.randint(1, 1000)]),
+    ('fact_iter', FACT_ITER, lambda rng: [rng.randint(0, 25)]),
+    ('collatz', COLLATZ, lambda rng: [rng.randint(1, 10000)]),
+    ('fib', FIB, lambda rng: [rng.randint(0, 15)]),
+]
+
+def per_input(run, batch):
+    results = []
+    for inputs in batch:
+        out = io.StringIO()
+        try:
+            run(inputs, out)
+            error = None
+        except Exception as e:
+            error = str(e)
+        results.append((out.getvalue(), error))
+    return results
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--lanes', default='1000,10000', help='batch sizes, comma separated')
+    args = ap.parse_args()
+    sizes = [int(n) for n in args.lanes.split(',') if n]
+
+    print(f"{'program':<11} {'lanes':>6} {'vector (s)':>11} {'vm (s)':>8} {'python (s)':>11} "
+          f"{'vs vm':>7} {'vs python':>10} {'spilled':>8}")
+    speedups = {}
+    for name, source, make in CASES:
+        ast = parse(source)
+        TypeChecker(ast).check()
+        program = uptvm.compile_program(ast)
+        module = upttranspile.compile_program(ast)
+        for lanes in sizes:
+            rng = random.Random(lanes)
+            batch = [make(rng) for _ in range(lanes)]
+            machine = VectorMachine(ast, batch)
+            t_vector, results = timed(machine.run)
+            t_vm, expected = timed(lambda: per_input(lambda i, o: uptvm.run(program, i, o), batch))
+            t_python, python = timed(lambda: per_input(module, batch))
+            assert results == expected, f"{name}: vectorized output differs from the VM's"
+            assert python == expected, f"{name}: python output differs from the VM's"
+            speedups[name, lanes] = t_vm / t_vector
+            print(f"{name:<11} {lanes:>6} {t_vector:>11.3f} {t_vm:>8.3f} {t_python:>11.3f} "
+                  f"{t_vm / t_vector:>6.1f}x {t_python / t_vector:>9.1f}x {machine.spilled:>8}")
+    largest = sizes[-1]
+    assert speedups['square_sum', largest] > 5, \
+        f"square_sum over {largest} lanes is only {speedups['square_sum', largest]:.1f}x the VM"
+
+if __name__ == '__main__':
+    main()
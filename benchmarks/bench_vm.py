@@ -0,0 +1,32 @@
+# Bytecode VM vs the tuple-walking reference interpreter.
+#
+#   python benchmarks/bench_vm.py
+
+from common import COUNT, SQUARE_SUM, FACT_ITER, FACT_REC, FIB, parse, best_of, capture
+
+import uptinterp
+import uptvm
+
+CASES = [
+    ('count', COUNT % 20000, []),
+    ('square_sum', SQUARE_SUM, [100000]),
+    ('fact_iter', FACT_ITER, [1000]),
+    ('fact_rec', FACT_REC, [1000]),
+    ('fib', FIB, [20]),
+]
+
+def main():
+    print(f"{'program':<12} {'interp (s)':>11} {'vm (s)':>9} {'speedup':>8}")
+    for name, source, inputs in CASES:
+        ast = parse(source)
+        program = uptvm.compile_program(ast)
+        expected = capture(uptinterp.interpret, ast, inputs)
+        got = capture(lambda a, i, o: uptvm.run(program, i, o), ast, inputs)
+        assert got == expected, f"{name}: vm output differs from the interpreter"
+
+        t_interp = best_of(lambda: capture(uptinterp.interpret, ast, inputs))
+        t_vm = best_of(lambda: capture(lambda a, i, o: uptvm.run(program, i, o), ast, inputs))
+        print(f"{name:<12} {t_interp:>11.4f} {t_vm:>9.4f} {t_interp / t_vm:>7.2f}x")
+
+if __name__ == '__main__':
+    main()
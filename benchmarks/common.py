@@ -0,0 +1,41 @@
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import uptparser
+
+# ---------------- Sample programs from uptparser.py, scaled up -------------------------
+
+COUNT = 'program count; var i: int; { i = 1; while i<= %d : {print(i); i = i + 1}}'
+
+SQUARE_SUM = ('program square_sum ; var s : int; var n : int; var max : int; '
+              '{ max = read(); n = 1; while n <= max:{s = s + n*n; n = n + 1};print(s)}')
+
+FACT_ITER = ('program fact_iter ; var p : int ; var n : int ; '
+             '{ p = 1;n = read();while (n > 0):{p = p * n; n = n - 1};print(p)}')
+
+FACT_REC = ('program fact_rec ;int function fact( x: int ): {var p : int;p = 1 ;while x > 1:'
+            '{ p = p * x; x = x - 1}; return p} var n : int;{ n = read();print(fact(n))}')
+
+FIB = ('program fib; int function fib(k: int): { if k < 2: return k; '
+       'return fib(k - 1) + fib(k - 2) } { print(fib(read())) }')
+
+def parse(source):
+    return uptparser.parse(source)
+
+def best_of(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def capture(run, ast, inputs):
+    out = io.StringIO()
+    run(ast, inputs, out)
+    return out.getvalue()
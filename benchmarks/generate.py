@@ -0,0 +1,206 @@
+# Synthetic UPT programs of any size and shape, for benchmarking the front end.
+#
+#   python benchmarks/generate.py mixed 100 > big.upt
+#   python benchmarks/generate.py --functions 50 --depth 30 --chain 12 > nested.upt
+#
+# generate() emits a program that parses and type checks: int, bool and void
+# functions with parameters, locals and globals, bodies of assignments,
+# prints, calls, if/else, while and for, with the knobs below to stretch one
+# dimension at a time. The same arguments and seed always give the same
+# program. The programs exercise the lexer, parser and checker; they are not
+# written to terminate when run.
+#
+# The grammar has no operator precedence (operators associate to the right),
+# so every mixed int/bool expression is parenthesized where it has to be.
+
+import argparse
+import random
+
+INT_OPS = ('+', '-', '*')
+COMPARISONS = ('<', '>', '<=', '>=', '==', '!=')
+LOGICAL = ('and', 'or')
+
+class _Function:
+    def __init__(self, name, rtype):
+        self.name = name
+        self.rtype = rtype
+
+class Generator:
+    def __init__(self, functions=8, statements=8, depth=2, chain=4, variables=4, comment=0, seed=0):
+        self.functions = functions
+        self.statements = statements     # per function body, and in main
+        self.depth = depth               # nesting of the deepest block in each body
+        self.chain = chain               # operands per expression
+        self.variables = variables       # locals per function, and globals
+        self.comment = comment           # characters of comment before each function
+        self.random = random.Random(seed)
+        self.declared = []               # functions so far (a call must come after)
+        self.ints = []                   # int names in scope
+        self.bools = []
+
+    # ---- expressions ----
+
+    def operand(self):
+        r = self.random.random()
+        if r < 0.3:
+            return str(self.random.randrange(1, 100))
+        if r < 0.9 or not self.declared:
+            return self.random.choice(self.ints)
+        fn = self.random.choice(self.declared)
+        if fn.rtype != 'int':
+            return self.random.choice(self.ints)
+        return f'{fn.name}({self.random.choice(self.ints)}, {self.random.randrange(10)})'
+
+    def int_expr(self, n=None):
+        n = self.chain if n is None else n
+        parts = [self.operand()]
+        for _ in range(n - 1):
+            parts.append(self.random.choice(INT_OPS))
+            parts.append(self.operand())
+        if n > 3 and self.random.random() < 0.3:
+            # a parenthesized group somewhere in the chain
+            k = 2 * self.random.randrange(n // 2)
+            parts[k] = f'({parts[k]} + {self.operand()})'
+        return ' '.join(parts)
+
+    def comparison(self):
+        half = max(1, self.chain // 2)
+        return f'({self.int_expr(half)}) {self.random.choice(COMPARISONS)} ({self.int_expr(half)})'
+
+    def bool_term(self):
+        r = self.random.random()
+        if r < 0.8:
+            return self.comparison()
+        preds = [fn for fn in self.declared if fn.rtype == 'bool']
+        if r < 0.9 and preds:
+            return f'{self.random.choice(preds).name}({self.operand()}, {self.operand()})'
+        return self.random.choice(self.bools)
+
+    def bool_expr(self):
+        # a few terms, whatever the chain length, or conditions would grow
+        # with its square
+        terms = [self.bool_term() for _ in range(min(4, max(1, self.chain // 4)))]
+        if self.random.random() < 0.2:
+            terms[0] = f'not ({terms[0]})'
+        out = [f'({terms[0]})']
+        for term in terms[1:]:
+            out.append(self.random.choice(LOGICAL))
+            out.append(f'({term})')
+        return ' '.join(out)
+
+    # ---- commands ----
+
+    def simple(self):
+        r = self.random.random()
+        if r < 0.5:
+            return f'{self.random.choice(self.ints)} = {self.int_expr()}'
+        if r < 0.65 and self.bools:
+            return f'{self.random.choice(self.bools)} = {self.bool_expr()}'
+        if r < 0.8:
+            return f'print({self.int_expr()}, {self.random.choice(self.ints)})'
+        voids = [fn for fn in self.declared if fn.rtype == 'void']
+        if voids:
+            return f'{self.random.choice(voids).name}({self.int_expr(2)}, {self.random.choice(self.ints)})'
+        return f'{self.random.choice(self.ints)} = {self.int_expr()}'
+
+    def compound(self, body):
+        # body is a command; wraps it in one if, while or for
+        r = self.random.random()
+        if r < 0.4:
+            if self.random.random() < 0.5:
+                return f'if {self.bool_expr()}: {{ {body} }} else: {{ {self.simple()} }}'
+            return f'if {self.bool_expr()}: {{ {body} }}'
+        if r < 0.7:
+            counter = self.random.choice(self.ints)
+            return f'while ({counter}) > 0: {{ {body}; {counter} = {counter} - 1 }}'
+        return f'for {self.random.choice(self.ints)} = 0 to {self.int_expr(2)}: {{ {body} }}'
+
+    def nest(self, depth):
+        # depth levels around one simple command, built inside out so any
+        # depth works without recursion
+        cmd = self.simple()
+        for _ in range(depth):
+            cmd = self.compound(cmd)
+        return cmd
+
+    def block(self, n):
+        cmds = [self.simple() if self.random.random() < 0.6 else self.nest(1) for _ in range(n)]
+        if self.depth and cmds:
+            cmds[self.random.randrange(len(cmds))] = self.nest(self.depth)
+        return '; '.join(cmds)
+
+    # ---- declarations ----
+
+    def comment_text(self, k):
+        words = []
+        size = 0
+        while size < self.comment:
+            word = self.random.choice(('lorem', 'ipsum', 'dolor', 'sit', 'amet', 'f' + str(k)))
+            words.append(word)
+            size += len(word) + 1
+        text = ' '.join(words)
+        lines = [text[i:i + 72] for i in range(0, len(text), 72)]
+        return '(* ' + '\n   '.join(lines) + ' *)\n'
+
+    def function(self, k, global_ints, global_bools):
+        rtype = ('int', 'int', 'bool', 'void')[k % 4]
+        name = f'f{k}'
+        local_ints = [f'v{j}' for j in range(self.variables)]
+        decls = ' '.join(f'var {v}: int;' for v in local_ints) + ' var c: bool;'
+        self.ints = ['a', 'b'] + local_ints + global_ints
+        self.bools = ['c'] + global_bools
+        body = self.block(self.statements)
+        if rtype == 'int':
+            body += f'; return {self.int_expr()}'
+        elif rtype == 'bool':
+            body += f'; return {self.bool_expr()}'
+        self.declared.append(_Function(name, rtype))
+        head = self.comment_text(k) if self.comment else ''
+        return f'{head}{rtype} function {name}(a: int, b: int): {{\n  {decls}\n  {body}\n}}\n'
+
+    def program(self, name='gen'):
+        global_ints = [f'g{j}' for j in range(self.variables)]
+        global_bools = ['flag']
+        # declared callees only: generate the bodies in order
+        funcs = [self.function(k, global_ints, global_bools) for k in range(self.functions)]
+        self.ints = global_ints + ['n']
+        self.bools = global_bools
+        main = self.block(self.statements)
+        calls = [f'print({fn.name}(n, {k}))' for k, fn in enumerate(self.declared) if fn.rtype == 'int']
+        decls = ' '.join(f'var {v}: int;' for v in global_ints) + ' var flag: bool; var n: int;'
+        body = '; '.join(['n = read()'] + calls[:100] + [main])
+        return f"program {name};\n{''.join(funcs)}{decls}\n{{ {body} }}\n"
+
+def generate(seed=0, **shape):
+    return Generator(seed=seed, **shape).program()
+
+# one dimension scaled by n, the others small; a benchmark sweeps n
+SHAPES = {
+    'functions': lambda n: dict(functions=n),
+    'nesting': lambda n: dict(functions=1, statements=2, depth=n),
+    'chains': lambda n: dict(functions=1, statements=4, depth=0, chain=n),
+    'vars': lambda n: dict(functions=2, statements=4, variables=n),
+    'comments': lambda n: dict(functions=16, statements=2, comment=n),
+    'mixed': lambda n: dict(functions=n, statements=10, depth=4, chain=6, variables=8, comment=120),
+}
+
+def shaped(name, n, seed=0):
+    return generate(seed, **SHAPES[name](n))
+
+def main():
+    ap = argparse.ArgumentParser(description='Generate a UPT program')
+    ap.add_argument('shape', nargs='?', choices=sorted(SHAPES), help='a preset, scaled by size')
+    ap.add_argument('size', nargs='?', type=int, default=10)
+    ap.add_argument('--seed', type=int, default=0)
+    for knob, default in (('functions', 8), ('statements', 8), ('depth', 2), ('chain', 4),
+                          ('variables', 4), ('comment', 0)):
+        ap.add_argument('--' + knob, type=int, help=f'default {default}')
+    args = ap.parse_args()
+    shape = SHAPES[args.shape](args.size) if args.shape else {}
+    for knob in ('functions', 'statements', 'depth', 'chain', 'variables', 'comment'):
+        if getattr(args, knob) is not None:
+            shape[knob] = getattr(args, knob)
+    print(generate(args.seed, **shape), end='')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+# lextab.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('AND', 'BOOL', 'BREAK', 'ELSE', 'EQUAL', 'EXP', 'FALSE', 'FOR', 'FUNCTION', 'GREATEREQUAL', 'ID', 'IF', 'INT', 'INTEGER', 'LESSEQUAL', 'NOT', 'NOTEQUAL', 'OR', 'PRINT', 'PROGRAM', 'READ', 'RETURN', 'TO', 'TRUE', 'VAR', 'VOID', 'WHILE'))
+_lexreflags   = 64
+_lexliterals  = '+-*/%<>=,:;(){}'
+_lexstateinfo = {'INITIAL': 'inclusive'}
+_lexstatere   = {'INITIAL': [('(?P<t_ID>\\b[a-zA-Z][a-zA-Z_0-9]*\\b)|(?P<t_INT>\\b\\d+\\b)|(?P<t_newline>\\n+)|(?P<t_ignore_COMMENT>(\\#.*|\\(\\*[\\s\\S]*?\\*\\)))|(?P<t_EXP>\\*\\*)|(?P<t_EQUAL>==)|(?P<t_GREATEREQUAL>>=)|(?P<t_LESSEQUAL><=)|(?P<t_NOTEQUAL>!=)', [None, ('t_ID', 'ID'), ('t_INT', 'INT'), ('t_newline', 'newline'), (None, None), None, (None, 'EXP'), (None, 'EQUAL'), (None, 'GREATEREQUAL'), (None, 'LESSEQUAL'), (None, 'NOTEQUAL')])]}
+_lexstateignore = {'INITIAL': ' \t'}
+_lexstateerrorf = {'INITIAL': 't_error'}
+_lexstateeoff = {}
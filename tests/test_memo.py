@@ -0,0 +1,62 @@
+# Memoization (uptpure) never caches an impure function: with a memo table
+# every back end prints and reads exactly what it does without one.
+
+import io
+
+import pytest
+
+import uptinterp
+import upttranspile
+import uptvm
+import uptparser
+from uptpure import MemoTable, pure_functions
+
+# shout prints, next reads, bump writes a global, scaled reads one, loud
+# calls shout; fib and fact are pure and called twice with each argument
+PROGRAM = '''program mixed;
+int function fib(k: int): { if k < 2: return k; return fib(k - 1) + fib(k - 2) }
+int function fact(x: int): { var p: int; p = 1; while x > 1: { p = p * x; x = x - 1 }; return p }
+int function shout(x: int): { print(x); return x + 1 }
+int function next(x: int): { return x + read() }
+int function bump(x: int): { count = count + 1; return x + 1 }
+int function scaled(x: int): { return x * count }
+int function loud(x: int): { return shout(x) + fib(x) }
+var count: int;
+{
+  print(fib(12), fib(12), fact(6), fact(6));
+  print(shout(1), shout(1), next(1), next(1), next(1));
+  print(bump(1), bump(1), count, scaled(2), scaled(2));
+  count = 5;
+  print(scaled(2), loud(3), loud(3))
+}'''
+
+INPUTS = [10, 20, 30]
+
+EXPECTED = '144 144 720 720\n1\n1\n2 2 11 21 31\n2 2 2 4 4\n3\n3\n10 6 6\n'
+
+BACKENDS = {
+    'vm': uptvm.execute,
+    'python': upttranspile.execute,
+    'interp': uptinterp.interpret,
+}
+
+def run(execute, ast, memo=None):
+    out = io.StringIO()
+    execute(ast, list(INPUTS), out, memo)
+    return out.getvalue()
+
+def test_only_pure_functions_are_pure():
+    assert pure_functions(uptparser.parse(PROGRAM)) == {'fib', 'fact'}
+
+@pytest.mark.parametrize('backend', sorted(BACKENDS))
+@pytest.mark.parametrize('entries', [1, 4096])
+def test_impure_functions_are_never_cached(backend, entries):
+    ast = uptparser.parse(PROGRAM)
+    execute = BACKENDS[backend]
+    assert run(execute, ast) == EXPECTED
+    memo = MemoTable(ast, entries)
+    assert run(execute, ast, memo) == EXPECTED
+    # impure functions have no memo to look up or store in
+    stats = memo.stats()
+    assert set(stats) == {'fib', 'fact'}
+    assert stats['fib']['hits'] > 0 and stats['fact']['hits'] == 1
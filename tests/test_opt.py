@@ -0,0 +1,49 @@
+# Optimizations must not change what a program prints, nor move a runtime
+# error into code that never runs it.
+
+import io
+import shutil
+
+import pytest
+
+import uptcgen
+import uptopt
+import uptparser
+import uptvm
+
+# -x traps in the C back end for the smallest int, in a loop that never runs
+NEG_IN_DEAD_LOOP = ('program p; var x:int; var i:int; '
+                    '{ x = (0 - 9223372036854775807) - 1; i = 0; while i > 0 : { print(-x) }; print(x) }')
+
+def run_c(ast, cache_dir):
+    out = io.StringIO()
+    uptcgen.execute(ast, [], out, cache=uptcgen.ExecutableCache(str(cache_dir)))
+    return out.getvalue()
+
+def test_licm_keeps_unary_minus_in_the_loop():
+    for level in sorted(uptopt.LEVELS):
+        opt, _ = uptopt.optimize(uptparser.parse(NEG_IN_DEAD_LOOP), level)
+        # the condition i > 0 may be hoisted, -x may not
+        hoisted = [d for d in opt.global_vars[2:] if d.type != 'bool']
+        assert not hoisted, f"-O{level} hoisted {hoisted}"
+
+@pytest.mark.skipif(not (shutil.which('cc') or shutil.which('gcc') or shutil.which('clang')),
+                    reason='no C compiler')
+def test_licm_does_not_trap_in_a_loop_that_never_runs(tmp_path):
+    expected = run_c(uptparser.parse(NEG_IN_DEAD_LOOP), tmp_path)
+    assert expected == '-9223372036854775808\n'
+    for level in sorted(uptopt.LEVELS):
+        opt, _ = uptopt.optimize(uptparser.parse(NEG_IN_DEAD_LOOP), level)
+        assert run_c(opt, tmp_path) == expected, f"-O{level}"
+
+def test_long_operator_chains_in_a_loop():
+    # one chain invariant (hoisted whole), one reading the loop counter
+    invariant = ' and '.join(['(a > 0)'] * 3000)
+    varying = ' + '.join(['a'] * 2999) + ' + i'
+    source = (f"program p; var a: int; var i: int; var s: int; var b: bool; "
+              f"{{ a = 1; while i < 3: {{ b = {invariant}; s = s + ({varying}); i = i + 1 }}; print(s, b) }}")
+    for level in sorted(uptopt.LEVELS):
+        opt, _ = uptopt.optimize(uptparser.parse(source), level)
+        out = io.StringIO()
+        uptvm.execute(opt, [], out)
+        assert out.getvalue() == '9000 true\n', f"-O{level}"
@@ -0,0 +1,48 @@
+# The python back end must run every program the other back ends run,
+# however deeply its expressions and loops nest.
+
+import io
+
+import uptinterp
+import upttranspile
+import uptparser
+
+def outputs(source, inputs=()):
+    ast = uptparser.parse(source)
+    results = []
+    for execute in (upttranspile.execute, uptinterp.interpret):
+        out = io.StringIO()
+        try:
+            execute(ast, list(inputs), out)
+        except Exception as e:
+            out.write(f"error: {e}\n")
+        results.append(out.getvalue())
+    return results
+
+def test_long_operator_chain():
+    # 300 levels of parentheses, python allows 200
+    python, interp = outputs('program p; var a: int; { a = 1; print(' + ' + '.join(['a'] * 300) + ') }')
+    assert python == interp == '300\n'
+
+def test_deep_expression_keeps_evaluation_order():
+    # operands print as they are evaluated; the right operand of and/or
+    # only runs when it must
+    calls = 'int function f(x: int): { print(x); return x } '
+    chain = ' + ('.join(f"f({k}) * (read() - (x = f({k})))" for k in range(100)) + ')' * 99
+    found = ' or ('.join(f"(f({k}) == 70)" for k in range(100)) + ')' * 99
+    stopped = ' and ('.join(f"(f({k}) != 80)" for k in range(100)) + ')' * 99
+    source = (f"program p; {calls}var x: int; var i: int; "
+              f"{{ print({chain}, x); while (i < 3) and {found}: i = i + 1; print(i, {stopped}) }}")
+    python, interp = outputs(source, range(1000))
+    assert python == interp
+    assert python.endswith('79\n80\n3 false\n')
+
+def test_deep_loop_nesting():
+    # python compiles at most 20 loops inside each other
+    depth = 25
+    body = 'print(read())'
+    for k in range(depth):
+        body = f"while i{k} < 1: {{ i{k} = 1; {body} }}"
+    source = 'program p; ' + ''.join(f"var i{k}: int; " for k in range(depth)) + '{ ' + body + ' }'
+    python, interp = outputs(source, [7])
+    assert python == interp == '7\n'
@@ -0,0 +1,52 @@
+# uptc reports a program it rejects with a message and exit status 1,
+# whatever phase rejects it, never with a traceback.
+
+import pytest
+
+import uptc
+
+REJECTED = [
+    ('program p; var x: int; var x: int; { x = 1 }', "Symbol 'x' already declared"),
+    ('program p; var x: int; { x = f(1) }', "Symbol 'f' not declared"),
+    ('program p; var x: int; { x = 1 / 0 }', 'Division by zero'),
+    ('program p; var x: int; { x = true }', ''),
+]
+
+@pytest.mark.parametrize('scanner', ['ply', 'fast', 'guarded'])
+@pytest.mark.parametrize('source, message', REJECTED)
+def test_rejected_program(tmp_path, capsys, scanner, source, message):
+    path = tmp_path / 'prog.upt'
+    path.write_text(source)
+    assert uptc.main([str(path), '--no-cache', '--scanner', scanner]) == 1
+    err = capsys.readouterr().err
+    assert message in err and err.strip()
+
+@pytest.mark.parametrize('jobs', [1, 2])
+@pytest.mark.parametrize('scanner', ['ply', 'fast', 'guarded'])
+def test_error_position_after_non_ascii_text(tmp_path, capsys, scanner, jobs):
+    # enough functions to parse in parallel with jobs=2
+    functions = ''.join(f"int function f{k}(x: int): {{ return x + {k} }}\n" for k in range(100))
+    path = tmp_path / 'prog.upt'
+    path.write_text('program p; (* café éééé *)\n' + functions + 'var x: int;\n{\n  x = true }\n', encoding='utf-8')
+    assert uptc.main([str(path), '--no-cache', '--scanner', scanner, '-j', str(jobs)]) == 1
+    assert 'line 104, column 3' in capsys.readouterr().err
+
+def test_cached_positions_with_another_scanner(tmp_path, capsys):
+    # one cache, filled by each scanner in turn: every compile gets offsets
+    # in its own units, whichever scanner stored the entry
+    path = tmp_path / 'prog.upt'
+    path.write_text('program p; (* café éééé *)\nvar x: int;\n{\n  x = true }\n', encoding='utf-8')
+    cache = str(tmp_path / 'cache')
+    for scanner in ['fast', 'ply', 'guarded', 'fast', 'ply']:
+        assert uptc.main([str(path), '--cache-dir', cache, '--scanner', scanner]) == 1
+        assert 'line 4, column 3' in capsys.readouterr().err, scanner
+
+@pytest.mark.parametrize('argv', [['--ru', 'vm'], ['--ru=vm'], ['--run', 'vm', '--inp', '3']])
+def test_no_abbreviated_options(tmp_path, capsys, argv):
+    # uptclient forwards stdin by the spelled out --run and --input only
+    path = tmp_path / 'prog.upt'
+    path.write_text('program p; { print(read()) }')
+    with pytest.raises(SystemExit) as exit:
+        uptc.main([str(path), '--no-cache'] + argv)
+    assert exit.value.code == 2
+    assert 'unrecognized arguments' in capsys.readouterr().err
@@ -0,0 +1,85 @@
+# Vectorized batches (uptvector) against the VM: every lane's output and
+# error must be what the VM gives for its input. Inputs vary per lane, so
+# lanes diverge at every branch, loop, break, return and and/or.
+
+import io
+import random
+
+import pytest
+
+pytest.importorskip('numpy')
+
+import uptparser
+import uptvm
+from uptcheck import TypeChecker
+from uptvector import VectorMachine
+
+SQUARE_SUM = ('program square_sum; var s: int; var n: int; var max: int; '
+              '{ max = read(); n = 1; while n <= max: { s = s + n*n; n = n + 1 }; print(s) }')
+
+FACT_ITER = ('program fact_iter; var p: int; var n: int; '
+             '{ p = 1; n = read(); while (n > 0): { p = p * n; n = n - 1 }; print(p) }')
+
+COLLATZ = ('program collatz; var n: int; var steps: int; '
+           '{ n = read(); while n != 1: { if (n % 2) == 0: n = n / 2 else: n = (3 * n) + 1; '
+           'steps = steps + 1 }; print(steps) }')
+
+FIB = ('program fib; int function fib(k: int): { if k < 2: return k; '
+       'return fib(k - 1) + fib(k - 2) } { print(fib(read())) }')
+
+# lanes leave a while and a for at different iterations, from an inner loop
+BREAK = ('program brk; var n: int; var i: int; var j: int; var s: int; '
+         '{ n = read(); i = 0; while true: { i = i + 1; if i > n: break; '
+         'if (i % 3) == 0: s = s + i; for j = 1 to 10: { if (j * i) > n: break; s = s + 1 } }; '
+         'print(i, s); while s > 0: { s = s - 7; if (s % 5) == 0: break }; print(s) }')
+
+# lanes return from inside nested loops, after a loop or at the end
+RETURN = ('program ret; '
+          'int function root(n: int): { var k: int; var t: int; k = 0; '
+          'while k < 50: { t = 0; while t < 3: { if ((k * k) + t) > n: return k; t = t + 1 }; k = k + 1 }; '
+          'return 0 - 1 } '
+          'bool function odd(n: int): { if (n % 2) == 1: return true } '
+          'var n: int; { n = read(); print(root(n), odd(n)); if n > 500: return n; print(n) }')
+
+# the right side of and/or runs (prints, divides) only on lanes that get
+# there: dividing by zero or printing on any other lane changes the result
+SHORT_CIRCUIT = ('program sc; bool function loud(x: int): { print(x); return x > 3 } '
+                 'var n: int; var b: bool; '
+                 '{ n = read(); b = (n == 0) or ((10 / n) > 2); '
+                 'print(b, (n > 5) and loud(n), (n < 3) or loud(0 - n)); '
+                 'while (n > 0) and (loud(n) or ((100 / (n - 3)) > 30)): n = n - 2; '
+                 'print(n, ((n != 0) and ((12 % n) == 0)) or loud(n)) }')
+
+CASES = [
+    ('square_sum', SQUARE_SUM, lambda rng: [rng.randint(1, 1000)]),
+    # overflows 64 bits on some lanes, which spill to the VM
+    ('fact_iter', FACT_ITER, lambda rng: [rng.randint(0, 25)]),
+    ('collatz', COLLATZ, lambda rng: [rng.randint(1, 10000)]),
+    ('fib', FIB, lambda rng: [rng.randint(0, 12)]),
+    ('break', BREAK, lambda rng: [rng.randint(-2, 40)]),
+    ('return', RETURN, lambda rng: [rng.randint(-5, 1000)]),
+    ('short_circuit', SHORT_CIRCUIT, lambda rng: [rng.randint(-3, 12)]),
+]
+
+LANES = 200
+
+def on_the_vm(program, batch):
+    results = []
+    for inputs in batch:
+        out = io.StringIO()
+        try:
+            uptvm.run(program, list(inputs), out)
+            error = None
+        except Exception as e:
+            error = str(e)
+        results.append((out.getvalue(), error))
+    return results
+
+@pytest.mark.parametrize('name, source, make', CASES, ids=[case[0] for case in CASES])
+def test_vector_matches_vm(name, source, make):
+    ast = uptparser.parse(source)
+    TypeChecker(ast).check()
+    rng = random.Random(name)
+    batch = [make(rng) for _ in range(LANES)]
+    expected = on_the_vm(uptvm.compile_program(ast), batch)
+    assert VectorMachine(ast, batch).run() == expected
@@ -0,0 +1,27 @@
+# The VM compiles expressions of any depth: an operator chain nests one
+# node per operator.
+
+import io
+
+import uptparser
+import uptvm
+
+CHAIN = 3000
+
+def run(source, inputs=()):
+    out = io.StringIO()
+    uptvm.execute(uptparser.parse(source), list(inputs), out)
+    return out.getvalue()
+
+def test_long_operator_chains():
+    total = ' + '.join(['a'] * CHAIN)
+    test = ' and '.join(['(a > 0)'] * CHAIN)
+    source = f"program p; var a: int; var b: int; {{ a = 1; b = {total}; print(b, {test}) }}"
+    assert run(source) == f"{CHAIN} true\n"
+
+def test_long_chain_in_a_call_and_a_loop():
+    total = ' - '.join(['read()'] * CHAIN)
+    source = ('program p; int function f(x: int): { return x } var i: int; '
+              f"{{ while i < f({total}): i = i + 1; print(i) }}")
+    # a - (b - (c - ...)) of 1s: 0 with an even number of terms
+    assert run(source, [1] * CHAIN) == '0\n'
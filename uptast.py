@@ -0,0 +1,244 @@
+# AST node classes built by uptparser, and helpers shared by the back ends.
+#
+# Nodes use __slots__ (no per instance dict) and every sequence (functions,
+# declarations, commands, arguments) is a flat python list, built by left
+# recursive grammar rules. A program with 100k statements is one list of
+# 100k commands, not 100k nested list nodes.
+#
+#   Program(name, funcs, global_vars, main)
+#   Function(name, rtype, params, local_vars, body)
+#   VarDecl(name, type)                          params and variables
+
+class Node:
+    # _offset is not a field: where a node came from does not change what it
+    # means, so equality and hashing ignore it
+    __slots__ = ('_offset',)
+    tag = 'Node'
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.tag = cls.__name__
+
+    @property
+    def offset(self):
+        # source offset of the node's first token, set by the parser for
+        # declarations, commands and calls (see uptsource); None if unknown
+        return getattr(self, '_offset', None)
+
+    @offset.setter
+    def offset(self, value):
+        self._offset = value
+
+    def fields(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.fields() == other.fields()
+
+    def __hash__(self):
+        return hash((self.tag,) + self.fields())
+
+    def __repr__(self):
+        return f"{self.tag}({', '.join(map(repr, self.fields()))})"
+
+    def __reduce__(self):
+        # pickles as a constructor call, see uptcache, plus the offset as
+        # the state: setting one attribute from an int unpickles faster
+        # than the generic (None, {'_offset': ...}) slot state
+        if self.offset is None:
+            return (type(self), self.fields())
+        return (type(self), self.fields(), self._offset)
+
+    def __setstate__(self, offset):
+        self._offset = offset
+
+class Program(Node):
+    __slots__ = ('name', 'funcs', 'global_vars', 'main')
+
+    def __init__(self, name, funcs, global_vars, main):
+        self.name = name
+        self.funcs = funcs
+        self.global_vars = global_vars
+        self.main = main
+
+class Function(Node):
+    __slots__ = ('name', 'rtype', 'params', 'local_vars', 'body')
+
+    def __init__(self, name, rtype, params, local_vars, body):
+        self.name = name
+        self.rtype = rtype
+        self.params = params
+        self.local_vars = local_vars
+        self.body = body
+
+class VarDecl(Node):
+    __slots__ = ('name', 'type')
+
+    def __init__(self, name, type):
+        self.name = name
+        self.type = type
+
+# ---------------- Commands -------------------------
+
+class CmdAtrib(Node):
+    # any expression used as a statement, usually an assignment
+    __slots__ = ('expr',)
+
+    def __init__(self, expr):
+        self.expr = expr
+
+class CmdIf(Node):
+    __slots__ = ('cond', 'then', 'orelse')
+
+    def __init__(self, cond, then, orelse=None):
+        self.cond = cond
+        self.then = then
+        self.orelse = orelse
+
+class CmdWhile(Node):
+    __slots__ = ('cond', 'body')
+
+    def __init__(self, cond, body):
+        self.cond = cond
+        self.body = body
+
+class CmdFor(Node):
+    # for <init> to <limit> : body, init is `i = e` or a bare variable
+    __slots__ = ('init', 'limit', 'body')
+
+    def __init__(self, init, limit, body):
+        self.init = init
+        self.limit = limit
+        self.body = body
+
+class CmdBreak(Node):
+    __slots__ = ()
+
+class CmdPrint(Node):
+    __slots__ = ('args',)
+
+    def __init__(self, args):
+        self.args = args
+
+class CmdReturn(Node):
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+class CmdSeq(Node):
+    __slots__ = ('cmds',)
+
+    def __init__(self, cmds):
+        self.cmds = cmds
+
+# ---------------- Expressions -------------------------
+
+# Leaves of an expression are plain python values:
+#   int        -> integer literal
+#   'true'     -> boolean literal
+#   'false'
+#   other str  -> variable
+# read() is a Read node, so any name, 'Read' too, can be a variable
+
+class BinOp(Node):
+    # op '=' is an assignment, left is then the variable name
+    __slots__ = ('op', 'left', 'right')
+
+    def __init__(self, op, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+
+class UnOp(Node):
+    __slots__ = ('op', 'operand')
+
+    def __init__(self, op, operand):
+        self.op = op
+        self.operand = operand
+
+class Group(Node):
+    __slots__ = ('expr',)
+
+    def __init__(self, expr):
+        self.expr = expr
+
+class Read(Node):
+    __slots__ = ()
+
+class FunctionCall(Node):
+    __slots__ = ('name', 'args')
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+def expr_kind(e):
+    if isinstance(e, int):
+        return 'INT'
+    if isinstance(e, str):
+        if e == 'true' or e == 'false':
+            return 'BOOL'
+        return 'ID'
+    return e.tag
+
+def is_assign(e):
+    return type(e) is BinOp and e.op == '='
+
+def default_value(var_type):
+    return False if var_type == 'bool' else 0
+
+# ---------------- Name analysis -------------------------
+
+# Collect the variable names a command or expression reads (used) and writes (assigned)
+
+def expr_names(e, used, assigned):
+    # iterative, an operator chain nests as deep as it is long
+    stack = [e]
+    while stack:
+        e = stack.pop()
+        kind = expr_kind(e)
+        if kind == 'ID':
+            used.add(e)
+        elif kind == 'BinOp':
+            if e.op == '=':
+                if expr_kind(e.left) != 'ID':
+                    raise Exception("Semantic error: Invalid assignment target")
+                assigned.add(e.left)
+                used.add(e.left)
+            else:
+                stack.append(e.left)
+            stack.append(e.right)
+        elif kind == 'UnOp':
+            stack.append(e.operand)
+        elif kind == 'Group':
+            stack.append(e.expr)
+        elif kind == 'FunctionCall':
+            stack.extend(e.args)
+
+def cmd_names(node, used, assigned):
+    tag = node.tag
+    if tag == 'CmdAtrib':
+        expr_names(node.expr, used, assigned)
+    elif tag == 'CmdReturn':
+        expr_names(node.value, used, assigned)
+    elif tag == 'CmdSeq':
+        for cmd in node.cmds:
+            cmd_names(cmd, used, assigned)
+    elif tag == 'CmdIf':
+        expr_names(node.cond, used, assigned)
+        cmd_names(node.then, used, assigned)
+        if node.orelse is not None:
+            cmd_names(node.orelse, used, assigned)
+    elif tag == 'CmdWhile':
+        expr_names(node.cond, used, assigned)
+        cmd_names(node.body, used, assigned)
+    elif tag == 'CmdFor':
+        init = node.init
+        expr_names(init, used, assigned)
+        assigned.add(init.left if is_assign(init) else init)
+        expr_names(node.limit, used, assigned)
+        cmd_names(node.body, used, assigned)
+    elif tag == 'CmdPrint':
+        for e in node.args:
+            expr_names(e, used, assigned)
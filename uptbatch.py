@@ -0,0 +1,99 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import uptcache
+import uptopt
+from uptcompiler import Compiler, SCANNERS
+
+# ---------------- Batch compiler -------------------------
+#
+#   python uptbatch.py examples/ -j 8 -O2
+#   python uptbatch.py examples/ --json > results.json
+#
+# Every worker process builds one Compiler in its initializer and reuses it
+# for all the files it is handed, so the parser tables are loaded once per
+# worker, not once per file.
+
+_compiler = None
+
+def _init_worker(cache_dir, level, scanner):
+    global _compiler
+    cache = uptcache.CompileCache(cache_dir) if cache_dir else None
+    _compiler = Compiler(cache, level, scanner)
+
+def _compile_one(path):
+    start_cpu = time.process_time()
+    start = time.perf_counter()
+    result = _compiler.compile_file(path)
+    entry = result.as_dict()
+    entry['seconds'] = time.perf_counter() - start
+    entry['cpu_seconds'] = time.process_time() - start_cpu
+    return entry
+
+def find_sources(paths):
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                sources.extend(os.path.join(root, name) for name in sorted(files) if name.endswith('.upt'))
+        else:
+            sources.append(path)
+    return sources
+
+def compile_batch(paths, jobs=None, level=1, cache_dir=None, scanner='ply'):
+    # returns (per file results in input order, aggregate summary)
+    jobs = jobs or os.cpu_count() or 1
+    start = time.perf_counter()
+    if jobs == 1:
+        _init_worker(cache_dir, level, scanner)
+        results = [_compile_one(path) for path in paths]
+    else:
+        chunksize = max(1, len(paths) // (jobs * 4))
+        with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(cache_dir, level, scanner)) as pool:
+            results = list(pool.map(_compile_one, paths, chunksize=chunksize))
+    wall = time.perf_counter() - start
+    ok = sum(1 for r in results if r['ok'])
+    summary = {
+        'files': len(results),
+        'ok': ok,
+        'failed': len(results) - ok,
+        'jobs': jobs,
+        'wall_seconds': wall,
+        'cpu_seconds': sum(r['cpu_seconds'] for r in results),
+        'files_per_second': len(results) / wall if wall else 0.0,
+    }
+    return results, summary
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='uptbatch', description='Compile many UPT programs in parallel')
+    ap.add_argument('paths', nargs='+', help='.upt files or directories to search for them')
+    ap.add_argument('-j', '--jobs', type=int, default=0, help='worker processes (default: one per core)')
+    ap.add_argument('-O', dest='level', type=int, choices=sorted(uptopt.LEVELS), default=1,
+                    help='optimization level (default 1)')
+    ap.add_argument('--cache-dir', help='share a parse cache between the workers')
+    ap.add_argument('--scanner', choices=SCANNERS, default='ply', help='tokenizer to parse with (default ply)')
+    ap.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = ap.parse_args(argv)
+
+    paths = find_sources(args.paths)
+    results, summary = compile_batch(paths, args.jobs or None, args.level, args.cache_dir, args.scanner)
+
+    if args.json:
+        json.dump({'results': results, 'summary': summary}, sys.stdout, indent=2)
+        print()
+    else:
+        for r in results:
+            status = 'ok' if r['ok'] else 'FAILED: ' + r['error']
+            print(f"{r['path']:40} {r['seconds'] * 1000:9.3f} ms  {status}")
+        print(f"{summary['files']} files, {summary['ok']} ok, {summary['failed']} failed, "
+              f"{summary['jobs']} jobs, {summary['wall_seconds']:.3f} s wall, "
+              f"{summary['cpu_seconds']:.3f} s cpu, {summary['files_per_second']:.1f} files/s")
+    return 1 if summary['failed'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+import argparse
+import sys
+
+import uptcache
+import uptopt
+import uptpure
+from uptcompiler import Compiler, SCANNERS
+from uptprofile import Profile
+from uptsource import SourceFile
+
+# ---------------- Command line driver -------------------------
+#
+#   python uptc.py prog.upt -O2 --passes
+#   python uptc.py prog.upt --run vm --input 10
+#   python uptc.py prog.upt --profile prof.json --no-cache
+#   python uptc.py untrusted.upt --scanner guarded --max-errors 10 --time-budget 0.5
+#   python uptc.py fib.upt --run vm --input 30 --memo --memo-stats
+
+BACKENDS = ('vm', 'python', 'interp', 'c')
+
+def run_program(ast, backend, inputs=None, out=None, memo=None):
+    # memo: a uptpure.MemoTable, not for the C back end
+    if backend == 'vm':
+        import uptvm
+        uptvm.execute(ast, inputs, out, memo)
+    elif backend == 'python':
+        import upttranspile
+        upttranspile.execute(ast, inputs, out, memo)
+    elif backend == 'c':
+        if memo is not None:
+            raise Exception("The C back end does not memoize")
+        import uptcgen
+        uptcgen.execute(ast, inputs, out)
+    else:
+        import uptinterp
+        uptinterp.interpret(ast, inputs, out, memo)
+
+def write_profile(profile, path):
+    profile.close()
+    if path == '-':
+        print(profile.to_json(), file=sys.stderr)
+    else:
+        with open(path, 'w') as f:
+            f.write(profile.to_json() + '\n')
+
+def main(argv=None, cache_for=uptcache.CompileCache):
+    # cache_for(cache_dir) opens the parse cache; uptserver keeps its own.
+    # No abbreviated options: uptclient tells from the spelled out --run and
+    # --input whether to forward its stdin
+    ap = argparse.ArgumentParser(prog='uptc', description='Compile and run UPT programs',
+                                 allow_abbrev=False)
+    ap.add_argument('file')
+    ap.add_argument('-O', dest='level', type=int, choices=sorted(uptopt.LEVELS), default=1,
+                    help='optimization level (default 1)')
+    ap.add_argument('--passes', action='store_true', help='report what each optimization pass did')
+    ap.add_argument('--ast', action='store_true', help='print the optimized AST')
+    ap.add_argument('--run', choices=BACKENDS, help='execute the program with this back end')
+    ap.add_argument('--input', type=int, nargs='*', help='values for read(), default stdin')
+    ap.add_argument('--memo', nargs='?', type=int, const=uptpure.DEFAULT_ENTRIES, metavar='ENTRIES',
+                    help='cache results of pure functions, at most ENTRIES per function (default %(const)s)')
+    ap.add_argument('--memo-stats', action='store_true', help='with --memo, print hits and misses per function')
+    ap.add_argument('--cache-dir', help='parse cache directory (default $UPTC_CACHE_DIR or ~/.cache/uptc)')
+    ap.add_argument('--no-cache', action='store_true', help='always lex and parse the source')
+    ap.add_argument('--scanner', choices=SCANNERS, default='ply', help='tokenizer to parse with (default ply)')
+    ap.add_argument('--max-errors', type=int, default=100,
+                    help='with --scanner guarded, stop lexing after this many errors (default 100)')
+    ap.add_argument('--max-bytes', type=int, default=64 << 20,
+                    help='with --scanner guarded, refuse larger sources (default 64 MiB)')
+    ap.add_argument('--time-budget', type=float, metavar='SECONDS',
+                    help='with --scanner guarded, stop lexing after this long (default no limit)')
+    ap.add_argument('-j', '--jobs', type=int, default=1,
+                    help='parse a file with many functions in this many processes (default 1)')
+    ap.add_argument('--profile', nargs='?', const='-', metavar='FILE',
+                    help='write phase, lexer rule and production timings as JSON to FILE (default stderr)')
+    ap.add_argument('--profile-memory', action='store_true',
+                    help='with --profile, also trace allocated bytes per phase (slower)')
+    args = ap.parse_args(argv)
+    if args.memo is not None and args.run in (None, 'c'):
+        ap.error('--memo needs --run vm, python or interp')
+    if args.memo is not None and args.memo < 1:
+        ap.error('--memo needs room for at least 1 entry')
+
+    cache = None if args.no_cache else cache_for(args.cache_dir)
+    profile = Profile(args.profile_memory) if args.profile else None
+    # uptguard only for its scanner, its regexes take a while to compile;
+    # without it lex_failure stays (), which catches nothing
+    limits = None
+    lex_failure = ()
+    if args.scanner == 'guarded':
+        import uptguard
+        limits = uptguard.Limits(args.max_errors, args.max_bytes, args.time_budget)
+        lex_failure = uptguard.LexFailure
+    compiler = Compiler(cache, args.level, args.scanner, profile, args.jobs, limits)
+    try:
+        with SourceFile(args.file) as source:
+            # a program the parser (semantic errors found while parsing),
+            # checker, optimizer or code generator rejects gets its message,
+            # like a lexical error, not a traceback
+            try:
+                ast = compiler.parse(source.data)
+            except lex_failure as e:
+                for error in e.errors:
+                    print(e.describe(error), file=sys.stderr)
+                return 1
+            except Exception as e:
+                print(e, file=sys.stderr)
+                return 1
+            if ast is None:
+                return 1
+            try:
+                compiler.check(ast, source.data)
+                ast, report = compiler.optimize(ast)
+                # lowering to bytecode is a compile phase too
+                program = compiler.codegen(ast) if args.run == 'vm' else None
+            except Exception as e:
+                print(e, file=sys.stderr)
+                return 1
+    finally:
+        if profile is not None:
+            write_profile(profile, args.profile)
+
+    if args.passes:
+        print(uptopt.format_report(report), file=sys.stderr)
+    if args.ast:
+        print(ast)
+    memo = None if args.memo is None else uptpure.MemoTable(ast, args.memo)
+    try:
+        if program is not None:
+            import uptvm
+            uptvm.run(program, args.input, memo=memo)
+        elif args.run:
+            run_program(ast, args.run, args.input, memo=memo)
+    finally:
+        if memo is not None and args.memo_stats:
+            print(uptpure.format_stats(memo), file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+import hashlib
+import pickle
+import os
+import tempfile
+from collections import OrderedDict
+
+# ---------------- Content addressed cache of parsed programs -------------------------
+#
+# An entry is keyed by sha256(grammar signature + units + source). The
+# signature covers the lexer, the parser actions and the generated tables, so
+# any change to them makes old entries unreachable (they age out through the
+# LRU). units is what the offsets in the AST count, 'chars' or 'bytes' (see
+# uptcompiler): a compile that places them in the other unit never gets it.
+# Entries are pickles of {'ast': ..., 'symbols': ...}, the AST and the
+# uptscope.SymbolTable the parser filled; AST nodes pickle as plain
+# constructor calls (uptast.Node.__reduce__), so loading one is about as
+# cheap as building the tree.
+# A hit never imports ply, the lexer or the parser.
+
+FORMAT_VERSION = b'upt-cache-2'
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+# every module that can produce a cached AST: the PLY lexer and parser, and
+# the fast and guarded scanners that feed the same parser
+_SIGNATURE_FILES = ('uptast.py', 'uptscope.py', 'uptlexer.py', 'lextab.py', 'uptparser.py', 'parsetab.py',
+                    'uptscan.py', 'uptguard.py')
+
+_signature = None
+
+def grammar_signature():
+    global _signature
+    if _signature is None:
+        h = hashlib.sha256(FORMAT_VERSION)
+        for name in _SIGNATURE_FILES:
+            path = os.path.join(_HERE, name)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    h.update(f.read())
+        _signature = h.digest()
+    return _signature
+
+def source_key(source, units='chars'):
+    # source is a str, or bytes / a mapped file (uptsource.SourceFile)
+    if isinstance(source, str):
+        source = source.encode('utf-8')
+    h = hashlib.sha256(grammar_signature())
+    h.update(units.encode() + b'\0')
+    h.update(source)
+    return h.hexdigest()
+
+def default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.environ.get('UPTC_CACHE_DIR') or os.path.join(base, 'uptc')
+
+class CompileCache:
+    def __init__(self, directory=None, max_bytes=64 * 1024 * 1024):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = None    # total bytes on disk, computed on first put
+
+    def key(self, source, units='chars'):
+        return source_key(source, units)
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key[2:])
+
+    def get(self, source, units='chars'):
+        path = self.path(self.key(source, units))
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError, AttributeError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+        try:
+            # the mtime is the LRU clock
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return entry
+
+    def put(self, source, entry, units='chars'):
+        path = self.path(self.key(source, units))
+        self.store(path, pickle.dumps(entry, pickle.HIGHEST_PROTOCOL))
+
+    def store(self, path, data, mode=None):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write then rename so concurrent readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            if mode is not None:
+                os.chmod(tmp, mode)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        if self._size is None:
+            self._size = self.disk_usage()
+        else:
+            self._size += len(data)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def entries(self):
+        # [(mtime, size, path), ...]
+        result = []
+        if not os.path.isdir(self.directory):
+            return result
+        for shard in os.listdir(self.directory):
+            shard_dir = os.path.join(self.directory, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if name.startswith('.tmp'):
+                    continue
+                path = os.path.join(shard_dir, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                result.append((st.st_mtime, st.st_size, path))
+        return result
+
+    def disk_usage(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, target=None):
+        # drop least recently used entries until below 90% of the limit
+        if target is None:
+            target = self.max_bytes * 9 // 10
+        entries = sorted(self.entries())
+        size = sum(s for _, s, _ in entries)
+        removed = 0
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            size -= entry_size
+            removed += 1
+        self._size = size
+        return removed
+
+    def clear(self):
+        return self.evict(0)
+
+def cached_parse(source, cache=None):
+    # returns the AST, parsing only when the cache has no entry for source
+    from uptcompiler import Compiler
+    return Compiler(cache).parse(source)
+
+# ---------------- In memory, in front of the disk -------------------------
+#
+# For a long running process (uptserver): entries are kept as they are, no
+# pickling, least recently used out past max_entries. The optimizer never
+# modifies a tree in place, so one entry can serve any number of compiles.
+
+class MemoryCache:
+    def __init__(self, backing=None, max_entries=256):
+        self.backing = backing    # a CompileCache, or None
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, source, units='chars'):
+        key = source_key(source, units)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        if self.backing is not None:
+            entry = self.backing.get(source, units)
+            if entry is not None:
+                self._remember(key, entry)
+        return entry
+
+    def put(self, source, entry, units='chars'):
+        self._remember(source_key(source, units), entry)
+        if self.backing is not None:
+            self.backing.put(source, entry, units)
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
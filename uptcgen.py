@@ -0,0 +1,464 @@
+import hashlib
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import uptcache
+from uptast import Node, expr_kind, is_assign
+from uptcheck import TypeChecker
+from uptruntime import format_value
+from uptscope import resolve
+
+# ---------------- C back end: AST -> C -> native executable -------------------------
+#
+# generate() turns a checked program into one C99 file: UPT functions become
+# static C functions, globals static variables, int is int64_t and bool is
+# bool. build() compiles it with the system C compiler ($CC, default cc) and
+# keeps the executable in a cache keyed by a hash of the C source, the
+# compiler and its flags, so a program is only compiled once; execute()
+# runs it with read() on stdin and print() on a fully buffered stdout.
+#
+# Integers follow uptruntime's rules (division truncates, % takes the sign
+# of the dividend, ** needs a non-negative exponent) with one difference:
+# they are 64 bits. Every operation that could overflow is checked and
+# stops the program with a runtime error instead of wrapping around.
+#
+# C leaves the order of evaluation of operands and arguments unspecified
+# while UPT evaluates left to right, so every operation gets a temporary of
+# its own, computed in UPT order, and a variable read is copied before an
+# operand to its right that may change it. The C compiler folds the
+# temporaries away again.
+
+CFLAGS = ('-O2', '-std=c99')
+
+RUNTIME = r'''#include <inttypes.h>
+#include <stdbool.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <stdlib.h>
+
+static void upt_error(const char *message) {
+    fflush(stdout);
+    fprintf(stderr, "Runtime error: %s\n", message);
+    exit(2);
+}
+
+static void upt_overflow(void) {
+    upt_error("integer overflow (the C back end uses 64-bit integers)");
+}
+
+#if defined(__GNUC__) && (__GNUC__ >= 5 || defined(__clang__))
+static inline int64_t upt_add(int64_t a, int64_t b) {
+    int64_t r;
+    if (__builtin_add_overflow(a, b, &r)) upt_overflow();
+    return r;
+}
+static inline int64_t upt_sub(int64_t a, int64_t b) {
+    int64_t r;
+    if (__builtin_sub_overflow(a, b, &r)) upt_overflow();
+    return r;
+}
+static inline int64_t upt_mul(int64_t a, int64_t b) {
+    int64_t r;
+    if (__builtin_mul_overflow(a, b, &r)) upt_overflow();
+    return r;
+}
+#else
+static inline int64_t upt_add(int64_t a, int64_t b) {
+    if ((b > 0 && a > INT64_MAX - b) || (b < 0 && a < INT64_MIN - b)) upt_overflow();
+    return a + b;
+}
+static inline int64_t upt_sub(int64_t a, int64_t b) {
+    if ((b < 0 && a > INT64_MAX + b) || (b > 0 && a < INT64_MIN + b)) upt_overflow();
+    return a - b;
+}
+static inline int64_t upt_mul(int64_t a, int64_t b) {
+    if (a > 0 ? (b > 0 ? a > INT64_MAX / b : b < INT64_MIN / a)
+              : (b > 0 ? a < INT64_MIN / b : (a != 0 && b < INT64_MAX / a))) upt_overflow();
+    return a * b;
+}
+#endif
+
+static inline int64_t upt_neg(int64_t a) {
+    if (a == INT64_MIN) upt_overflow();
+    return -a;
+}
+
+static inline int64_t upt_div(int64_t a, int64_t b) {
+    if (b == 0) upt_error("Division by zero");
+    if (b == -1) return upt_neg(a);
+    return a / b;
+}
+
+static inline int64_t upt_mod(int64_t a, int64_t b) {
+    if (b == 0) upt_error("Division by zero");
+    if (b == -1) return 0;
+    return a % b;
+}
+
+static int64_t upt_pow(int64_t a, int64_t b) {
+    int64_t r = 1;
+    if (b < 0) upt_error("Negative exponent");
+    while (b) {
+        if (b & 1) r = upt_mul(r, a);
+        b >>= 1;
+        if (b) a = upt_mul(a, a);
+    }
+    return r;
+}
+
+static int64_t upt_read(void) {
+    int64_t v;
+    if (scanf("%" SCNd64, &v) != 1) upt_error("read() past end of input");
+    return v;
+}
+
+static void upt_print_int(int64_t v) {
+    printf("%" PRId64, v);
+}
+
+static void upt_print_bool(bool v) {
+    fputs(v ? "true" : "false", stdout);
+}
+'''
+
+CTYPES = {'int': 'int64_t', 'bool': 'bool', 'void': 'void'}
+
+BINARY = {'+': 'upt_add', '-': 'upt_sub', '*': 'upt_mul', '/': 'upt_div', '%': 'upt_mod', '**': 'upt_pow'}
+COMPARE = {'==': '==', '!=': '!=', '<': '<', '>': '>', '<=': '<=', '>=': '>='}
+
+def _default(var_type):
+    return 'false' if var_type == 'bool' else '0'
+
+# ---- code generation ----
+
+class _FunctionWriter:
+    def __init__(self, types, scope, functions, is_main):
+        self.types = types            # id(expression) -> type, from uptcheck
+        self.scope = scope            # uptscope.Scope of this function
+        self.functions = functions    # name -> uptscope.Symbol
+        self.is_main = is_main
+        self.lines = []
+        self.depth = 1
+        self.loops = 0
+        self.temps = 0
+        self.pure = {}                # id(node) -> no calls, reads or assignments
+
+    def line(self, text):
+        self.lines.append('    ' * self.depth + text)
+
+    def var(self, name):
+        symbol = self.scope.uses[name]
+        return ('v_' if symbol.depth == self.scope.depth and not self.is_main else 'g_') + name
+
+    def temp(self, var_type, value):
+        name = f"t{self.temps}"
+        self.temps += 1
+        self.line(f"{CTYPES[var_type]} {name} = {value};")
+        return name
+
+    def type_of(self, e):
+        kind = expr_kind(e)
+        if kind == 'INT' or kind == 'Read':
+            return 'int'
+        if kind == 'BOOL':
+            return 'bool'
+        if kind == 'ID':
+            return self.scope.uses[e].type
+        return self.types[id(e)]
+
+    def is_pure(self, e):
+        if not isinstance(e, Node):
+            return True
+        key = id(e)
+        if key not in self.pure:
+            tag = e.tag
+            if tag == 'FunctionCall' or tag == 'Read' or tag == 'BinOp' and e.op == '=':
+                result = False
+            elif tag == 'BinOp':
+                result = self.is_pure(e.left) and self.is_pure(e.right)
+            elif tag == 'UnOp':
+                result = self.is_pure(e.operand)
+            else:
+                result = self.is_pure(e.expr)
+            self.pure[key] = result
+        return self.pure[key]
+
+    def operands(self, exprs):
+        # C atoms of exprs evaluated left to right; a variable is copied if
+        # something after it may assign it
+        atoms = []
+        for k, e in enumerate(exprs):
+            atom = self.expr(e)
+            if expr_kind(e) == 'ID' and not all(self.is_pure(later) for later in exprs[k + 1:]):
+                atom = self.temp(self.type_of(e), atom)
+            atoms.append(atom)
+        return atoms
+
+    # ---- commands ----
+
+    def block(self, node):
+        self.depth += 1
+        self.cmd(node)
+        self.depth -= 1
+
+    def cmd(self, node):
+        tag = node.tag
+        if tag == 'CmdAtrib':
+            self.expr_stmt(node.expr)
+        elif tag == 'CmdSeq':
+            for cmd in node.cmds:
+                self.cmd(cmd)
+        elif tag == 'CmdIf':
+            cond = self.expr(node.cond)
+            self.line(f"if ({cond}) {{")
+            self.block(node.then)
+            if node.orelse is not None:
+                self.line('} else {')
+                self.block(node.orelse)
+            self.line('}')
+        elif tag == 'CmdWhile':
+            # the condition may need statements of its own
+            self.line('for (;;) {')
+            self.depth += 1
+            self.line(f"if (!{self.expr(node.cond)}) break;")
+            self.loops += 1
+            self.cmd(node.body)
+            self.loops -= 1
+            self.depth -= 1
+            self.line('}')
+        elif tag == 'CmdFor':
+            init = node.init
+            var = init.left if is_assign(init) else init
+            if expr_kind(var) != 'ID':
+                raise Exception("Semantic error: for loop needs a variable")
+            self.expr_stmt(init)
+            limit = self.temp('int', self.expr(node.limit))
+            v = self.var(var)
+            self.line(f"while ({v} <= {limit}) {{")
+            self.depth += 1
+            self.loops += 1
+            self.cmd(node.body)
+            self.loops -= 1
+            self.line(f"{v} = upt_add({v}, 1);")
+            self.depth -= 1
+            self.line('}')
+        elif tag == 'CmdBreak':
+            if not self.loops:
+                raise Exception("Semantic error: break outside of a loop")
+            self.line('break;')
+        elif tag == 'CmdPrint':
+            values = self.operands(node.args)
+            for k, (e, value) in enumerate(zip(node.args, values)):
+                if k:
+                    self.line("putchar(' ');")
+                self.line(f"upt_print_{self.type_of(e)}({value});")
+            self.line("putchar('\\n');")
+        elif tag == 'CmdReturn':
+            if self.is_main:
+                self.expr_stmt(node.value)
+                self.line('return;')
+            else:
+                self.line(f"return {self.expr(node.value)};")
+        else:
+            raise Exception(f"Unknown command '{tag}'")
+
+    def expr_stmt(self, e):
+        if is_assign(e):
+            self.assign(e)
+        elif isinstance(e, Node):
+            self.expr(e)
+
+    def assign(self, e):
+        if expr_kind(e.left) != 'ID':
+            raise Exception("Semantic error: Invalid assignment target")
+        target = self.var(e.left)
+        self.line(f"{target} = {self.expr(e.right)};")
+        return target
+
+    # ---- expressions ----
+
+    def expr(self, e):
+        kind = expr_kind(e)
+        if kind == 'INT':
+            if e > 2**63 - 1:
+                raise Exception(f"integer constant {e} does not fit the C back end's 64 bits")
+            return f"INT64_C({e})"
+        if kind == 'BOOL':
+            return e
+        if kind == 'ID':
+            return self.var(e)
+        if kind == 'Read':
+            return self.temp('int', 'upt_read()')
+        if kind == 'Group':
+            return self.expr(e.expr)
+        if kind == 'UnOp':
+            if e.op == '-' and expr_kind(e.operand) == 'INT':
+                if e.operand == 2**63:
+                    return 'INT64_MIN'
+                if e.operand < 2**63:
+                    return f"INT64_C({-e.operand})"
+            operand = self.expr(e.operand)
+            if e.op == '-':
+                return self.temp('int', f"upt_neg({operand})")
+            return self.temp('bool', f"!{operand}")
+        if kind == 'FunctionCall':
+            symbol = self.functions.get(e.name)
+            if symbol is None:
+                raise Exception(f"Symbol '{e.name}' not declared")
+            call = f"f_{e.name}({', '.join(self.operands(e.args))})"
+            if symbol.type == 'void':
+                self.line(call + ';')
+                return None
+            return self.temp(symbol.type, call)
+        op = e.op
+        if op == '=':
+            return self.temp(self.type_of(e), self.assign(e))
+        if op == 'and' or op == 'or':
+            # the right operand only runs when the left one does not decide
+            result = self.temp('bool', self.expr(e.left))
+            self.line(f"if ({'' if op == 'and' else '!'}{result}) {{")
+            self.depth += 1
+            self.line(f"{result} = {self.expr(e.right)};")
+            self.depth -= 1
+            self.line('}')
+            return result
+        left, right = self.operands([e.left, e.right])
+        if op in BINARY:
+            return self.temp('int', f"{BINARY[op]}({left}, {right})")
+        return self.temp('bool', f"{left} {COMPARE[op]} {right}")
+
+def _signature(fn):
+    params = ', '.join(f"{CTYPES[p.type]} v_{p.name}" for p in fn.params) or 'void'
+    return f"static {CTYPES[fn.rtype]} f_{fn.name}({params})"
+
+def generate(ast):
+    # C source of a parsed program; type errors raise like uptcheck's
+    resolution = resolve(ast)
+    types = TypeChecker(ast, resolution).check()
+    functions = {symbol.name: symbol for symbol in resolution.globals.functions}
+
+    out = [f"/* UPT program {ast.name} */", RUNTIME]
+    for symbol in resolution.globals.variables:
+        out.append(f"static {CTYPES[symbol.type]} g_{symbol.name} = {_default(symbol.type)};")
+    out.append('')
+    for fn in ast.funcs:
+        out.append(_signature(fn) + ';')
+    out.append('')
+    for fn, scope in zip(ast.funcs, resolution.scopes):
+        writer = _FunctionWriter(types, scope, functions, False)
+        for var in fn.local_vars:
+            writer.line(f"{CTYPES[var.type]} v_{var.name} = {_default(var.type)};")
+        for cmd in fn.body:
+            writer.cmd(cmd)
+        if fn.rtype != 'void':
+            writer.line(f"return {_default(fn.rtype)};")
+        out.append(_signature(fn) + ' {')
+        out.extend(writer.lines)
+        out.append('}')
+        out.append('')
+
+    writer = _FunctionWriter(types, resolution.globals, functions, True)
+    writer.cmd(ast.main)
+    out.append('static void upt_main(void) {')
+    out.extend(writer.lines)
+    out.append('}')
+    out.append('')
+    out.append('int main(void) {')
+    out.append('    static char buffer[1 << 16];')
+    out.append('    setvbuf(stdout, buffer, _IOFBF, sizeof buffer);')
+    out.append('    upt_main();')
+    out.append('    fflush(stdout);')
+    out.append('    return 0;')
+    out.append('}')
+    out.append('')
+    return '\n'.join(out)
+
+# ---- building ----
+
+def find_compiler():
+    # the command to compile with, as a list: $CC or the first of cc, gcc, clang
+    cc = os.environ.get('CC')
+    if cc:
+        return shlex.split(cc)
+    for name in ('cc', 'gcc', 'clang'):
+        path = shutil.which(name)
+        if path:
+            return [path]
+    raise Exception("C back end: no C compiler found (set CC)")
+
+def default_cache_dir():
+    # beside the parse cache, not inside it: each trims its own directory
+    return uptcache.default_cache_dir() + '-c'
+
+class ExecutableCache(uptcache.CompileCache):
+    # compiled programs, keyed by C source, compiler and flags
+    def __init__(self, directory=None, max_bytes=64 * 1024 * 1024):
+        super().__init__(directory or default_cache_dir(), max_bytes)
+
+    def key(self, build):
+        return hashlib.sha256(build.encode('utf-8')).hexdigest()
+
+    def get(self, build):
+        path = self.path(self.key(build))
+        if not os.access(path, os.X_OK):
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return path
+
+    def put(self, build, data):
+        path = self.path(self.key(build))
+        self.store(path, data, 0o755)
+        return path
+
+def build(ast, cache=None, cc=None, cflags=CFLAGS):
+    # the path of the program's executable, compiled unless cached
+    csource = generate(ast)
+    cc = cc or find_compiler()
+    cache = cache if cache is not None else ExecutableCache()
+    description = '\0'.join(cc + list(cflags) + [csource])
+    path = cache.get(description)
+    if path is not None:
+        return path
+    with tempfile.TemporaryDirectory(prefix='uptc-') as work:
+        c_path = os.path.join(work, 'program.c')
+        exe_path = os.path.join(work, 'program')
+        with open(c_path, 'w') as f:
+            f.write(csource)
+        proc = subprocess.run(cc + list(cflags) + ['-o', exe_path, c_path],
+                              capture_output=True, text=True)
+        if proc.returncode:
+            raise Exception(f"C back end: {' '.join(cc)} failed:\n{proc.stderr.strip()}")
+        with open(exe_path, 'rb') as f:
+            return cache.put(description, f.read())
+
+# ---- running ----
+
+def run(path, inputs=None, out=None):
+    # inputs go to stdin one per line (None: the program reads our stdin);
+    # runtime errors raise like the python back ends' do
+    if inputs is not None:
+        stdin = ''.join(f"{format_value(v)}\n" for v in inputs)
+    elif sys.stdin is not sys.__stdin__:
+        # stdin was replaced (uptserver): the program gets what it holds
+        stdin = sys.stdin.read()
+    else:
+        stdin = None
+    proc = subprocess.run([path], input=stdin, capture_output=True, text=True)
+    (out or sys.stdout).write(proc.stdout)
+    if proc.returncode:
+        message = proc.stderr.strip()
+        if proc.returncode < 0:
+            message = f"Runtime error: the program was killed by signal {-proc.returncode}"
+        raise Exception(message or f"Runtime error: exit status {proc.returncode}")
+
+def execute(ast, inputs=None, out=None, cache=None):
+    run(build(ast, cache), inputs, out)
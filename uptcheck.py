@@ -0,0 +1,211 @@
+from uptast import Node
+from uptscope import resolve
+from uptsource import LineIndex
+
+# ---------------- Type checker -------------------------
+#
+# One pass over a parsed program. Every expression node is typed once,
+# bottom up, and its type is kept in TypeChecker.types, so checking is linear
+# in the size of the AST however the expressions nest. Both the commands and
+# the expressions are walked with explicit stacks: a chain of thousands of
+# operators is as deep as it is long.
+#
+# Types are 'int', 'bool' and 'void' (the result of a void function, only
+# allowed as a statement of its own). Variables get their declared types
+# from uptscope.resolve(); names nobody declared are int.
+
+INT = 'int'
+BOOL = 'bool'
+VOID = 'void'
+
+ARITHMETIC = frozenset(('+', '-', '*', '/', '%', '**'))
+ORDERING = frozenset(('<', '>', '<=', '>='))
+EQUALITY = frozenset(('==', '!='))
+LOGICAL = frozenset(('and', 'or'))
+
+def _children(node):
+    tag = node.tag
+    if tag == 'BinOp':
+        return (node.left, node.right)
+    if tag == 'UnOp':
+        return (node.operand,)
+    if tag == 'Group':
+        return (node.expr,)
+    if tag == 'FunctionCall':
+        return node.args
+    return ()
+
+class TypeChecker:
+    # source is only used to turn offsets into line and column in messages
+    def __init__(self, ast, resolution=None, source=None):
+        self.ast = ast
+        self.resolution = resolution or resolve(ast)
+        self.source = source
+        self.types = {}      # id(expression node) -> type
+        self.offset = None   # of the command being checked
+
+    def error(self, message, offset=None):
+        message = "Semantic error: " + message
+        if offset is None:
+            offset = self.offset
+        if self.source is not None and offset is not None:
+            line, column = LineIndex(self.source).position(offset)
+            message += f" at line {line}, column {column}"
+        raise Exception(message)
+
+    def check(self):
+        resolution = self.resolution
+        for fn, scope in zip(self.ast.funcs, resolution.scopes):
+            self.offset = fn.offset
+            self.commands(fn.body, scope, fn.rtype)
+        self.commands([self.ast.main], resolution.globals, None)
+        return self.types
+
+    # ---- commands ----
+
+    def commands(self, cmds, scope, rtype):
+        # rtype is None in the main program; loops counts the while and for
+        # loops around a command, a break needs one
+        stack = [(cmd, self.offset, 0) for cmd in reversed(cmds)]
+        while stack:
+            node, offset, loops = stack.pop()
+            if node.offset is not None:
+                offset = node.offset
+            self.offset = offset
+            tag = node.tag
+            if tag == 'CmdAtrib':
+                e = node.expr
+                if isinstance(e, Node) and e.tag == 'FunctionCall':
+                    self.expr(e, scope)    # a void call is fine here
+                else:
+                    self.value(e, scope)
+            elif tag == 'CmdSeq':
+                stack.extend((cmd, offset, loops) for cmd in reversed(node.cmds))
+            elif tag == 'CmdIf':
+                self.condition(node.cond, scope, 'if')
+                if node.orelse is not None:
+                    stack.append((node.orelse, offset, loops))
+                stack.append((node.then, offset, loops))
+            elif tag == 'CmdWhile':
+                self.condition(node.cond, scope, 'while')
+                stack.append((node.body, offset, loops + 1))
+            elif tag == 'CmdFor':
+                init = node.init
+                var = init.left if isinstance(init, Node) and init.tag == 'BinOp' and init.op == '=' else init
+                if not isinstance(var, str) or self.expr(var, scope) != INT:
+                    self.error("for loop needs an int variable")
+                self.value(init, scope)
+                if self.expr(node.limit, scope) != INT:
+                    self.error("for loop limit must be int")
+                stack.append((node.body, offset, loops + 1))
+            elif tag == 'CmdBreak':
+                if not loops:
+                    self.error("break outside of a loop")
+            elif tag == 'CmdPrint':
+                for e in node.args:
+                    self.value(e, scope)
+            elif tag == 'CmdReturn':
+                t = self.value(node.value, scope)
+                if rtype == VOID:
+                    self.error("void function returns a value")
+                if rtype is not None and t != rtype:
+                    self.error(f"function returns {rtype}, not {t}")
+
+    def condition(self, e, scope, what):
+        t = self.expr(e, scope)
+        if t != BOOL:
+            self.error(f"{what} condition must be bool, not {t}")
+
+    def value(self, e, scope):
+        t = self.expr(e, scope)
+        if t == VOID:
+            self.error("void value used in an expression")
+        return t
+
+    # ---- expressions ----
+
+    def leaf(self, e, scope):
+        if isinstance(e, bool):
+            return BOOL
+        if isinstance(e, int):
+            return INT
+        if e == 'true' or e == 'false':
+            return BOOL
+        return scope.uses[e].type
+
+    def expr(self, e, scope):
+        if not isinstance(e, Node):
+            return self.leaf(e, scope)
+        types = self.types
+        # post order: a node is typed once all its children are
+        stack = [e]
+        while stack:
+            node = stack[-1]
+            if id(node) in types:
+                stack.pop()
+                continue
+            pending = [c for c in _children(node) if isinstance(c, Node) and id(c) not in types]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            types[id(node)] = self.synthesize(node, scope)
+        return types[id(e)]
+
+    def type_of(self, e, scope):
+        # e's children have been typed already
+        return self.types[id(e)] if isinstance(e, Node) else self.leaf(e, scope)
+
+    def synthesize(self, node, scope):
+        tag = node.tag
+        at = node.offset
+        if tag == 'Group':
+            return self.type_of(node.expr, scope)
+        if tag == 'Read':
+            return INT
+        if tag == 'UnOp':
+            t = self.type_of(node.operand, scope)
+            expected = BOOL if node.op == 'not' else INT
+            if t != expected:
+                self.error(f"operator '{node.op}' expects {expected}, not {t}", at)
+            return t
+        if tag == 'FunctionCall':
+            symbol = self.resolution.globals.symbols[node.name]
+            if len(node.args) != len(symbol.params):
+                self.error(f"Function '{node.name}' expects {len(symbol.params)} arguments, "
+                           f"got {len(node.args)}", at)
+            for k, (arg, expected) in enumerate(zip(node.args, symbol.params), 1):
+                t = self.type_of(arg, scope)
+                if t != expected:
+                    self.error(f"argument {k} of '{node.name}' must be {expected}, not {t}", at)
+            return symbol.type
+        # BinOp
+        op = node.op
+        left = self.type_of(node.left, scope)
+        right = self.type_of(node.right, scope)
+        if op == '=':
+            target = node.left
+            if not isinstance(target, str) or target in ('true', 'false'):
+                self.error("Invalid assignment target", at)
+            if left != right:
+                self.error(f"cannot assign {right} to {left} variable '{target}'", at)
+            return left
+        if op in ARITHMETIC:
+            expected, result = INT, INT
+        elif op in ORDERING:
+            expected, result = INT, BOOL
+        elif op in LOGICAL:
+            expected, result = BOOL, BOOL
+        elif op in EQUALITY:
+            if left != right or left == VOID:
+                self.error(f"operator '{op}' compares {left} with {right}", at)
+            return BOOL
+        else:
+            self.error(f"unknown operator '{op}'", at)
+        if left != expected or right != expected:
+            self.error(f"operator '{op}' expects {expected} operands, got {left} and {right}", at)
+        return result
+
+def check(ast, source=None):
+    # types of every expression node, by id(); raises on the first error
+    return TypeChecker(ast, source=source).check()
@@ -0,0 +1,149 @@
+import marshal
+import os
+import stat
+import sys
+
+# ---------------- Compile server client -------------------------
+#
+#   python uptserver.py &                          # once
+#   python uptclient.py prog.upt -O2 --run vm      # same arguments as uptc.py
+#
+# Sends the command line to the server (uptserver.py) over its Unix socket
+# and prints what uptc would have printed, with its exit status. When no
+# server listens on the socket it runs uptc in this process instead, so the
+# result is the same either way, only slower.
+#
+# The client is what a build runs per file, so it imports next to nothing:
+# no PLY, no tables, and not even json, re, socket (enum) or tempfile, which
+# would double the time python takes to start. Messages are dicts of
+# strings, ints and lists, marshalled, each behind its length in 8 bytes.
+#
+# Differences from running uptc.py directly: files are read by the server,
+# from the client's working directory; of the environment only ENVIRONMENT
+# is passed on; and a program run without --input gets all of stdin at
+# once, read before the request is sent. When stdin is a terminal the
+# program could prompt for its input, so it runs here as with uptc.py.
+#
+# The socket is $UPTC_SOCKET, by default uptc.sock in $XDG_RUNTIME_DIR, or
+# else in a directory uptc-<uid> of $TMPDIR or /tmp that only its owner may
+# enter. Sources and stdin go to the server and its output is trusted, so
+# both ends make sure the other runs as the same user (SO_PEERCRED where
+# the platform has it), and the client does not use a default directory
+# others can reach: anything wrong and the client compiles by itself.
+
+ENVIRONMENT = ('UPTC_CACHE_DIR', 'XDG_CACHE_HOME', 'CC')
+
+def default_socket_dir():
+    runtime = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime:
+        return runtime
+    return os.path.join(os.environ.get('TMPDIR') or '/tmp', f'uptc-{os.getuid()}')
+
+def default_socket_path():
+    return os.environ.get('UPTC_SOCKET') or os.path.join(default_socket_dir(), 'uptc.sock')
+
+def is_private_dir(path):
+    # a real directory of this user, closed to everyone else
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+def peer_uid(sock):
+    # uid of the process at the other end of a Unix socket, None if the
+    # platform does not tell
+    import _socket
+    if not hasattr(_socket, 'SO_PEERCRED'):
+        return None
+    # struct ucred: pid, uid, gid as native ints
+    cred = sock.getsockopt(_socket.SOL_SOCKET, _socket.SO_PEERCRED, 12)
+    return int.from_bytes(cred[4:8], sys.byteorder)
+
+def encode(message):
+    data = marshal.dumps(message)
+    return len(data).to_bytes(8, 'big') + data
+
+def connect(path=None):
+    # raises OSError if no server of this user listens
+    import _socket
+    if path is None:
+        path = default_socket_path()
+        if 'UPTC_SOCKET' not in os.environ and not is_private_dir(os.path.dirname(path)):
+            raise PermissionError(f"{os.path.dirname(path)} is not a private directory")
+    sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        uid = peer_uid(sock)
+        if uid is not None and uid != os.getuid():
+            raise PermissionError(f"{path} is served by uid {uid}")
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+def _receive(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("the compile server closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+def exchange(sock, message):
+    # one request, one response (dicts)
+    sock.sendall(encode(message))
+    size = int.from_bytes(_receive(sock, 8), 'big')
+    return marshal.loads(_receive(sock, size))
+
+def request(message, path=None):
+    sock = connect(path)
+    try:
+        return exchange(sock, message)
+    finally:
+        sock.close()
+
+def reads_stdin(argv):
+    # uptc reads read() values from stdin when running without --input
+    # (uptc takes no abbreviations of either, so these are the only spellings)
+    return (any(a == '--run' or a.startswith('--run=') for a in argv)
+            and not any(a == '--input' or a.startswith('--input=') for a in argv))
+
+def uptc_request(argv, stdin=None):
+    message = {
+        'op': 'uptc',
+        'argv': list(argv),
+        'cwd': os.getcwd(),
+        'env': {name: os.environ[name] for name in ENVIRONMENT if name in os.environ},
+    }
+    if stdin is None and reads_stdin(argv):
+        stdin = sys.stdin.read()
+    if stdin is not None:
+        message['stdin'] = stdin
+    return message
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    sock = None
+    # at a terminal read() waits for each line typed, one request can't
+    if not (reads_stdin(argv) and sys.stdin.isatty()):
+        try:
+            sock = connect()
+        except OSError:
+            pass
+    if sock is None:
+        # no server: stdin is still unread, uptc gets it as usual
+        import uptc
+        return uptc.main(argv)
+    try:
+        response = exchange(sock, uptc_request(argv))
+    finally:
+        sock.close()
+    sys.stdout.write(response['stdout'])
+    sys.stderr.write(response['stderr'])
+    return response['status']
+
+if __name__ == '__main__':
+    sys.exit(main())
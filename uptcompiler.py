@@ -0,0 +1,203 @@
+import copy
+import time
+from contextlib import nullcontext
+
+import uptopt
+from uptscope import SymbolTable
+from uptsource import SourceFile
+
+# ---------------- Compiler sessions -------------------------
+#
+# A Compiler owns its own lexer clone, parser and symbol table, so any number
+# of programs can be compiled one after the other, or from several threads
+# with one Compiler each. The lexer and parser are only created when a source
+# actually has to be parsed (cache hits never need them).
+# scanner='fast' feeds the parser from uptscan's bulk scanner instead of the
+# PLY lexer; both produce the same tokens.
+# compile_file() maps the file into memory (uptsource.SourceFile). The fast
+# scanner reads the mapped bytes as they are, the PLY lexer needs them
+# decoded to one str first.
+# With a uptprofile.Profile every phase is timed and measured into it, and
+# parses go through its instrumented lexer and parser.
+# jobs > 1 parses sources with many functions across that many processes
+# (uptparallel), falling back to this process for small files and errors;
+# not with a profile, whose instruments live in this process.
+# scanner='guarded' lexes with uptguard, in time linear in the source and
+# within limits (a uptguard.Limits), for input that may be anything: any
+# lexical error raises uptguard.LexFailure before parsing. It never parses
+# in parallel (the workers lex with PLY) and only takes cache entries a
+# guarded parse stored, since the PLY lexer skips illegal characters.
+# Offsets in the AST count bytes when the fast scanner reads a mapped file
+# or bytes, and characters otherwise (every other path lexes decoded text);
+# units() says which, and check() places its messages in the same units.
+# The cache keys entries on it too.
+
+SCANNERS = ('ply', 'fast', 'guarded')
+
+_UNPROFILED = nullcontext()
+
+class CompileResult:
+    def __init__(self, path):
+        self.path = path
+        self.ast = None
+        self.program = None
+        self.report = []
+        self.timings = {}
+        self.error = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def as_dict(self):
+        return {
+            'path': self.path,
+            'ok': self.ok,
+            'error': self.error,
+            'timings': self.timings,
+            'passes': [(r.name, r.changes) for r in self.report],
+        }
+
+class Compiler:
+    def __init__(self, cache=None, level=1, scanner='ply', profile=None, jobs=1, limits=None):
+        if scanner not in SCANNERS:
+            raise Exception(f"Unknown scanner '{scanner}'")
+        self.cache = cache
+        self.level = level
+        self.scanner = scanner
+        self.profile = profile
+        self.jobs = jobs
+        self.limits = limits
+        self.symtab = SymbolTable()
+        self._lexer = None
+        self._parser = None
+        self.illegal = 0
+
+    def _create_parser(self):
+        from uptparser import get_parser
+        if self.scanner == 'fast':
+            from uptscan import TokenStream
+            self._lexer = TokenStream()
+        elif self.scanner == 'guarded':
+            from uptguard import GuardedLexer
+            self._lexer = GuardedLexer(self.limits)
+        else:
+            from uptlexer import get_lexer
+            self._lexer = get_lexer().clone()
+        # parse state lives on the parser object, the tables are shared
+        self._parser = copy.copy(get_parser())
+
+    def units(self, source):
+        # what offsets in the AST of source count, 'bytes' or 'chars'
+        return 'bytes' if self.scanner == 'fast' and not isinstance(source, str) else 'chars'
+
+    def _parse_source(self, source):
+        if self.jobs > 1 and self.profile is None and self.scanner != 'guarded':
+            import uptparallel
+            text = source if isinstance(source, str) else str(source, 'utf-8')
+            # the workers lex text: their offsets count bytes as well only
+            # if every character is one byte
+            if self.units(source) == 'bytes' and len(text) != len(source):
+                result = None
+            else:
+                result = uptparallel.parse(text, self.jobs)
+            if result is not None:
+                # the workers fall back to this process on illegal characters
+                ast, self.symtab = result
+                self.illegal = 0
+                return ast
+        if self._parser is None:
+            with self._phase('setup'):
+                self._create_parser()
+        # the guarded lexer decodes (or refuses) the source itself
+        if self.scanner == 'ply' and not isinstance(source, str):
+            source = str(source, 'utf-8')
+        self.symtab = SymbolTable()
+        self._parser.symtab = self.symtab
+        self._lexer.lineno = 1
+        self._lexer.illegal = 0
+        if self.profile is not None:
+            ast = self.profile.parse(self._lexer, self._parser, source)
+        else:
+            ast = self._parser.parse(source, lexer=self._lexer)
+        # illegal characters the lexer reported and skipped
+        self.illegal = self._lexer.illegal
+        return ast
+
+    def _phase(self, name):
+        if self.profile is None:
+            return _UNPROFILED
+        return self.profile.phase(name)
+
+    def parse(self, source):
+        with self._phase('parse'):
+            units = self.units(source)
+            if self.cache is not None:
+                entry = self.cache.get(source, units)
+                if entry is not None and (self.scanner != 'guarded' or entry.get('guarded')):
+                    if self.profile is not None:
+                        self.profile.counters['cache_hits'] += 1
+                    self.symtab = entry['symbols']
+                    return entry['ast']
+            ast = self._parse_source(source)
+            # a cache hit would skip the illegal character messages, so a
+            # source that has any is parsed (and reported) every time
+            if ast is not None and self.cache is not None and not self.illegal:
+                self.cache.put(source, {'ast': ast, 'symbols': self.symtab,
+                                        'guarded': self.scanner == 'guarded'}, units)
+            return ast
+
+    def check(self, ast, source=None):
+        # semantic and type errors raise; source places them in the file
+        from uptcheck import TypeChecker
+        if source is not None and self.units(source) == 'chars' and not isinstance(source, str):
+            source = str(source, 'utf-8')
+        with self._phase('check'):
+            return TypeChecker(ast, source=source).check()
+
+    def optimize(self, ast):
+        with self._phase('optimize'):
+            ast, report = uptopt.optimize(ast, self.level)
+        if self.profile is not None:
+            self.profile.passes.extend(report)
+        return ast, report
+
+    def codegen(self, ast):
+        import uptvm
+        with self._phase('codegen'):
+            return uptvm.compile_program(ast)
+
+    def compile(self, source, path=None):
+        # parse, type check, optimize and lower to VM bytecode; errors end up
+        # in result.error
+        result = CompileResult(path)
+        clock = time.perf_counter
+        try:
+            start = clock()
+            ast = self.parse(source)
+            result.timings['parse'] = clock() - start
+            if ast is None:
+                raise Exception("Syntax error")
+            start = clock()
+            self.check(ast, source)
+            result.timings['check'] = clock() - start
+            start = clock()
+            ast, result.report = self.optimize(ast)
+            result.timings['optimize'] = clock() - start
+            start = clock()
+            result.program = self.codegen(ast)
+            result.timings['codegen'] = clock() - start
+            result.ast = ast
+        except Exception as e:
+            result.error = str(e)
+        return result
+
+    def compile_file(self, path):
+        try:
+            source = SourceFile(path)
+        except OSError as e:
+            result = CompileResult(path)
+            result.error = str(e)
+            return result
+        with source:
+            return self.compile(source.data, path)
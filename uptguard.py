@@ -0,0 +1,269 @@
+import re
+import time
+from functools import partial
+
+from uptlexer import reserved
+from uptscan import Token
+from uptsource import LineIndex
+
+# ---------------- Guarded lexer -------------------------
+#
+#   tokens, errors = uptguard.tokenize(source, Limits(max_errors=10))
+#   Compiler(scanner='guarded', limits=Limits(seconds=0.5)).parse(source)
+#
+# A lexer for input nobody vouches for: truncated files, garbage, whatever
+# a fuzzer or an upload form sends. The PLY lexer (and uptscan, built from
+# its regex) has two bad cases there. At a '(*' with no '*)' after it the
+# lazy comment rule reads to the end of the input before failing, so n
+# unterminated openers take O(n^2); and t_error prints and skips one
+# character at a time, a line of output per character of garbage.
+#
+# This one reads the source once, left to right:
+# - comments are found with str.find, and the end of one with one more
+#   str.find from its opener; an unterminated '(*' is an error that runs to the end
+#   of the input (where PLY lexes '(' '*' and goes on)
+# - the code between comments is matched with one regex whose alternatives
+#   never look past their own match (no \b anchors: a word is matched whole,
+#   then classified)
+# - a run of characters no token starts with is one error, as is a word
+#   that is neither an ID nor an INT ('12abc', '_x'); adjacent ones merge
+# so lexing takes time linear in the input, whatever it holds. Errors are
+# LexError records, kept instead of printed, and Limits end lexing early:
+# past max_errors errors, max_bytes of input (checked before a bytes source
+# is even decoded) or a time budget in seconds. Hitting a limit is the last
+# error, of kind 'limit'.
+#
+# A valid program gets exactly the PLY lexer's tokens, values, offsets and
+# line numbers (benchmarks/bench_guard.py checks it).
+#
+# GuardedLexer is the lexer interface yacc needs; its input() raises
+# LexFailure, with every error, if there were any, so nothing is parsed
+# from a source that did not lex cleanly.
+
+# kinds of errors
+ILLEGAL = 'illegal'      # characters no token is made of
+NUMBER = 'number'        # an INT of more than MAX_DIGITS digits
+COMMENT = 'comment'      # a '(*' never closed
+ENCODING = 'encoding'    # bytes that are not UTF-8
+LIMIT = 'limit'          # one of the Limits, lexing stopped there
+
+# int() of a longer str is refused by python (and quadratic before that)
+MAX_DIGITS = 4300
+
+# how many matches go by between two looks at the clock
+_CLOCK_EVERY = 1024
+
+_CODE = re.compile(r'(?P<skip>[ \t]+)|(?P<newline>\n+)|(?P<word>\w+)'
+                   r'|(?P<op>\*\*|==|!=|<=|>=|[-+*/%<>=,:;(){}])'
+                   r'|(?P<illegal>[^\w \t\n\-+*/%<>=,:;(){}!]+|!)')
+
+_OP_TYPES = {'**': 'EXP', '==': 'EQUAL', '!=': 'NOTEQUAL', '<=': 'LESSEQUAL', '>=': 'GREATEREQUAL'}
+_OP_TYPES.update((c, c) for c in '+-*/%<>=,:;(){}')
+
+class LexError:
+    __slots__ = ('kind', 'offset', 'length', 'message')
+
+    def __init__(self, kind, offset, length, message):
+        self.kind = kind
+        self.offset = offset
+        self.length = length
+        self.message = message
+
+    def __repr__(self):
+        return f"LexError({self.kind!r}, {self.offset}, {self.length}, {self.message!r})"
+
+class Limits:
+    # None: no limit
+    def __init__(self, max_errors=100, max_bytes=64 << 20, seconds=None):
+        self.max_errors = max_errors
+        self.max_bytes = max_bytes
+        self.seconds = seconds
+
+class LexFailure(Exception):
+    def __init__(self, errors, text):
+        self.errors = errors
+        self.text = text
+        self._lines = None
+        first = self.describe(errors[0])
+        more = f" (and {len(errors) - 1} more lexical errors)" if len(errors) > 1 else ''
+        super().__init__(first + more)
+
+    def describe(self, error):
+        if self._lines is None:
+            self._lines = LineIndex(self.text)
+        line, column = self._lines.position(error.offset)
+        return f"{error.message} at line {line}, column {column}"
+
+class _Stop(Exception):
+    pass
+
+def _illegal_message(text, start, end):
+    shown = text[start:min(end, start + 20)] + ('...' if end - start > 20 else '')
+    if end - start == 1:
+        return "Illegal character %r" % shown
+    return "Illegal characters %r (%d)" % (shown, end - start)
+
+class GuardedLexer:
+    def __init__(self, limits=None):
+        self.limits = limits or Limits()
+        self.lexdata = ''
+        self.lineno = 1
+        self.lexpos = 0
+        self.tokens = []
+        self.errors = []
+        self._deadline = None
+
+    def input(self, source):
+        self.lex(source)
+        if self.errors:
+            raise LexFailure(self.errors, self.lexdata)
+        # yacc looks up lexer.token once per parse, after input()
+        self.token = partial(next, iter(self.tokens), None)
+
+    def token(self):
+        # until input() is called
+        return None
+
+    def clone(self):
+        return GuardedLexer(self.limits)
+
+    def lex(self, source):
+        # tokens and errors of source (str, bytes or a mapped file) into
+        # self.tokens and self.errors; offsets count characters
+        limits = self.limits
+        self.tokens = []
+        self.errors = []
+        self.lexdata = ''
+        self.lexpos = 0
+        self._deadline = None if limits.seconds is None else time.perf_counter() + limits.seconds
+        try:
+            if limits.max_bytes is not None and len(source) > limits.max_bytes:
+                unit = 'characters' if isinstance(source, str) else 'bytes'
+                self._error(LIMIT, 0, 0, f"Input of {len(source)} {unit}, more than {limits.max_bytes}")
+            undecodable = False
+            if not isinstance(source, str):
+                try:
+                    source = str(source, 'utf-8')
+                except UnicodeDecodeError as e:
+                    # lex what decodes, the error goes where that ends
+                    source = str(source[:e.start], 'utf-8')
+                    undecodable = True
+            self._scan(source)
+            if undecodable:
+                self._error(ENCODING, len(source), 0, "Invalid UTF-8")
+        except _Stop:
+            pass
+        self.lexdata = source if isinstance(source, str) else ''
+        self.lexpos = len(self.lexdata)
+        return self.tokens, self.errors
+
+    def _error(self, kind, offset, length, message):
+        errors = self.errors
+        max_errors = self.limits.max_errors
+        if max_errors is not None and len(errors) >= max_errors and kind != LIMIT:
+            errors.append(LexError(LIMIT, offset, 0, f"More than {max_errors} lexical errors"))
+            raise _Stop
+        errors.append(LexError(kind, offset, length, message))
+        if kind == LIMIT:
+            raise _Stop
+
+    def _illegal(self, text, start, end):
+        # one error for a run of them
+        errors = self.errors
+        if errors:
+            last = errors[-1]
+            if last.kind == ILLEGAL and last.offset + last.length == start:
+                last.length = end - last.offset
+                last.message = _illegal_message(text, last.offset, end)
+                return
+        self._error(ILLEGAL, start, end - start, _illegal_message(text, start, end))
+
+    def _check_clock(self, offset):
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            self._error(LIMIT, offset, 0, f"Lexing took more than {self.limits.seconds} seconds")
+
+    def _scan(self, text):
+        # comments, and the code between them. The next '#' and the next
+        # '(*' are each found with str.find, and only looked for again once
+        # pos is past them, so no character is searched twice.
+        self.lexdata = text
+        pos = 0
+        end = len(text)
+        line_comment = block_comment = -1
+        while pos < end:
+            if line_comment < pos:
+                line_comment = text.find('#', pos)
+                if line_comment < 0:
+                    line_comment = end
+            if block_comment < pos:
+                block_comment = text.find('(*', pos)
+                if block_comment < 0:
+                    block_comment = end
+            stop = min(line_comment, block_comment)
+            if pos < stop:
+                self._code(text, pos, stop)
+            if stop == end:
+                return
+            if stop == line_comment:
+                # the newline is not part of it
+                pos = text.find('\n', stop)
+                if pos < 0:
+                    return
+            else:
+                close = text.find('*)', stop + 2)
+                if close < 0:
+                    self._error(COMMENT, stop, end - stop, "Unterminated comment")
+                    return
+                pos = close + 2
+            self._check_clock(pos)
+
+    def _code(self, text, pos, end):
+        tokens = self.tokens
+        append = tokens.append
+        lineno = self.lineno
+        clock = _CLOCK_EVERY
+        for m in _CODE.finditer(text, pos, end):
+            kind = m.lastgroup
+            clock -= 1
+            if not clock:
+                clock = _CLOCK_EVERY
+                self._check_clock(m.start())
+            if kind == 'skip':
+                continue
+            value = m.group()
+            if kind == 'newline':
+                lineno += len(value)
+                continue
+            if kind == 'word':
+                # a \w run of ASCII is [a-zA-Z_0-9]
+                if value.isascii() and value[0].isalpha():
+                    type = reserved.get(value, 'ID')
+                elif value.isdecimal():
+                    if len(value) > MAX_DIGITS:
+                        self.lineno = lineno
+                        self._error(NUMBER, m.start(), len(value),
+                                    f"Integer of {len(value)} digits, more than {MAX_DIGITS}")
+                        continue
+                    type = 'INT'
+                    value = int(value)
+                else:
+                    self.lineno = lineno
+                    self._illegal(text, m.start(), m.end())
+                    continue
+            elif kind == 'op':
+                type = _OP_TYPES[value]
+            else:
+                self.lineno = lineno
+                self._illegal(text, m.start(), m.end())
+                continue
+            tok = Token()
+            tok.type = type
+            tok.value = value
+            tok.lineno = lineno
+            tok.lexpos = m.start()
+            append(tok)
+        self.lineno = lineno
+
+def tokenize(source, limits=None):
+    # ([Token], [LexError]): whatever lexed before a limit stopped it
+    return GuardedLexer(limits).lex(source)
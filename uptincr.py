@@ -0,0 +1,294 @@
+import copy
+
+from uptast import Node, CmdBreak
+from uptlexer import get_lexer
+from uptparser import get_parser
+from uptregion import Fallback, RegionTable, illegal, token
+from uptscope import SymbolTable
+
+# ---------------- Incremental reparsing -------------------------
+#
+# A Document holds the text of one program and its AST, for editors and
+# watch mode: each edit() replaces a range of the text and updates the AST
+# without reparsing the whole program when it can.
+#
+#   doc = Document(source)
+#   doc.edit(120, 125, 'x + 1')    # offsets into the current text
+#   doc.check()                    # uptcheck over the updated tree
+#
+# The text is split in regions: the header, one region per function (from
+# its return type to the next function), the global variables and the main
+# command. An edit inside one function, the globals or main lexes just that
+# region, in place in the full text so tokens get their real offsets, and
+# parses it wrapped in synthetic 'program _;' ... 'break' tokens against a
+# symbol table that already holds every function declared before it. The
+# result replaces that part of the AST; every other function, and every
+# entry of the symbol table, is kept as it is.
+#
+# Whenever the edit could change anything outside its region the whole text
+# is parsed again: edits in the header or across regions, a function whose
+# name, return type or parameter types changed (later functions may call
+# it), a region that no longer parses on its own (what it holds now may
+# depend on its neighbours, and the full parse reports the error), or a
+# token or comment that runs past the end of the region.
+#
+# Nodes after an edit keep the offsets they were parsed at until settle()
+# shifts them, which check() does; only that costs time in proportion to
+# the rest of the file. Where the regions start is kept up to date in
+# O(log n) per edit; splicing the text itself is one string copy.
+
+FUNCTION_TYPES = frozenset(('INTEGER', 'BOOL', 'VOID'))
+
+def _shift(node, delta):
+    # every offset in the subtree moves by delta
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if type(node) is list:
+            stack.extend(node)
+        elif isinstance(node, Node):
+            offset = node.offset
+            if offset is not None:
+                node.offset = offset + delta
+            for value in node.fields():
+                if isinstance(value, (Node, list)):
+                    stack.append(value)
+
+class _Starts:
+    # where each region starts: the offsets of the last full parse plus a
+    # Fenwick tree of the length changes of edits since, so moving every
+    # region after an edit and finding a region both take O(log n)
+    def __init__(self, starts):
+        self.base = list(starts)
+        self.tree = [0] * (len(self.base) + 1)
+
+    def __len__(self):
+        return len(self.base)
+
+    def __getitem__(self, index):
+        total = self.base[index]
+        i = index + 1
+        while i:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def shift_from(self, index, delta):
+        # regions index, index + 1, ... move by delta
+        tree = self.tree
+        i = index + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def find(self, offset):
+        # the last region starting at or before offset
+        lo, hi = 0, len(self.base)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self[mid] <= offset:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo - 1
+
+class Document:
+    def __init__(self, text):
+        self.text = text
+        self.ast = None
+        self.symtab = SymbolTable()
+        self.kinds = []
+        self.starts = _Starts(())
+        self.parsed_at = []
+        self.reparsed = {'full': 0, 'function': 0, 'globals': 0, 'main': 0}
+        self._lexer = get_lexer().clone()
+        self._region_lexer = get_lexer().clone()
+        self._region_lexer.lexerrorf = illegal
+        self._parser = copy.copy(get_parser())
+        self._quiet = copy.copy(self._parser)
+        self._quiet.errorfunc = self._syntax_error
+        self._failed = False
+        self._full_parse()
+
+    # ---- parsing ----
+
+    def _syntax_error(self, tok):
+        self._failed = True
+
+    def _tokens(self, lexer, start, end, marks=None):
+        # the tokens of text[start:end]; marks, if given, collects the
+        # offsets where top level functions and global variables start
+        lexer.input(self.text)
+        lexer.lexpos = start
+        lexer.lexlen = end
+        depth = 0
+        previous = None
+        while True:
+            tok = lexer.token()
+            # a token or comment that runs into the next region (at the end
+            # PLY leaves lexpos one past where it stopped)
+            if lexer.lexpos > (end if tok is not None else end + 1):
+                raise Fallback()
+            if tok is None:
+                return
+            if marks is not None:
+                t = tok.type
+                if t == '{':
+                    depth += 1
+                elif t == '}':
+                    depth -= 1
+                elif depth == 0:
+                    if t == 'FUNCTION' and previous is not None and previous.type in FUNCTION_TYPES:
+                        marks.append(('function', previous.lexpos))
+                    elif t == 'VAR':
+                        marks.append(('globals', tok.lexpos))
+                previous = tok
+            yield tok
+
+    def _full_parse(self):
+        self.reparsed['full'] += 1
+        self.symtab = SymbolTable()
+        self._parser.symtab = self.symtab
+        marks = []
+        self.ast = None
+        self.kinds = []
+        tokens = self._tokens(self._lexer, 0, len(self.text), marks)
+        self.ast = self._parser.parse(lexer=self._lexer, tokenfunc=lambda: next(tokens, None))
+        if self.ast is not None:
+            self._split(marks)
+        return self.ast
+
+    def _split(self, marks):
+        # regions from the marks of a full parse
+        boundaries = [('header', 0)]
+        for kind, offset in marks:
+            if kind == 'function' or boundaries[-1][0] != 'globals':
+                boundaries.append((kind, offset))
+        boundaries.append(('main', self.ast.main.offset))
+        self.kinds = [kind for kind, _ in boundaries]
+        self.starts = _Starts(offset for _, offset in boundaries)
+        # where each region started when its nodes' offsets were right
+        self.parsed_at = list(self.starts.base)
+
+    def region(self, index):
+        # (kind, start, end) of a region in the current text
+        end = self.starts[index + 1] if index + 1 < len(self.kinds) else len(self.text)
+        return self.kinds[index], self.starts[index], end
+
+    def _parse_region(self, index, table):
+        # the Program parsed from one region, or None if it does not parse
+        kind, start, end = self.region(index)
+        def tokens():
+            yield token('PROGRAM', 'program', start)
+            yield token('ID', '_', start)
+            yield token(';', ';', start)
+            yield from self._tokens(self._region_lexer, start, end)
+            if kind != 'main':
+                yield token('BREAK', 'break', end)
+        stream = tokens()
+        self._quiet.symtab = table
+        self._failed = False
+        try:
+            ast = self._quiet.parse(lexer=self._region_lexer, tokenfunc=lambda: next(stream, None))
+        except Exception:
+            # a Fallback, or a semantic error the full parse reports
+            return None
+        if self._failed or ast is None:
+            return None
+        return ast
+
+    # ---- edits ----
+
+    def _region_at(self, start, end):
+        # the index of the one region holding text[start:end], or None
+        index = self.starts.find(start)
+        if index < 0:
+            return None
+        # an insertion right at a boundary extends the region before it
+        if start == end == self.starts[index] and index > 0:
+            index -= 1
+        if end > self.region(index)[2]:
+            return None
+        return index
+
+    def edit(self, start, end, replacement):
+        # replace text[start:end]; returns the updated AST (None if the text
+        # no longer parses)
+        if not 0 <= start <= end <= len(self.text):
+            raise Exception(f"edit {start}:{end} outside of the text (length {len(self.text)})")
+        index = self._region_at(start, end) if self.ast is not None else None
+        self.text = self.text[:start] + replacement + self.text[end:]
+        if index is None or self.kinds[index] == 'header':
+            return self._full_parse()
+        self.starts.shift_from(index + 1, len(replacement) - (end - start))
+        if not self._reparse(index):
+            return self._full_parse()
+        self.reparsed[self.kinds[index]] += 1
+        return self.ast
+
+    def _reparse(self, index):
+        kind = self.kinds[index]
+        ast = self.ast
+        globals_ = self.symtab.globals
+        if kind == 'function':
+            number = index - 1    # the header comes first
+            new = self._parse_region(index, RegionTable(globals_, number))
+            if new is None or len(new.funcs) != 1 or new.global_vars or type(new.main) is not CmdBreak:
+                return False
+            old, fn = ast.funcs[number], new.funcs[0]
+            if (fn.name, fn.rtype, [p.type for p in fn.params]) != (old.name, old.rtype, [p.type for p in old.params]):
+                return False
+            ast.funcs[number] = fn
+        elif kind == 'globals':
+            table = RegionTable(globals_, len(globals_.functions))
+            new = self._parse_region(index, table)
+            if new is None or new.funcs or type(new.main) is not CmdBreak:
+                return False
+            ast.global_vars = new.global_vars
+            self._replace_globals(table.globals.variables)
+        else:
+            new = self._parse_region(index, RegionTable(globals_, len(globals_.functions)))
+            if new is None or new.funcs or new.global_vars:
+                return False
+            ast.main = new.main
+        # the new nodes have their real offsets already
+        self.parsed_at[index] = self.starts[index]
+        return True
+
+    def _replace_globals(self, symbols):
+        globals_ = self.symtab.globals
+        for symbol in globals_.variables:
+            del globals_.symbols[symbol.name]
+        globals_.variables = list(symbols)
+        for symbol in symbols:
+            globals_.symbols[symbol.name] = symbol
+
+    # ---- after edits ----
+
+    def _region_nodes(self, index):
+        kind = self.kinds[index]
+        if kind == 'function':
+            return [self.ast.funcs[index - 1]]
+        if kind == 'globals':
+            return self.ast.global_vars
+        if kind == 'main':
+            return [self.ast.main]
+        return []
+
+    def settle(self):
+        # bring every node's offset up to date with the text
+        if self.ast is None:
+            return
+        for index in range(len(self.kinds)):
+            start = self.starts[index]
+            if start != self.parsed_at[index]:
+                for node in self._region_nodes(index):
+                    _shift(node, start - self.parsed_at[index])
+                self.parsed_at[index] = start
+
+    def check(self):
+        from uptcheck import TypeChecker
+        if self.ast is None:
+            raise Exception("Syntax error")
+        self.settle()
+        return TypeChecker(self.ast, source=self.text).check()
@@ -0,0 +1,175 @@
+from uptast import Node, default_value
+from uptpure import MISSING
+from uptruntime import int_div, int_mod, int_pow, make_reader, make_printer
+
+# ---------------- Reference interpreter: walks the AST directly -------------------------
+#
+# Every step dispatches on the node tag string and variables live in dicts.
+# It is the baseline the faster back ends are checked and measured against.
+
+class _Break(Exception):
+    pass
+
+class _Return(Exception):
+    def __init__(self, value):
+        self.value = value
+
+class _Halt(Exception):
+    pass
+
+class Interpreter:
+    def __init__(self, ast, inputs=None, out=None, memo=None):
+        self.main = ast.main
+        self.functions = {fn.name: fn for fn in ast.funcs}
+        # uptpure.Memo per pure function, when memoizing
+        self.memos = {} if memo is None else memo.memos
+        self.globals = {v.name: default_value(v.type) for v in ast.global_vars}
+        self.read = make_reader(inputs)
+        self.print_values = make_printer(out)
+
+    def run(self):
+        try:
+            self.exec_cmd(self.main, None)
+        except _Halt:
+            pass
+
+    # frame is None at top level, otherwise the dict of the current function
+    def lookup(self, name, frame):
+        if frame is not None and name in frame:
+            return frame[name]
+        return self.globals.get(name, 0)
+
+    def assign(self, name, value, frame):
+        if frame is not None and name in frame:
+            frame[name] = value
+        else:
+            self.globals[name] = value
+
+    def exec_cmd(self, node, frame):
+        tag = node.tag
+        if tag == 'CmdAtrib':
+            if isinstance(node.expr, Node):
+                self.eval_expr(node.expr, frame)
+        elif tag == 'CmdSeq':
+            for cmd in node.cmds:
+                self.exec_cmd(cmd, frame)
+        elif tag == 'CmdIf':
+            if self.eval_expr(node.cond, frame):
+                self.exec_cmd(node.then, frame)
+            elif node.orelse is not None:
+                self.exec_cmd(node.orelse, frame)
+        elif tag == 'CmdWhile':
+            try:
+                while self.eval_expr(node.cond, frame):
+                    self.exec_cmd(node.body, frame)
+            except _Break:
+                pass
+        elif tag == 'CmdFor':
+            init = node.init
+            self.eval_expr(init, frame)
+            var = init.left if isinstance(init, Node) else init
+            limit = self.eval_expr(node.limit, frame)
+            try:
+                while self.lookup(var, frame) <= limit:
+                    self.exec_cmd(node.body, frame)
+                    self.assign(var, self.lookup(var, frame) + 1, frame)
+            except _Break:
+                pass
+        elif tag == 'CmdBreak':
+            raise _Break()
+        elif tag == 'CmdPrint':
+            self.print_values([self.eval_expr(e, frame) for e in node.args])
+        elif tag == 'CmdReturn':
+            value = self.eval_expr(node.value, frame)
+            if frame is None:
+                raise _Halt()
+            raise _Return(value)
+        else:
+            raise Exception(f"Unknown command '{tag}'")
+
+    def eval_expr(self, node, frame):
+        if type(node) is int:
+            return node
+        if type(node) is str:
+            if node == 'true':
+                return True
+            if node == 'false':
+                return False
+            return self.lookup(node, frame)
+        tag = node.tag
+        if tag == 'BinOp':
+            op = node.op
+            if op == '=':
+                value = self.eval_expr(node.right, frame)
+                self.assign(node.left, value, frame)
+                return value
+            if op == 'and':
+                return bool(self.eval_expr(node.left, frame)) and bool(self.eval_expr(node.right, frame))
+            if op == 'or':
+                return bool(self.eval_expr(node.left, frame)) or bool(self.eval_expr(node.right, frame))
+            a = self.eval_expr(node.left, frame)
+            b = self.eval_expr(node.right, frame)
+            if op == '+':
+                return a + b
+            if op == '-':
+                return a - b
+            if op == '*':
+                return a * b
+            if op == '/':
+                return int_div(a, b)
+            if op == '%':
+                return int_mod(a, b)
+            if op == '**':
+                return int_pow(a, b)
+            if op == '==':
+                return a == b
+            if op == '!=':
+                return a != b
+            if op == '<':
+                return a < b
+            if op == '>':
+                return a > b
+            if op == '<=':
+                return a <= b
+            if op == '>=':
+                return a >= b
+            raise Exception(f"Unknown operator '{op}'")
+        if tag == 'UnOp':
+            value = self.eval_expr(node.operand, frame)
+            return -value if node.op == '-' else not value
+        if tag == 'Group':
+            return self.eval_expr(node.expr, frame)
+        if tag == 'Read':
+            return self.read()
+        if tag == 'FunctionCall':
+            return self.call(node.name, [self.eval_expr(e, frame) for e in node.args])
+        raise Exception(f"Unknown expression '{tag}'")
+
+    def call(self, name, args):
+        if name not in self.functions:
+            raise Exception(f"Symbol '{name}' not declared")
+        fn = self.functions[name]
+        if len(args) != len(fn.params):
+            raise Exception(f"Function '{name}' expects {len(fn.params)} arguments, got {len(args)}")
+        memo = self.memos.get(name)
+        if memo is None:
+            return self.run_function(fn, args)
+        args = tuple(args)
+        value = memo.lookup(args)
+        if value is MISSING:
+            value = memo.store(args, self.run_function(fn, args))
+        return value
+
+    def run_function(self, fn, args):
+        frame = {v.name: default_value(v.type) for v in fn.local_vars}
+        for param, value in zip(fn.params, args):
+            frame[param.name] = value
+        try:
+            for cmd in fn.body:
+                self.exec_cmd(cmd, frame)
+        except _Return as r:
+            return r.value
+        return default_value(fn.rtype)
+
+def interpret(ast, inputs=None, out=None, memo=None):
+    Interpreter(ast, inputs, out, memo).run()
@@ -1,4 +1,5 @@
-import ply.lex as lex
+import os
+import sys
 
 reserved = {
     'program' : 'PROGRAM',
@@ -63,7 +64,44 @@ def t_newline(t):
 # Error handling rule
 def t_error(t):
     print("Illegal character '%s'" % t.value[0])
+    # counted: uptcompiler does not cache a parse that printed this
+    t.lexer.illegal += 1
     t.lexer.skip(1)
 
-# Build the lexer
-lexer = lex.lex()
\ No newline at end of file
+# ---------------- Building the lexer -------------------------
+#
+# Nothing is built at import time. get_lexer() builds the lexer on first use
+# from the pre-generated lextab.py, skipping PLY's validation of the rules.
+# After changing the rules above run `python uptlexer.py` to regenerate it,
+# or set UPTC_DEV=1 to always build from the rules.
+
+_lexer = None
+
+def build_lexer(dev=None):
+    # ply is imported here so that importing this module stays cheap
+    import ply.lex as lex
+    module = sys.modules[__name__]
+    if dev is None:
+        dev = bool(os.environ.get('UPTC_DEV'))
+    if dev:
+        lexer = lex.lex(module=module)
+    else:
+        lexer = lex.lex(module=module, optimize=True, lextab='lextab',
+                        outputdir=os.path.dirname(os.path.abspath(__file__)))
+    lexer.illegal = 0    # illegal characters t_error reported
+    return lexer
+
+def get_lexer():
+    global _lexer
+    if _lexer is None:
+        _lexer = build_lexer()
+    return _lexer
+
+def __getattr__(name):
+    # keeps `from uptlexer import lexer` working without an import time build
+    if name == 'lexer':
+        return get_lexer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+if __name__ == '__main__':
+    build_lexer(dev=True).writetab('lextab', os.path.dirname(os.path.abspath(__file__)))
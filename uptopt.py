@@ -0,0 +1,481 @@
+import time
+
+from uptast import (Program, Function, VarDecl, CmdAtrib, CmdIf, CmdWhile, CmdFor, CmdPrint,
+                    CmdReturn, CmdSeq, BinOp, UnOp, Group, FunctionCall, Node, expr_kind, cmd_names)
+from uptcheck import TypeChecker
+from uptruntime import int_div, int_mod, int_pow
+
+# ---------------- AST optimization passes -------------------------
+#
+# A pass takes the AST and returns a rewritten one plus the number of
+# changes it made. PassManager runs a list of passes and records, for each,
+# what it changed and how long it took. Passes never modify nodes in place.
+
+EMPTY = CmdSeq([])
+
+TRUE = 'true'
+FALSE = 'false'
+
+# operators that can never fail (see _cannot_fail)
+_SAFE_OPS = ('==', '!=', '<', '>', '<=', '>=', 'and', 'or')
+
+def _bool(value):
+    return TRUE if value else FALSE
+
+def _cannot_fail(e):
+    # constants, variables, and comparisons, and/or/not of them: no call or
+    # read(), no division by zero and no arithmetic the C back end may trap
+    # on overflow. Only such expressions may be dropped or moved, a program
+    # that stops with a runtime error must still stop with it
+    stack = [e]
+    while stack:
+        e = stack.pop()
+        kind = expr_kind(e)
+        if kind == 'INT' or kind == 'BOOL' or kind == 'ID':
+            continue
+        if kind == 'BinOp' and e.op in _SAFE_OPS:
+            stack.append(e.left)
+            stack.append(e.right)
+        elif kind == 'UnOp' and e.op == 'not':
+            stack.append(e.operand)
+        elif kind == 'Group':
+            stack.append(e.expr)
+        else:
+            return False
+    return True
+
+def _has_call(node):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if type(node) is list:
+            stack.extend(node)
+        elif isinstance(node, Node):
+            if node.tag == 'FunctionCall':
+                return True
+            stack.extend(node.fields())
+    return False
+
+# Expressions are walked with a stack, not recursion: a chain of thousands
+# of operators is one node inside the next, as deep as it is long.
+
+def _operands(e):
+    kind = expr_kind(e)
+    if kind == 'BinOp':
+        return (e.left, e.right)
+    if kind == 'UnOp':
+        return (e.operand,)
+    if kind == 'Group':
+        return (e.expr,)
+    if kind == 'FunctionCall':
+        return e.args
+    return ()
+
+def _rebuilt(e, operands):
+    # a new node like e, with these operands
+    kind = e.tag
+    if kind == 'BinOp':
+        return BinOp(e.op, operands[0], operands[1])
+    if kind == 'UnOp':
+        return UnOp(e.op, operands[0])
+    if kind == 'Group':
+        return Group(operands[0])
+    return FunctionCall(e.name, list(operands))
+
+def _bottom_up(e, build):
+    # build(node, values of its operands) for every node of e, operands
+    # first, left to right; returns what it gave for e
+    stack = [(e, None)]
+    values = []
+    while stack:
+        e, operands = stack.pop()
+        if operands is None:
+            operands = _operands(e)
+            if operands:
+                stack.append((e, operands))
+                stack.extend((o, None) for o in reversed(operands))
+                continue
+            values.append(build(e, ()))
+        else:
+            n = len(operands)
+            args = values[-n:]
+            del values[-n:]
+            values.append(build(e, args))
+    return values[0]
+
+class Pass:
+    # Base pass: rebuilds the tree bottom up, subclasses override the hooks
+    name = 'pass'
+
+    def run(self, ast):
+        self.changes = 0
+        self.temps = 0
+        new_funcs = []
+        for fn in ast.funcs:
+            self.function = fn.name
+            self.local_names = {v.name for v in fn.params + fn.local_vars}
+            self.new_decls = []
+            body = self.cmds(fn.body)
+            new_funcs.append(Function(fn.name, fn.rtype, fn.params, fn.local_vars + self.new_decls, body))
+        self.function = None
+        self.local_names = set()
+        self.new_decls = []
+        main = self.cmd(ast.main)
+        if main is None:
+            main = EMPTY
+        return Program(ast.name, new_funcs, ast.global_vars + self.new_decls, main), self.changes
+
+    def cmds(self, cmds):
+        result = []
+        for cmd in cmds:
+            cmd = self.cmd(cmd)
+            if cmd is not None:
+                result.append(cmd)
+        return result
+
+    def block(self, node):
+        node = self.cmd(node)
+        return EMPTY if node is None else node
+
+    def cmd(self, node):
+        # returns the rewritten command, or None to drop it
+        tag = node.tag
+        if tag == 'CmdAtrib':
+            return CmdAtrib(self.expr(node.expr))
+        if tag == 'CmdReturn':
+            return CmdReturn(self.expr(node.value))
+        if tag == 'CmdSeq':
+            return CmdSeq(self.cmds(node.cmds))
+        if tag == 'CmdIf':
+            orelse = node.orelse
+            return CmdIf(self.expr(node.cond), self.block(node.then),
+                         None if orelse is None else self.block(orelse))
+        if tag == 'CmdWhile':
+            return CmdWhile(self.expr(node.cond), self.block(node.body))
+        if tag == 'CmdFor':
+            return CmdFor(self.expr(node.init), self.expr(node.limit), self.block(node.body))
+        if tag == 'CmdPrint':
+            return CmdPrint([self.expr(e) for e in node.args])
+        return node
+
+    def expr(self, e):
+        return _bottom_up(e, self._rebuild)
+
+    def _rebuild(self, e, operands):
+        if not isinstance(e, Node) or e.tag not in ('BinOp', 'UnOp', 'Group', 'FunctionCall'):
+            return e
+        return self.rewrite(_rebuilt(e, operands))
+
+    def rewrite(self, e):
+        return e
+
+# ---------------- Constant folding -------------------------
+
+_FOLD_INT = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': int_div,
+    '%': int_mod,
+    '**': int_pow,
+}
+
+_FOLD_CMP = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '>': lambda a, b: a > b,
+    '<=': lambda a, b: a <= b,
+    '>=': lambda a, b: a >= b,
+}
+
+_INT64_MIN = -1 << 63
+_INT64_MAX = (1 << 63) - 1
+
+class ConstantFolding(Pass):
+    name = 'constant-folding'
+
+    def rewrite(self, e):
+        folded = self.fold(e)
+        if folded is not e:
+            self.changes += 1
+        return folded
+
+    def fold(self, e):
+        kind = e.tag
+        if kind == 'Group':
+            # parentheses only matter to the parser
+            inner = e.expr
+            if not isinstance(inner, Node) or inner.tag == 'Group':
+                return inner
+            return e
+        if kind == 'UnOp':
+            k = expr_kind(e.operand)
+            if e.op == '-' and k == 'INT':
+                return -e.operand
+            if e.op == 'not' and k == 'BOOL':
+                return _bool(e.operand == FALSE)
+            return e
+        if kind != 'BinOp':
+            return e
+        op, a, b = e.op, e.left, e.right
+        ka, kb = expr_kind(a), expr_kind(b)
+        if op == 'and' or op == 'or':
+            # short circuit: a constant left side decides which side survives
+            if ka == 'BOOL':
+                if (a == TRUE) == (op == 'and'):
+                    return b
+                return a
+            return e
+        if ka == 'INT' and kb == 'INT':
+            if op in _FOLD_CMP:
+                return _bool(_FOLD_CMP[op](a, b))
+            if op in _FOLD_INT:
+                # leave runtime errors and huge powers to run time
+                if op in ('/', '%') and b == 0:
+                    return e
+                if op == '**' and not 0 <= b <= 64:
+                    return e
+                value = _FOLD_INT[op](a, b)
+                # past 64 bits the C back end traps at run time
+                if not _INT64_MIN <= value <= _INT64_MAX:
+                    return e
+                return value
+        if ka == 'BOOL' and kb == 'BOOL' and (op == '==' or op == '!='):
+            return _bool((a == b) == (op == '=='))
+        return e
+
+# ---------------- Dead code elimination -------------------------
+
+class DeadCodeElimination(Pass):
+    name = 'dead-code'
+
+    def cmds(self, cmds):
+        result = []
+        for i, cmd in enumerate(cmds):
+            cmd = self.cmd(cmd)
+            if cmd is None:
+                self.changes += 1
+                continue
+            if cmd.tag == 'CmdSeq':
+                # a nested block has no scope of its own, splice it in
+                self.changes += 1
+                result.extend(cmd.cmds)
+            else:
+                result.append(cmd)
+            if result and result[-1].tag in ('CmdReturn', 'CmdBreak'):
+                # nothing after return/break in the same list can run
+                if i + 1 < len(cmds):
+                    self.changes += 1
+                break
+        return result
+
+    def cmd(self, node):
+        node = super().cmd(node)
+        if node is None:
+            return None
+        tag = node.tag
+        if tag == 'CmdAtrib':
+            if _cannot_fail(node.expr):
+                return None
+        elif tag == 'CmdIf':
+            cond = node.cond
+            if expr_kind(cond) == 'BOOL':
+                self.changes += 1
+                if cond == TRUE:
+                    return node.then
+                return node.orelse
+            if _cannot_fail(cond) and node.then == EMPTY and node.orelse in (None, EMPTY):
+                return None
+        elif tag == 'CmdWhile':
+            if node.cond == FALSE:
+                return None
+        elif tag == 'CmdSeq':
+            if not node.cmds:
+                return None
+        return node
+
+# ---------------- Strength reduction -------------------------
+
+class StrengthReduction(Pass):
+    name = 'strength-reduction'
+
+    def rewrite(self, e):
+        reduced = self.reduce(e)
+        if reduced is not e:
+            self.changes += 1
+        return reduced
+
+    def reduce(self, e):
+        if e.tag != 'BinOp':
+            return e
+        op, a, b = e.op, e.left, e.right
+        cheap_a = expr_kind(a) in ('ID', 'INT')
+        if op == '**' and b == 2 and cheap_a:
+            return BinOp('*', a, a)
+        if op == '**' and b == 1:
+            return a
+        if op == '**' and b == 0 and _cannot_fail(a):
+            return 1
+        if op == '*':
+            if b == 1 and type(b) is int:
+                return a
+            if a == 1 and type(a) is int:
+                return b
+            if (b == 0 and type(b) is int and _cannot_fail(a)) or (a == 0 and type(a) is int and _cannot_fail(b)):
+                return 0
+        if op == '+':
+            if b == 0 and type(b) is int:
+                return a
+            if a == 0 and type(a) is int:
+                return b
+        if op == '-' and b == 0 and type(b) is int:
+            return a
+        if op == '/' and b == 1 and type(b) is int:
+            return a
+        return e
+
+# ---------------- Loop invariant code motion -------------------------
+
+class LoopInvariantMotion(Pass):
+    name = 'loop-invariant-motion'
+
+    def run(self, ast):
+        # a temp is declared with the type the checker gives the expression
+        self.checker = TypeChecker(ast)
+        resolution = self.checker.resolution
+        self.scopes = {fn.name: scope for fn, scope in zip(ast.funcs, resolution.scopes)}
+        self.scopes[None] = resolution.globals
+        return super().run(ast)
+
+    def cmd(self, node):
+        node = super().cmd(node)
+        tag = node.tag
+        if tag != 'CmdWhile' and tag != 'CmdFor':
+            return node
+        used, assigned = set(), set()
+        cmd_names(node, used, assigned)
+        self.assigned = assigned
+        # a call may write any global, only locals stay invariant across it
+        self.calls = _has_call(node)
+        self.hoisted = {}
+        self.numbers = {}
+        self.pre = []
+        if tag == 'CmdWhile':
+            loop = CmdWhile(self.hoist(node.cond), self.hoist_cmd(node.body))
+        else:
+            loop = CmdFor(node.init, node.limit, self.hoist_cmd(node.body))
+        if not self.pre:
+            return node
+        return CmdSeq(self.pre + [loop])
+
+    def hoist(self, e):
+        # e with its largest invariant subexpressions read from temps
+        value, number = _bottom_up(e, self.invariant)
+        return value if number is None else self.temp(value, number)
+
+    def invariant(self, e, operands):
+        # (e, its value number) if e is invariant, else (e rebuilt with its
+        # invariant operands hoisted, None); equal invariant expressions get
+        # the same number and share a temp. Numbers are tuples of numbers,
+        # not nodes: hashing a node recurses as deep as it is nested
+        kind = expr_kind(e)
+        if kind == 'INT' or kind == 'BOOL':
+            return e, (type(e), e)
+        if kind == 'ID':
+            if e not in self.assigned and (not self.calls or e in self.local_names):
+                return e, (str, e)
+            return e, None
+        if ((kind == 'BinOp' and e.op in _SAFE_OPS) or (kind == 'UnOp' and e.op == 'not')
+                or kind == 'Group') and all(number is not None for _, number in operands):
+            key = (kind, e.op if kind != 'Group' else None) + tuple(number for _, number in operands)
+            return e, self.numbers.setdefault(key, len(self.numbers))
+        if not operands:
+            return e, None
+        return _rebuilt(e, [value if number is None else self.temp(value, number)
+                            for value, number in operands]), None
+
+    def temp(self, e, number):
+        # the temp holding invariant e, e itself if not worth one
+        kind = expr_kind(e)
+        if not (kind == 'BinOp' or kind == 'UnOp' or (kind == 'Group' and isinstance(e.expr, Node))):
+            return e
+        if number not in self.hoisted:
+            temp = f"_inv{self.temps}"
+            self.temps += 1
+            # nodes are rebuilt by every pass, ids typed before may be reused
+            self.checker.types.clear()
+            var_type = self.checker.expr(e, self.scopes[self.function])
+            self.new_decls.append(VarDecl(temp, var_type))
+            self.local_names.add(temp)
+            self.pre.append(CmdAtrib(BinOp('=', temp, e)))
+            self.hoisted[number] = temp
+            self.changes += 1
+        return self.hoisted[number]
+
+    def hoist_cmd(self, node):
+        tag = node.tag
+        if tag == 'CmdAtrib':
+            return CmdAtrib(self.hoist(node.expr))
+        if tag == 'CmdReturn':
+            return CmdReturn(self.hoist(node.value))
+        if tag == 'CmdSeq':
+            return CmdSeq([self.hoist_cmd(c) for c in node.cmds])
+        if tag == 'CmdIf':
+            orelse = node.orelse
+            return CmdIf(self.hoist(node.cond), self.hoist_cmd(node.then),
+                         None if orelse is None else self.hoist_cmd(orelse))
+        if tag == 'CmdWhile':
+            return CmdWhile(self.hoist(node.cond), self.hoist_cmd(node.body))
+        if tag == 'CmdFor':
+            return CmdFor(node.init, self.hoist(node.limit), self.hoist_cmd(node.body))
+        if tag == 'CmdPrint':
+            return CmdPrint([self.hoist(e) for e in node.args])
+        return node
+
+# ---------------- Pass manager -------------------------
+
+class PassResult:
+    def __init__(self, name, changes, seconds):
+        self.name = name
+        self.changes = changes
+        self.seconds = seconds
+
+    def __repr__(self):
+        return f"PassResult({self.name!r}, changes={self.changes}, seconds={self.seconds:.6f})"
+
+class PassManager:
+    def __init__(self, passes=()):
+        self.passes = list(passes)
+
+    def add(self, opt_pass):
+        self.passes.append(opt_pass)
+        return self
+
+    def run(self, ast):
+        report = []
+        for opt_pass in self.passes:
+            start = time.perf_counter()
+            ast, changes = opt_pass.run(ast)
+            report.append(PassResult(opt_pass.name, changes, time.perf_counter() - start))
+        return ast, report
+
+LEVELS = {
+    0: [],
+    1: [ConstantFolding, DeadCodeElimination],
+    2: [ConstantFolding, StrengthReduction, LoopInvariantMotion, ConstantFolding, DeadCodeElimination],
+}
+
+def pass_manager(level=1):
+    if level not in LEVELS:
+        raise Exception(f"Unknown optimization level -O{level}")
+    return PassManager(cls() for cls in LEVELS[level])
+
+def optimize(ast, level=1):
+    return pass_manager(level).run(ast)
+
+def format_report(report):
+    lines = [f"{'pass':<24} {'changes':>8} {'ms':>9}"]
+    for r in report:
+        lines.append(f"{r.name:<24} {r.changes:>8} {r.seconds * 1000:>9.3f}")
+    return '\n'.join(lines)
@@ -0,0 +1,177 @@
+import copy
+import gc
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain
+
+from uptast import Program, CmdBreak
+from uptlexer import get_lexer
+from uptparser import get_parser
+from uptregion import RegionTable, illegal, token
+from uptscope import SymbolTable
+
+# ---------------- Parallel parsing of one file -------------------------
+#
+#   ast, symtab = uptparallel.parse(source, jobs=8)    # None: parse serially
+#
+# A program is a header, a run of functions, then the global variables and
+# main. parse() finds where every function starts with one regex over the
+# text, which skips comments as the lexer does and reads each signature
+# ('int|bool|void function ID (params)'; no function body has one). The
+# functions are cut in about 4 chunks per worker of similar size and every
+# worker lexes and parses its chunks in place in the full text (tokens keep
+# their real offsets), wrapped in synthetic 'program _;' ... 'break'
+# tokens: the first chunk starts with the real header, the last one ends
+# with the globals and main. A chunk is parsed against a table that holds
+# every function declared before it, which is all a function may call.
+# The chunks are then put together in order, and the global declaration
+# pass builds the program's symbol table (every function, then the globals)
+# as the serial parse would have.
+#
+# parse() returns None whenever the parallel parse cannot stand for the
+# serial one: an illegal character, a header the scan does not understand
+# or misses, a duplicate function, a syntax or semantic error in any chunk,
+# or a parsed function whose signature is not the scanned one. The caller
+# then parses serially, which reports the error exactly as usual, as it
+# does files of fewer than MIN_FUNCTIONS functions: not worth the workers.
+
+CHUNKS_PER_JOB = 4
+MIN_FUNCTIONS = 64
+
+# comments (skipped whole, so nothing in one is a header) or a function
+# header up to its parameters; a header with a comment inside it is not
+# found, and the chunk holding it then has a function too many
+_HEADER = re.compile(r'#.*|\(\*[\s\S]*?\*\)'
+                     r'|\b(int|bool|void)\s+function\s+([a-zA-Z][a-zA-Z_0-9]*)\s*\(([^()#]*)\)')
+_PARAM = re.compile(r'\s*[a-zA-Z][a-zA-Z_0-9]*\s*:\s*(int|bool)\s*')
+
+def scan_functions(source):
+    # [(offset, name, rtype, param types)] of every function header, None
+    # if one has parameters that are not well formed
+    functions = []
+    for m in _HEADER.finditer(source):
+        rtype, name, params = m.groups()
+        if rtype is None:
+            continue
+        types = []
+        if params.strip():
+            for param in params.split(','):
+                p = _PARAM.fullmatch(param)
+                if p is None:
+                    return None
+                types.append(p.group(1))
+        functions.append((m.start(), name, rtype, types))
+    return functions
+
+def _chunks(functions, end, count):
+    # [(first, end)] function numbers of about count chunks, about as many
+    # bytes each (the last one runs to end, main included)
+    size = (end - functions[0][0]) / count
+    chunks = []
+    first = 0
+    for k in range(1, len(functions)):
+        if functions[k][0] - functions[first][0] >= size:
+            chunks.append((first, k))
+            first = k
+    chunks.append((first, len(functions)))
+    return chunks
+
+# ---- workers ----
+
+_source = None
+_globals = None
+_lexer = None
+_parser = None
+_failed = False
+
+def _init_worker(source, functions):
+    global _source, _globals, _lexer, _parser
+    _source = source
+    table = SymbolTable()
+    for _, name, rtype, params in functions:
+        table.declare(name, rtype, kind='function', params=params)
+    _globals = table.globals
+    _lexer = get_lexer().clone()
+    _lexer.lexerrorf = illegal
+    _parser = copy.copy(get_parser())
+    _parser.errorfunc = _syntax_error
+
+def _syntax_error(tok):
+    global _failed
+    _failed = True
+
+def _parse_chunk(chunk):
+    # the Program of functions first..end, None if it does not parse
+    global _failed
+    first, start, end, last = chunk
+    # the lexer stops at end, which starts a token of the full text; the
+    # chain around it runs in C, without a python frame per token
+    _lexer.input(_source)
+    _lexer.lexpos = start
+    _lexer.lexlen = end
+    head = [] if start == 0 else [token('PROGRAM', 'program', start), token('ID', '_', start), token(';', ';', start)]
+    tail = [] if last else [token('BREAK', 'break', end)]
+    stream = chain(head, iter(_lexer.token, None), tail)
+    _parser.symtab = RegionTable(_globals, first)
+    _failed = False
+    try:
+        ast = _parser.parse(lexer=_lexer, tokenfunc=partial(next, stream, None))
+    except Exception:
+        return None
+    if _failed:
+        return None
+    return ast
+
+# ---- stitching ----
+
+def parse(source, jobs):
+    # (ast, symtab), or None: parse the source serially instead
+    functions = scan_functions(source)
+    if functions is None or len(functions) < max(MIN_FUNCTIONS, 2 * jobs):
+        return None
+    # the global declaration pass: every function, in order
+    symtab = SymbolTable()
+    try:
+        for _, name, rtype, params in functions:
+            symtab.declare(name, rtype, kind='function', params=params)
+    except Exception:
+        return None
+
+    bounds = _chunks(functions, len(source), jobs * CHUNKS_PER_JOB)
+    chunks = []
+    for k, (first, end) in enumerate(bounds):
+        last = k == len(bounds) - 1
+        chunks.append((first,
+                       0 if k == 0 else functions[first][0],
+                       len(source) if last else functions[end][0],
+                       last))
+    # unpickling the chunks' trees allocates nothing but objects that stay:
+    # the cyclic GC would walk the growing tree over and over, at ten times
+    # the cost of the unpickling itself
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(source, functions)) as pool:
+            parts = list(pool.map(_parse_chunk, chunks))
+    finally:
+        if enabled:
+            gc.enable()
+
+    funcs = []
+    for (first, end), part in zip(bounds, parts):
+        if part is None or len(part.funcs) != end - first:
+            return None
+        if part is not parts[-1] and (part.global_vars or type(part.main) is not CmdBreak):
+            return None
+        funcs.extend(part.funcs)
+    for fn, (_, name, rtype, params) in zip(funcs, functions):
+        if (fn.name, fn.rtype, [p.type for p in fn.params]) != (name, rtype, params):
+            return None
+    last = parts[-1]
+    try:
+        for var in last.global_vars:
+            symtab.declare(var.name, var.type)
+    except Exception:
+        return None
+    return Program(parts[0].name, funcs, last.global_vars, last.main), symtab
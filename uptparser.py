@@ -1,36 +1,30 @@
-import ply.yacc as yacc
-from uptlexer import tokens
-
-class SymbolTable:
-    def __init__(self):
-        self.symbols = {}
-
-    def declare(self, name, var_type):
-        if name in self.symbols:
-            raise Exception(f"Symbol '{name}' already declared")
-        self.symbols[name] = var_type
-
-    def lookup(self, name):
-        if name not in self.symbols:
-            raise Exception(f"Symbol '{name}' not declared")
-        return self.symbols[name]
-
-def check_expr(expr,symtab):
-    if expr[0] == 'INT':
-        return symtab[expr[1]] # Atributo sintetizado
-    elif expr[0] == '+':
-        t1 = check_expr(expr[1],symtab)
-        t2 = check_expr(expr[2],symtab)
-        if t1 == 'INT' and t2 == 'INT':
-            return 'INT'
-        else:
-            raise Exception('Erro de tipos na soma')
+import os
+import sys
+
+from uptast import (Program, Function, VarDecl, CmdAtrib, CmdIf, CmdWhile, CmdFor,
+                    CmdBreak, CmdPrint, CmdReturn, CmdSeq, BinOp, UnOp, Group, Read, FunctionCall)
+from uptlexer import tokens, get_lexer
+from uptscope import SymbolTable
+from uptsource import describe
+
+def _located(node, p, n):
+    # node starts at the n-th symbol: a token, or one of the nonterminals
+    # _starts_at() gave a position to
+    node.offset = p.lexpos(n)
+    return node
+
+def _starts_at(p, n):
+    # PLY only tracks nonterminal positions with tracking=True (slower for
+    # every rule); expressions pass on the position of their first token
+    p.slice[0].lexpos = p.lexpos(n)
 
 # # Semantic analysis structures
 # symbol_table = {}
 # functions_table = {}
 
-# Symbol table instance
+# Symbol table of the module level parser. Parser actions use the table
+# attached to the parser running them (p.parser.symtab), so independent
+# sessions (uptcompiler.Compiler) each own theirs.
 symtab = SymbolTable()
 
 precedence = (
@@ -47,34 +41,38 @@ precedence = (
 start = 'Program'
 
 # ---------------- 5) Programs Grammar --------------------------------------
+#
+# Lists are left recursive: each item is appended to one python list as soon
+# as it is parsed, so the parser stack stays shallow however long the list is.
 
 def p_program(p):
    '''
    Program : ProgramHeader ProgramBody
    ''' 
-   p[0] = ('program', p[1], p[2])
+   p[0] = Program(p[1], *p[2])
 
 def p_ProgramHeader(p):
    '''
    ProgramHeader : PROGRAM ID ';' 
    '''
-   p[0] = ('programHeader', p[1], p[2])
+   p[0] = p[2]
 
 def p_ProgramBody(p):
    '''
    ProgramBody : FuncDecls VarDecls Cmd
    '''
-   p[0] = ('programBody', p[1], p[2], p[3])
+   p[0] = (p[1], p[2], p[3])
 
 def p_FuncDecls(p):
    '''
    FuncDecls : empty 
-             | Function FuncDecls
+             | FuncDecls Function
    '''
    if len(p) == 3:
-    p[0] = ('FuncDecls', p[1], p[2])
+       p[1].append(p[2])
+       p[0] = p[1]
    else:
-       p[0] = ('FuncDecls', p[1])
+       p[0] = []
 
 # ---------------- 4) Functions Grammar -------------------------
 
@@ -82,14 +80,23 @@ def p_Function(p):
    '''
    Function : FunctionHeader  FunctionBody
    '''
-   p[0] = ('Function', p[1], p[2])
+   rtype, name, params, offset = p[1]
+   p[0] = Function(name, rtype, params, *p[2])
+   p[0].offset = offset
+   p.parser.symtab.leave()
    
 def p_FunctionHeader(p):
    '''
    FunctionHeader : FunctionType FUNCTION ID '(' ParamList ')' ':' 
    '''
-   symtab.declare(p[3], p[1])  # Declare function in symbol table
-   p[0] = ('FunctionHeader', p[1], p[3], p[5])
+   # the function goes in the global scope, its parameters and local
+   # variables in a scope of their own until p_Function leaves it
+   symtab = p.parser.symtab
+   symtab.declare(p[3], p[1], (p.lexer, p.lexpos(3)), 'function', [param.type for param in p[5]])
+   symtab.enter()
+   for param in p[5]:
+       symtab.declare(param.name, param.type, (p.lexer, param.offset), 'param')
+   p[0] = (p[1], p[3], p[5], p.lexpos(3))
 
 def p_FunctionType(p):
    '''
@@ -97,37 +104,38 @@ def p_FunctionType(p):
                 | BOOL
                 | VOID
    '''
-   p[0] = ('FunctionType', p[1])
+   p[0] = p[1]
    
 def p_FunctionBody(p):
    '''
    FunctionBody : '{' VarDecls CmdList '}' 
    '''
-   p[0] = ('FunctionBody', p[2], p[3])
+   p[0] = (p[2], p[3])
 
 def p_ParamList(p):
    '''
    ParamList : empty 
              | ParamList1
    '''
-   p[0] = ('ParamList', p[1])
+   p[0] = p[1] if p[1] is not None else []
 
 def p_ParamList1(p):
    '''
-   ParamList1 : Param ',' ParamList1 
+   ParamList1 : ParamList1 ',' Param 
               | Param
    '''
    if len(p) == 4:
-    p[0] = ('ParamList1', p[1], p[3])
+       p[1].append(p[3])
+       p[0] = p[1]
    else:
-       p[0] = ('ParamList1', p[1])
+       p[0] = [p[1]]
        
    
 def p_Param(p):
    '''
    Param : ID ':' Type
    '''
-   p[0] = ('Param', p[1], p[3])
+   p[0] = _located(VarDecl(p[1], p[3]), p, 1)
 
 # ---------------- 3) Commands Grammar -------------------------
 
@@ -149,65 +157,66 @@ def p_CmdAtrib(p):
     CmdAtrib : ID 
              | Expr
     '''
-    p[0] = ('CmdAtrib', p[1])
+    p[0] = _located(CmdAtrib(p[1]), p, 1)
 
 # grammar was changed
 # restrict the "then" part to be a block: "{ ... }". (best option for your project?)
 def p_CmdIf(p):
     '''
     CmdIf : IF Expr ':' Cmd 
-          | IF Expr ':' Cmd ELSE ':' 
+          | IF Expr ':' Cmd ELSE ':' Cmd
     '''
     if len(p) == 5:
-        p[0] = ('CmdIf', p[2], p[4])
+        p[0] = _located(CmdIf(p[2], p[4]), p, 1)
     else:
-        p[0] = ('CmdIf', p[2], p[4], p[7])
+        p[0] = _located(CmdIf(p[2], p[4], p[7]), p, 1)
     
 def p_CmdWhile(p):
     '''
     CmdWhile : WHILE Expr ':' Cmd 
     '''
-    p[0] = ('CmdWhile', p[2], p[4])
+    p[0] = _located(CmdWhile(p[2], p[4]), p, 1)
 
 def p_CmdFor(p):
     '''
     CmdFor : FOR CmdAtrib TO Expr ':' Cmd 
     '''
-    p[0] = ('CmdFor', p[2], p[4], p[6])
+    p[0] = _located(CmdFor(p[2].expr, p[4], p[6]), p, 1)
 
 def p_CmdBreak(p):
     '''
     CmdBreak : BREAK 
     '''
-    p[0] = ('CmdBreak', p[1])
+    p[0] = _located(CmdBreak(), p, 1)
 
 def p_CmdPrint(p):
     '''
     CmdPrint : PRINT '(' ExprList ')' 
     '''
-    p[0] = ('CmdPrint', p[3])
+    p[0] = _located(CmdPrint(p[3]), p, 1)
     
 def p_CmdReturn(p):
     '''
     CmdReturn : RETURN Expr 
     '''
-    p[0] = ('CmdReturn', p[2])
+    p[0] = _located(CmdReturn(p[2]), p, 1)
 
 def p_CmdSeq(p):
     '''
     CmdSeq : '{' CmdList '}' 
     '''
-    p[0] = ('CmdSeq', p[2])
+    p[0] = _located(CmdSeq(p[2]), p, 1)
 
 def p_CmdList(p):
     '''
-    CmdList : Cmd ';' CmdList 
+    CmdList : CmdList ';' Cmd 
             | Cmd
     '''
     if len(p) == 4:
-        p[0] = ('cmdList', p[1], p[3])
+        p[1].append(p[3])
+        p[0] = p[1]
     else:
-        p[0] = ('cmdList', p[1])
+        p[0] = [p[1]]
 
 # ---------------- 2) Expressions Grammar -------------------------
 
@@ -223,24 +232,23 @@ def p_Expr(p):
          | ID '(' ExprList ')'
          | READ '(' ')'
     '''
-     
-    if p[1] == '-':
-        p[0] = ('UnOp', -p[2])
+    _starts_at(p, 1)
+    if len(p) == 3:
+        p[0] = UnOp(p[1], p[2])
     elif len(p) == 2:
         p[0] = p[1]
     elif len(p) == 4:
         if p[1] == '(':
-            p[0] = ('Group', p[2])
+            p[0] = Group(p[2])
         elif p[2] == '(':
-            p[0] = ('Read')
+            p[0] = _located(Read(), p, 1)
         else:
-            p[0] = ('BinOp', p[2], p[1], p[3])
-            check_expr(p[0],symtab)
+            p[0] = BinOp(p[2], p[1], p[3])
             if p[2] == '/' and p[3] == 0:
                 raise Exception("Semantic error: Division by zero")
     else: 
-        symtab.lookup(p[1])
-        p[0] = ('FunctionCall', p[1], p[3])
+        p.parser.symtab.function(p[1], (p.lexer, p.lexpos(1)))
+        p[0] = _located(FunctionCall(p[1], p[3]), p, 1)
 
 def p_BinOp(p):
     '''
@@ -260,6 +268,7 @@ def p_BinOp(p):
           | AND
           | OR
     '''
+    _starts_at(p, 1)
     p[0] = p[1]
 
 def p_UnOp(p):
@@ -267,6 +276,7 @@ def p_UnOp(p):
     UnOp : '-' 
          | NOT 
     '''
+    _starts_at(p, 1)
     p[0] = p[1]
       
 def p_ExprList(p):
@@ -274,43 +284,45 @@ def p_ExprList(p):
     ExprList : empty 
              | ExprList1 
     '''
-    p[0] = ('exprList', p[1])
+    p[0] = p[1] if p[1] is not None else []
     
 def p_ExprList1(p):
     '''
     ExprList1 : Expr
-              | Expr ',' ExprList1 
+              | ExprList1 ',' Expr 
     '''
     if len(p) == 4:
-        p[0] = ('exprList1', p[1], p[3])
+        p[1].append(p[3])
+        p[0] = p[1]
     else:
-        p[0] = ('exprList1', p[1])
+        p[0] = [p[1]]
 
 # ---------------- 1) Declarations Grammar -------------------------
 
 def p_VarDecls(p):
     '''
     VarDecls : empty 
-             | VarDecl VarDecls
+             | VarDecls VarDecl
     '''
     if len(p) == 3:
-        p[0] = ('VarDecls', p[1], p[2])
+        p[1].append(p[2])
+        p[0] = p[1]
     else:
-        p[0] = ('VarDecls', p[1])
+        p[0] = []
 
 def p_VarDecl(p):
     '''
     VarDecl : VAR ID ':' Type ';' 
     '''
-    symtab.declare(p[2], p[4])  # Register the variable in the symbol table
-    p[0] = ('VarDecl', p[2], p[4])
+    p.parser.symtab.declare(p[2], p[4], (p.lexer, p.lexpos(2)))  # Register the variable in the symbol table
+    p[0] = _located(VarDecl(p[2], p[4]), p, 2)
 
 def p_Type(p):
     '''
     Type : INTEGER 
          | BOOL
     '''
-    p[0] = ('Type', p[1])
+    p[0] = p[1]
 
 # ---------------- 1) Other Grammar -------------------------
 
@@ -321,14 +333,58 @@ def p_empty(p):
     pass
 
 def p_error(p):
-    print("Syntax error at '%s'" % p.value)
+    if p is None:
+        print("Syntax error at end of input")
+    else:
+        print("Syntax error at '%s' (%s)" % (p.value, describe(p.lexer, p.lexpos)))
+
+# ---------------- Building the parser -------------------------
+#
+# Nothing is built at import time. get_parser() loads the LALR tables from
+# parsetab.py on first use without checking the grammar signature and without
+# writing parser.out. After changing the grammar run `python uptparser.py`
+# (development mode: checks the signature, regenerates parsetab.py and writes
+# parser.out), or set UPTC_DEV=1 to always build that way.
+
+_parser = None
+
+def build_parser(dev=None):
+    # ply is imported here so that importing this module stays cheap
+    import ply.yacc as yacc
+    module = sys.modules[__name__]
+    if dev is None:
+        dev = bool(os.environ.get('UPTC_DEV'))
+    if dev:
+        return yacc.yacc(module=module)
+    return yacc.yacc(module=module, debug=False, write_tables=False, optimize=True)
+
+def get_parser():
+    global _parser
+    if _parser is None:
+        _parser = build_parser()
+    return _parser
+
+def __getattr__(name):
+    # keeps `from uptparser import parser` working without an import time build
+    if name == 'parser':
+        return get_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def parse(source):
+    # every program starts with an empty symbol table
+    symtab.clear()
+    parser = get_parser()
+    parser.symtab = symtab
+    lexer = get_lexer()
+    lexer.lineno = 1
+    return parser.parse(source, lexer=lexer)
 
 # ---------------- Test the parser by printing the AST -------------------------
 
-parser = yacc.yacc()
-
-ast = parser.parse('program fact_rec ;int function fact( x: int ): {var p : int;p = 1 ;while x > 1:{ p = p * x; x = x - 1}; return p} var n : int;{ n = read();print(fact(n))}')
-print(ast)
+if __name__ == '__main__':
+    _parser = build_parser(dev=True)
+    ast = parse('program fact_rec ;int function fact( x: int ): {var p : int;p = 1 ;while x > 1:{ p = p * x; x = x - 1}; return p} var n : int;{ n = read();print(fact(n))}')
+    print(ast)
 
 # ----------------- Valid UPT Code for testing ----------------------------------------------
 
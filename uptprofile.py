@@ -0,0 +1,215 @@
+import copy
+import json
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from functools import partial
+
+# ---------------- Compile-time profiling -------------------------
+#
+# A Profile is opt-in: hand one to a Compiler and every phase it runs (lex,
+# yacc, check, optimize, codegen) is timed, with the memory allocated in it,
+# and the lexer and parser it parses with are instrumented copies that count
+# and time every grammar production (p_Expr, p_CmdList, ...) and every lexer
+# rule (t_ID, t_INT, comment skipping, ...). A Compiler without a Profile
+# runs the plain lexer and parser, so there is nothing to pay when profiling
+# is off.
+#
+#   profile = Profile()
+#   Compiler(profile=profile).compile(source)
+#   print(profile.to_json())
+#
+# To separate lexing from parsing, a profiled parse tokenizes the whole
+# source first and then feeds the parser from the token list.
+#
+# Phases nest: 'parse' holds 'lex' and 'yacc'. Every phase records the net
+# change in allocated memory blocks, which is nearly free to measure. With
+# memory=True tracemalloc is running as well and phases also record the bytes
+# they kept and their peak above what was allocated when they started;
+# tracemalloc slows everything down, so compare times of runs with the same
+# setting only.
+#
+# Time spent in a production is its action alone; PLY's table driven shift
+# and reduce loop is the rest of 'yacc'. Likewise a lexer rule's time is its
+# function (t_ID looks up reserved words, t_newline counts lines); the master
+# regular expression that matches every rule is the rest of 'lex'. Rules
+# without a function (operators, literals) are only counted, by token type.
+
+class Phase:
+    __slots__ = ('name', 'depth', 'seconds', 'blocks', 'allocated', 'peak')
+
+    def __init__(self, name, depth):
+        self.name = name
+        self.depth = depth
+        self.seconds = 0.0
+        self.blocks = 0
+        self.allocated = None
+        self.peak = None
+
+    def as_dict(self):
+        d = {'name': self.name, 'depth': self.depth, 'seconds': self.seconds, 'blocks': self.blocks}
+        if self.allocated is not None:
+            d['allocated_bytes'] = self.allocated
+            d['peak_bytes'] = self.peak
+        return d
+
+class Profile:
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.phases = []
+        self.tokens = 0
+        self.lex_seconds = 0.0
+        self.token_types = Counter()
+        self.productions = {}    # action function -> [calls, seconds]
+        self.rules = Counter()   # production ('Expr -> Expr BinOp Expr') -> reductions
+        self.lexer_rules = {}    # rule -> [calls, seconds]
+        self.passes = []         # uptopt.PassResult of every optimize phase
+        self.counters = Counter()
+        self._open = []          # [phase, running peak] of the phases entered
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    # ---- phases ----
+
+    @contextmanager
+    def phase(self, name):
+        record = Phase(name, len(self._open))
+        self.phases.append(record)
+        frame = [record, 0]
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._open:
+                # the enclosing phase's peak so far, before this one resets it
+                parent = self._open[-1]
+                parent[1] = max(parent[1], peak)
+            tracemalloc.reset_peak()
+            before = current
+        self._open.append(frame)
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - start
+            record.blocks = sys.getallocatedblocks() - blocks
+            self._open.pop()
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(frame[1], peak)
+                record.allocated = current - before
+                record.peak = peak - before
+                if self._open:
+                    parent = self._open[-1]
+                    parent[1] = max(parent[1], peak)
+
+    def close(self):
+        if self.memory:
+            tracemalloc.stop()
+
+    # ---- instrumented lexer and parser ----
+
+    def _timed(self, table, name, func):
+        stats = table.setdefault(name, [0, 0.0])
+        clock = time.perf_counter
+        def timed(arg):
+            start = clock()
+            try:
+                return func(arg)
+            finally:
+                stats[1] += clock() - start
+                stats[0] += 1
+        return timed
+
+    def instrument_lexer(self, lexer):
+        # a copy of a PLY lexer whose rule functions are timed; uptscan's
+        # TokenStream has no rules to instrument and is returned as it is
+        if not hasattr(lexer, 'lexre'):
+            return lexer
+        lexer = lexer.clone()
+        lexre = []
+        for regex, index in lexer.lexre:
+            names = {i: name for name, i in regex.groupindex.items()}
+            entries = []
+            for i, entry in enumerate(index):
+                if entry and entry[0]:
+                    func, type_ = entry
+                    entry = (self._timed(self.lexer_rules, func.__name__, func), type_)
+                elif entry and entry[1] is None:
+                    # an ignored rule (t_ignore_COMMENT): a function that
+                    # returns no token skips the match just the same
+                    entry = (self._timed(self.lexer_rules, names[i], _skip), None)
+                entries.append(entry)
+            lexre.append((regex, entries))
+        lexer.lexre = lexre
+        if lexer.lexerrorf is not None:
+            lexer.lexerrorf = self._timed(self.lexer_rules, lexer.lexerrorf.__name__, lexer.lexerrorf)
+        return lexer
+
+    def instrument_parser(self, parser):
+        # a copy of the parser whose productions call timed actions; the
+        # parse tables stay shared
+        parser = copy.copy(parser)
+        productions = []
+        for prod in parser.productions:
+            if prod.callable is not None:
+                prod = copy.copy(prod)
+                action = self._timed(self.productions, prod.func, prod.callable)
+                prod.callable = partial(_reduce, self.rules, prod.str, action)
+            productions.append(prod)
+        parser.productions = productions
+        return parser
+
+    def parse(self, lexer, parser, source):
+        # what Compiler does with a Profile: tokenize everything, then parse
+        timed = self.instrument_lexer(lexer)
+        with self.phase('lex') as lex:
+            timed.input(source)
+            tokens = list(iter(timed.token, None))
+        # the copy counted the illegal characters, the caller looks at lexer
+        lexer.illegal = timed.illegal
+        lexer = timed
+        self.tokens += len(tokens)
+        self.lex_seconds += lex.seconds
+        self.token_types.update(tok.type for tok in tokens)
+        parser = self.instrument_parser(parser)
+        with self.phase('yacc'):
+            return parser.parse(lexer=lexer, tokenfunc=partial(next, iter(tokens), None))
+
+    # ---- report ----
+
+    def as_dict(self):
+        def table(stats):
+            return {name: {'calls': calls, 'seconds': seconds}
+                    for name, (calls, seconds) in sorted(stats.items(), key=lambda kv: -kv[1][1])}
+        return {
+            'memory': self.memory,
+            'phases': [p.as_dict() for p in self.phases],
+            'totals': self.totals(),
+            'tokens': self.tokens,
+            'tokens_per_second': self.tokens / self.lex_seconds if self.lex_seconds else None,
+            'token_types': dict(self.token_types.most_common()),
+            'lexer_rules': table(self.lexer_rules),
+            'productions': table(self.productions),
+            'rules': dict(self.rules.most_common()),
+            'passes': [{'name': r.name, 'changes': r.changes, 'seconds': r.seconds} for r in self.passes],
+            'counters': dict(self.counters),
+        }
+
+    def totals(self):
+        # seconds per phase name, summed over every compile
+        totals = {}
+        for p in self.phases:
+            totals[p.name] = totals.get(p.name, 0.0) + p.seconds
+        return totals
+
+    def to_json(self, indent=2):
+        return json.dumps(self.as_dict(), indent=indent)
+
+def _skip(tok):
+    return None
+
+def _reduce(rules, rule, action, p):
+    rules[rule] += 1
+    action(p)
@@ -0,0 +1,157 @@
+from collections import OrderedDict
+
+from uptast import Node, cmd_names
+
+# ---------------- Pure functions and their memo tables -------------------------
+#
+#   memo = uptpure.MemoTable(ast, max_entries=1024)
+#   uptvm.execute(ast, [30], memo=memo)         # or upttranspile, uptinterp
+#   print(uptpure.format_stats(memo))
+#
+# A function is pure when what it returns depends only on its arguments
+# and calling it does nothing else: its body has no read(), no print, no
+# name that is not one of its parameters or locals (reading a global is
+# out too, the result would depend on it), and it only calls pure
+# functions. Calls are the one fact that depends on other functions, so
+# every function with the local facts right starts as a candidate and
+# candidates calling a non-candidate (or a function that does not exist)
+# are struck until none is left to strike: a recursive function stays
+# pure unless something else it calls is not.
+#
+# A call to a pure function with arguments it was called with before can
+# give the earlier result instead of running again. The back ends look a
+# call up in the function's Memo, an LRU of at most max_entries results
+# keyed on the tuple of argument values, and store the result once the
+# call returns; a call that fails stores nothing. Impure functions get no
+# Memo at all, so they are never looked up or stored. A MemoTable belongs
+# to one program and may be kept across runs of it: a pure function's
+# results do not depend on the inputs.
+
+DEFAULT_ENTRIES = 4096
+
+# what Memo.lookup returns for a call it has no result for
+MISSING = object()
+
+class _Facts:
+    __slots__ = ('local', 'calls')
+
+    def __init__(self):
+        self.local = True     # no read(), print or non-local name
+        self.calls = set()
+
+def _walk(node, facts):
+    # read(), print and calls anywhere under node
+    if type(node) is list:
+        for child in node:
+            _walk(child, facts)
+    elif isinstance(node, Node):
+        tag = node.tag
+        if tag == 'CmdPrint' or tag == 'Read':
+            facts.local = False
+        elif tag == 'FunctionCall':
+            facts.calls.add(node.name)
+            _walk(node.args, facts)
+            return
+        for child in node.fields():
+            _walk(child, facts)
+
+def function_facts(fn):
+    facts = _Facts()
+    names = {v.name for v in fn.params + fn.local_vars}
+    used, assigned = set(), set()
+    for cmd in fn.body:
+        cmd_names(cmd, used, assigned)
+    if not (used | assigned) <= names:
+        facts.local = False
+    _walk(fn.body, facts)
+    return facts
+
+def pure_functions(ast):
+    facts = {fn.name: function_facts(fn) for fn in ast.funcs}
+    pure = {name for name, f in facts.items() if f.local}
+    changed = True
+    while changed:
+        changed = False
+        for name in list(pure):
+            if not facts[name].calls <= pure:
+                pure.discard(name)
+                changed = True
+    return pure
+
+class Memo:
+    # one pure function's results, least recently used out past max_entries
+    def __init__(self, name, max_entries=DEFAULT_ENTRIES):
+        self.name = name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, args):
+        value = self._entries.get(args, MISSING)
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self._entries.move_to_end(args)
+            self.hits += 1
+        return value
+
+    def store(self, args, value):
+        entries = self._entries
+        entries[args] = value
+        if len(entries) > self.max_entries:
+            entries.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def wrap(self, fn):
+        # fn memoized, for back ends whose functions are python functions
+        lookup = self.lookup
+        store = self.store
+        def memoized(*args):
+            value = lookup(args)
+            if value is MISSING:
+                value = store(args, fn(*args))
+            return value
+        memoized.__name__ = fn.__name__
+        memoized.__wrapped__ = fn
+        return memoized
+
+class MemoTable:
+    def __init__(self, ast, max_entries=DEFAULT_ENTRIES):
+        if max_entries < 1:
+            raise Exception("A memo table needs room for at least one entry")
+        self.max_entries = max_entries
+        self.pure = pure_functions(ast)
+        # in declaration order, for the statistics
+        self.memos = {fn.name: Memo(fn.name, max_entries) for fn in ast.funcs if fn.name in self.pure}
+
+    def get(self, name):
+        # None: not pure, never memoized
+        return self.memos.get(name)
+
+    @property
+    def hits(self):
+        return sum(m.hits for m in self.memos.values())
+
+    @property
+    def misses(self):
+        return sum(m.misses for m in self.memos.values())
+
+    def stats(self):
+        return {name: {'hits': m.hits, 'misses': m.misses, 'entries': len(m), 'evictions': m.evictions}
+                for name, m in self.memos.items()}
+
+def format_stats(memo):
+    lines = [f"{'function':<20} {'hits':>10} {'misses':>10} {'hit rate':>9} {'entries':>8} {'evicted':>8}"]
+    for name, s in memo.stats().items():
+        calls = s['hits'] + s['misses']
+        rate = f"{s['hits'] / calls:>8.1%}" if calls else f"{'-':>8}"
+        lines.append(f"{name:<20} {s['hits']:>10} {s['misses']:>10} {rate:>9} {s['entries']:>8} {s['evictions']:>8}")
+    if not memo.memos:
+        lines.append('(no pure functions)')
+    return '\n'.join(lines)
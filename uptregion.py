@@ -0,0 +1,60 @@
+from ply.lex import LexToken
+
+from uptscope import SymbolTable, at_where
+
+# ---------------- Parsing one region of a program -------------------------
+#
+# uptincr reparses the function, globals or main an edit falls in, and
+# uptparallel parses chunks of functions in separate workers. Both lex a
+# region in place in the full text (tokens keep their real offsets) and
+# parse it wrapped in synthetic tokens:
+#
+#   program _ ;  <tokens of the region>  break
+#
+# against a RegionTable, which sees every function declared before the
+# region. What they share is here.
+
+class Fallback(Exception):
+    # the region cannot be parsed on its own: parse the whole text
+    pass
+
+def illegal(t):
+    # the lexerrorf of a region lexer: lexing a region on its own never
+    # skips a character, what is illegal there may lex otherwise with its
+    # neighbours, and the full parse reports it if not
+    raise Fallback()
+
+def token(type_, value, lexpos):
+    tok = LexToken()
+    tok.type = type_
+    tok.value = value
+    tok.lineno = 0
+    tok.lexpos = lexpos
+    return tok
+
+class RegionTable(SymbolTable):
+    # a fresh table for the declarations of one region, which also sees the
+    # first `limit` functions of the base table's globals
+    def __init__(self, base, limit):
+        super().__init__()
+        self.base = base
+        self.limit = limit
+
+    def _visible(self, name):
+        symbol = self.base.symbols.get(name)
+        if symbol is not None and symbol.kind == 'function' and symbol.slot < self.limit:
+            return symbol
+        return None
+
+    def declare(self, name, var_type, where=None, kind='var', params=None):
+        if self.scope is self.globals or kind == 'function':
+            if self._visible(name) is not None:
+                raise Exception(f"Symbol '{name}' already declared" + at_where(where))
+        return super().declare(name, var_type, where, kind, params)
+
+    def function(self, name, where=None):
+        if name not in self.globals.symbols:
+            symbol = self._visible(name)
+            if symbol is not None:
+                return symbol
+        return super().function(name, where)
@@ -0,0 +1,51 @@
+import sys
+
+# ---------------- UPT runtime rules shared by every back end -------------------------
+#
+# Integers follow C semantics so that every execution mode agrees:
+#   a / b   truncates toward zero
+#   a % b   has the sign of the dividend
+#   a ** b  requires b >= 0
+
+def int_div(a, b):
+    if b == 0:
+        raise Exception("Runtime error: Division by zero")
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+def int_mod(a, b):
+    if b == 0:
+        raise Exception("Runtime error: Division by zero")
+    return a - b * int_div(a, b)
+
+def int_pow(a, b):
+    if b < 0:
+        raise Exception("Runtime error: Negative exponent")
+    return a ** b
+
+def format_value(v):
+    if v is True:
+        return 'true'
+    if v is False:
+        return 'false'
+    return str(v)
+
+def make_reader(inputs=None):
+    # read() takes one integer per call, from `inputs` or from stdin
+    if inputs is None:
+        return lambda: int(input())
+    it = iter(inputs)
+    def read():
+        for v in it:
+            return int(v)
+        raise Exception("Runtime error: read() past end of input")
+    return read
+
+def make_printer(out=None):
+    # print(a, b, ...) writes the values separated by spaces on one line
+    if out is None:
+        out = sys.stdout
+    write = out.write
+    def print_values(values):
+        write(' '.join([format_value(v) for v in values]) + '\n')
+    return print_values
@@ -0,0 +1,272 @@
+import re
+from array import array
+from functools import partial
+from itertools import accumulate, compress, count, islice, repeat
+from operator import itemgetter, sub
+
+import lextab
+from uptlexer import tokens, reserved
+
+# ---------------- Bulk scanner -------------------------
+#
+# scan() tokenizes a whole buffer with one master regex and stores the tokens
+# in parallel arrays (kind, start offset, length, line, INT value) instead of
+# creating a LexToken per token and calling t_ID/t_INT/t_newline for each
+# match. The source is handed to findall() a chunk at a time and the matched
+# texts are classified with map()/compress(), so ordinary tokens never run
+# python code on their way from the regex to the arrays.
+#
+# The master regex is built from the one PLY generated in lextab.py, so the
+# token stream is exactly the PLY lexer's (see benchmarks/bench_scan.py). One
+# difference: "Illegal character" messages are all printed before parsing
+# starts instead of when the parser reaches them.
+#
+# The source can also be bytes or a mapped file (uptsource.SourceFile),
+# scanned without decoding it. Such buffers are tracked by offset only: no
+# line numbers are counted and token values are decoded one token at a time.
+# Word characters are then ASCII only: 'x' right after a non-ASCII letter is
+# an ID instead of another illegal character.
+#
+# TokenStream is the lexer interface yacc needs (input, token, lineno) on top
+# of a TokenBuffer: Compiler(scanner='fast') parses with it.
+
+TOKEN_TYPES = tuple(tokens) + tuple(lextab._lexliterals)
+KINDS = {t: i for i, t in enumerate(TOKEN_TYPES)}
+
+ID = KINDS['ID']
+INT = KINDS['INT']
+
+# kinds that are not tokens
+_SKIP = -1
+_NEWLINE = -2
+_ERROR = -3
+
+# Texts that always have the same kind: keywords, literals, operators ...
+_TEXT_KINDS = {word: KINDS[t] for word, t in reserved.items()}
+_TEXT_KINDS.update((c, KINDS[c]) for c in lextab._lexliterals)
+_TEXT_KINDS.update({'**': KINDS['EXP'], '==': KINDS['EQUAL'], '!=': KINDS['NOTEQUAL'],
+                    '<=': KINDS['LESSEQUAL'], '>=': KINDS['GREATEREQUAL']})
+# and the other way round: the value of a token of such a kind, which the
+# token stream then needs neither to slice nor to decode
+_KIND_TEXTS = [None] * len(TOKEN_TYPES)
+for _text, _kind in _TEXT_KINDS.items():
+    _KIND_TEXTS[_kind] = _text
+# ... anything else is told apart by its first character. Whatever starts
+# with something not in here is an error.
+_FIRST_KINDS = dict.fromkeys('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ', ID)
+_FIRST_KINDS.update(dict.fromkeys('0123456789', INT))
+_FIRST_KINDS.update({'\n': _NEWLINE, '#': _SKIP, '(': _SKIP})
+
+_ignore = lextab._lexstateignore['INITIAL']
+
+def _build(encode, error):
+    # PLY's master regex with every group made non-capturing, so findall()
+    # returns the matched text, followed by
+    # - a word run that neither t_ID nor t_INT accept from its start ('12abc',
+    #   '_x'); t_ID and t_INT are anchored with \b, so PLY rejects every
+    #   character of such a run one at a time
+    # - the literals, which PLY tries after its regex
+    # - any other character that is not ignored (an error)
+    (rules, _), = lextab._lexstatere['INITIAL']
+    rules = re.sub(r'\(\?P<\w+>', '(?:', rules).replace('(\\#', '(?:\\#')
+    ignore = re.escape(_ignore)
+    literals = re.escape(lextab._lexliterals)
+    pattern = f"[{ignore}]*(?:{rules}|\\w+|[{literals}]|{error}[^{ignore}])"
+    compiled = re.compile(encode(pattern), lextab._lexreflags)
+    assert compiled.groups == 0, pattern
+    return compiled
+
+class _Syntax:
+    # the tables scan() uses, for str or for bytes sources
+    def __init__(self, encode, first_key, isdecimal, error):
+        self.pattern = _build(encode, error)
+        self.text_kinds = {encode(text): kind for text, kind in _TEXT_KINDS.items()}
+        self.first_kinds = {first_key(c): kind for c, kind in _FIRST_KINDS.items()}
+        self.ignore = encode(_ignore)
+        self.isdecimal = isdecimal
+        self.newline = encode('\n')
+        self.comment = (encode('(*'), encode('*)'))
+
+_STR = _Syntax(str, str, str.isdecimal, '')
+# one error per UTF-8 encoded character, not per byte
+_BYTES = _Syntax(str.encode, ord, bytes.isdigit, r'[\xc0-\xff][\x80-\xbf]*|')
+
+# about this many characters are handed to one findall()
+_CHUNK = 1 << 15
+
+_first = itemgetter(0)
+_is_token = (-1).__lt__
+_needs_look = {INT, _NEWLINE, _ERROR}.__contains__
+
+class TokenBuffer:
+    __slots__ = ('source', 'kinds', 'starts', 'lengths', 'lines', 'values', 'big', 'last_line', 'illegal')
+
+    def __init__(self, source):
+        self.source = source
+        self.kinds = array('B')
+        self.starts = array('q')
+        self.lengths = array('I')
+        self.lines = array('I')
+        self.values = array('q')    # INT tokens only, 0 elsewhere
+        self.big = {}               # INT values that do not fit in 64 bits
+        self.last_line = 1
+        self.illegal = 0            # characters reported as illegal
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def type(self, i):
+        return TOKEN_TYPES[self.kinds[i]]
+
+    def value(self, i):
+        if self.kinds[i] == INT:
+            return self.big.get(i, self.values[i])
+        start = self.starts[i]
+        value = self.source[start:start + self.lengths[i]]
+        return value if isinstance(value, str) else value.decode()
+
+def _cut(source, start, end, syntax):
+    # Where the chunk that reaches end can stop without splitting a token:
+    # after a newline (no token but newline runs spans lines, and those are
+    # only counted), and outside any (* block comment *).
+    opening, closing = syntax.comment
+    while True:
+        end = source.find(syntax.newline, end) + 1
+        if not end:
+            return len(source)
+        comment = source.rfind(opening, start, end)
+        if comment < 0 or source.find(closing, comment + 2, end) >= 0:
+            return end
+        end = source.find(closing, comment + 2)
+        if end < 0:
+            return len(source)
+
+def scan(source, lineno=1):
+    # lineno=None: offsets only, buf.lines stays empty
+    syntax = _STR if isinstance(source, str) else _BYTES
+    isdecimal = syntax.isdecimal
+    buf = TokenBuffer(source)
+    pos = 0
+    while pos < len(source):
+        end = _cut(source, pos, pos + _CHUNK, syntax)
+        matches = syntax.pattern.findall(source, pos, end)
+        ends = list(accumulate(map(len, matches), initial=pos))
+        pos = end
+        texts = list(map(type(syntax.ignore).lstrip, matches, repeat(syntax.ignore)))
+        lengths = list(map(len, texts))
+        kinds = list(map(syntax.text_kinds.get, texts,
+                         map(syntax.first_kinds.get, map(_first, texts), repeat(_ERROR))))
+
+        # only INT tokens, newlines and errors get a python look
+        newlines = [0] * len(texts)
+        values = [0] * len(texts)
+        big = []
+        for i in compress(count(), map(_needs_look, kinds)):
+            kind = kinds[i]
+            text = texts[i]
+            if kind == _ERROR and isdecimal(text):
+                # non-ASCII digits, which t_INT's \d accepts
+                kinds[i] = kind = INT
+            if kind == INT:
+                if not isdecimal(text):
+                    kinds[i] = kind = _ERROR
+                else:
+                    value = int(text)
+                    if value > 0x7fffffffffffffff:
+                        big.append((i, value))
+                        value = 0
+                    values[i] = value
+                    continue
+            if kind == _NEWLINE:
+                newlines[i] = len(text)
+            else:
+                # same message and recovery as uptlexer.t_error, once per character
+                if not isinstance(text, str):
+                    text = text.decode('utf-8', 'replace')
+                for c in text:
+                    print("Illegal character '%s'" % c)
+                buf.illegal += len(text)
+        keep = list(map(_is_token, kinds))
+        for i, value in big:
+            buf.big[len(buf.kinds) + sum(keep[:i])] = value
+        buf.kinds.extend(compress(kinds, keep))
+        buf.starts.extend(compress(map(sub, islice(ends, 1, None), lengths), keep))
+        buf.lengths.extend(compress(lengths, keep))
+        if lineno is not None:
+            lines = list(accumulate(newlines, initial=lineno))
+            lineno = lines.pop()
+            buf.lines.extend(compress(lines, keep))
+        buf.values.extend(compress(values, keep))
+    buf.last_line = lineno
+    return buf
+
+# ---------------- Lexer adapter for yacc -------------------------
+
+class Token:
+    # lexer is only set by yacc, on the token it hands to p_error
+    __slots__ = ('type', 'value', 'lineno', 'lexpos', 'lexer')
+
+    def __repr__(self):
+        return f"LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})"
+
+class TokenStream:
+    def __init__(self):
+        self.buffer = None
+        self.lexdata = ''
+        self.lineno = 1
+        self.lexpos = 0
+        self.illegal = 0
+
+    def input(self, source):
+        # bytes (a mapped file) are tracked by offset only, tokens get lineno 0
+        offsets_only = not isinstance(source, str)
+        self.buffer = scan(source, None if offsets_only else self.lineno)
+        self.illegal = self.buffer.illegal
+        self.lexdata = source
+        self.lexpos = 0
+        # yacc looks up lexer.token once per parse, after input()
+        self.token = partial(next, self._tokens(self.buffer), None)
+
+    def _tokens(self, buf):
+        source = buf.source
+        decode = not isinstance(source, str)
+        big = buf.big
+        texts = _KIND_TEXTS
+        lines = repeat(0) if decode else buf.lines
+        for i, kind, start, length, line, value in zip(
+                count(), buf.kinds, buf.starts, buf.lengths, lines, buf.values):
+            tok = Token()
+            tok.type = TOKEN_TYPES[kind]
+            if kind == INT:
+                if big:
+                    value = big.get(i, value)
+            else:
+                # only identifiers are cut out of the source
+                value = texts[kind]
+                if value is None:
+                    value = source[start:start + length]
+                    if decode:
+                        value = value.decode()
+            tok.value = value
+            tok.lineno = line
+            tok.lexpos = start
+            yield tok
+        if buf.last_line is not None:
+            self.lineno = buf.last_line
+        self.lexpos = len(source) + 1
+
+    def token(self):
+        # until input() is called
+        return None
+
+    def clone(self):
+        return TokenStream()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        tok = self.token()
+        if tok is None:
+            raise StopIteration
+        return tok
@@ -0,0 +1,180 @@
+import sys
+from operator import attrgetter
+
+from uptast import Node
+from uptsource import describe
+
+# ---------------- Scopes -------------------------
+#
+# UPT has two levels of scope: the program (functions and global variables,
+# depth 0) and one per function (parameters, then local variables, depth 1).
+# A name declared in a function shadows a global of the same name; declaring
+# a name twice in one scope is an error. Every variable gets a slot, its
+# index in the frame of its scope, so an executor can keep each frame as a
+# list and address a variable as frames[depth][slot] instead of by name.
+# Functions are numbered separately, in declaration order.
+#
+# The parser fills a SymbolTable as it reduces declarations. resolve() runs
+# once the whole program is known (a function may use globals declared after
+# it) and maps every name used in each scope to its Symbol, so a back end
+# turns names into (depth, slot) with one dict lookup per distinct name.
+
+class Symbol:
+    __slots__ = ('name', 'kind', 'type', 'depth', 'slot', 'params')
+
+    # kind is 'function', 'param', 'var' or 'implicit' (a variable used but
+    # never declared, a global initialised to 0); type is the variable type
+    # or the return type; params are the parameter types of a function
+    def __init__(self, name, kind, type, depth, slot, params=None):
+        self.name = name
+        self.kind = kind
+        self.type = type
+        self.depth = depth
+        self.slot = slot
+        self.params = params
+
+    def __repr__(self):
+        return f"Symbol({self.name!r}, {self.kind}, {self.type}, depth={self.depth}, slot={self.slot})"
+
+class Scope:
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.symbols = {}
+        self.variables = []    # in slot order
+        self.functions = []    # in declaration order, global scope only
+        self.uses = {}         # filled by resolve(): name -> Symbol
+
+    def find(self, name):
+        scope = self
+        while scope is not None:
+            symbol = scope.symbols.get(name)
+            if symbol is not None:
+                return symbol
+            scope = scope.parent
+        return None
+
+def at_where(where):
+    # where is the (lexer, offset) of the name in the source, if known
+    return f" at {describe(*where)}" if where else ''
+
+class SymbolTable:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.globals = self.scope = Scope()
+
+    def enter(self):
+        self.scope = Scope(self.scope)
+        return self.scope
+
+    def leave(self):
+        self.scope = self.scope.parent
+
+    def declare(self, name, var_type, where=None, kind='var', params=None):
+        scope = self.globals if kind in ('function', 'implicit') else self.scope
+        name = sys.intern(name)
+        if name in scope.symbols:
+            raise Exception(f"Symbol '{name}' already declared" + at_where(where))
+        if kind == 'function':
+            symbol = Symbol(name, kind, var_type, scope.depth, len(scope.functions), params)
+            scope.functions.append(symbol)
+        else:
+            symbol = Symbol(name, kind, var_type, scope.depth, len(scope.variables))
+            scope.variables.append(symbol)
+        scope.symbols[name] = symbol
+        return symbol
+
+    def lookup(self, name, where=None):
+        symbol = self.scope.find(name)
+        if symbol is None:
+            raise Exception(f"Symbol '{name}' not declared" + at_where(where))
+        return symbol
+
+    def function(self, name, where=None):
+        symbol = self.globals.symbols.get(name)
+        if symbol is None:
+            raise Exception(f"Symbol '{name}' not declared" + at_where(where))
+        if symbol.kind != 'function':
+            raise Exception(f"Semantic error: '{name}' is not a function" + at_where(where))
+        return symbol
+
+    def variable(self, name):
+        # names nobody declared become globals, as every back end treats them
+        symbol = self.scope.find(name)
+        if symbol is None:
+            return self.declare(name, 'int', kind='implicit')
+        if symbol.kind == 'function':
+            raise Exception(f"Semantic error: function '{name}' used as a variable")
+        return symbol
+
+    @property
+    def symbols(self):
+        # name -> type of the global scope
+        return {name: symbol.type for name, symbol in self.globals.symbols.items()}
+
+# ---------------- Resolution -------------------------
+
+class Resolution:
+    def __init__(self, table, scopes):
+        self.globals = table.globals
+        self.scopes = scopes    # one per function, in ast.funcs order
+
+# the children of each node that can contain variable uses
+_CHILDREN = {
+    'CmdAtrib': attrgetter('expr'),
+    'CmdIf': attrgetter('cond', 'then', 'orelse'),
+    'CmdWhile': attrgetter('cond', 'body'),
+    'CmdFor': attrgetter('init', 'limit', 'body'),
+    'CmdPrint': attrgetter('args'),
+    'CmdReturn': attrgetter('value'),
+    'CmdSeq': attrgetter('cmds'),
+    'BinOp': attrgetter('left', 'right'),
+    'UnOp': attrgetter('operand'),
+    'Group': attrgetter('expr'),
+    'FunctionCall': attrgetter('args'),
+}
+_NOT_NAMES = frozenset(('true', 'false'))
+
+def _resolve_uses(table, cmds):
+    # iterative, so expressions thousands of operators deep are fine
+    uses = table.scope.uses
+    stack = list(cmds)
+    while stack:
+        node = stack.pop()
+        if type(node) is str:
+            if node not in uses and node not in _NOT_NAMES:
+                uses[node] = table.variable(node)
+        elif isinstance(node, Node):
+            if node.tag == 'FunctionCall':
+                table.function(node.name)
+            getter = _CHILDREN.get(node.tag)
+            if getter is None:
+                continue
+            children = getter(node)
+            if type(children) is not tuple:
+                children = (children,)
+            for child in children:
+                if type(child) is list:
+                    stack.extend(child)
+                elif child is not None:
+                    stack.append(child)
+
+def resolve(ast):
+    table = SymbolTable()
+    for var in ast.global_vars:
+        table.declare(var.name, var.type)
+    for fn in ast.funcs:
+        table.declare(fn.name, fn.rtype, kind='function', params=[p.type for p in fn.params])
+    scopes = []
+    for fn in ast.funcs:
+        scopes.append(table.enter())
+        for var in fn.params:
+            table.declare(var.name, var.type, kind='param')
+        for var in fn.local_vars:
+            table.declare(var.name, var.type)
+        _resolve_uses(table, fn.body)
+        table.leave()
+    _resolve_uses(table, [ast.main])
+    return Resolution(table, scopes)
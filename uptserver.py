@@ -0,0 +1,211 @@
+import argparse
+import asyncio
+import io
+import marshal
+import os
+import signal
+import stat
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+
+import uptcache
+from uptclient import default_socket_path, encode, is_private_dir, peer_uid, request
+
+# ---------------- Compile server -------------------------
+#
+#   python uptserver.py [--socket PATH] [-j 4] &
+#   python uptclient.py prog.upt -O2 --run vm --input 10
+#
+# A long lived process that compiles for uptclient.py, so a build that runs
+# the compiler once per file pays for python, PLY's tables and the lexer
+# once instead of every time. It listens on a Unix socket only its user
+# may connect to; every connection carries one request and gets one
+# response, dicts marshalled behind their length (see uptclient):
+#
+#   {"op": "uptc", "argv": [...], "cwd": ..., "env": {...}, "stdin": ...}
+#       -> {"status": 0, "stdout": ..., "stderr": ..., "seconds": ...}
+#   {"op": "ping"}     -> {"status": 0, "pid": ..., "jobs": ...}
+#   {"op": "stats"}    -> {"status": 0, "requests": ..., "busy": ...}
+#   {"op": "shutdown"} -> {"status": 0}
+#
+# asyncio accepts any number of connections and hands each uptc request to
+# a pool of worker processes, which run uptc.main() exactly as the command
+# line would, output captured, from the client's directory and with its
+# environment (uptclient.ENVIRONMENT). Connections from other users are
+# closed unanswered. A worker imports and warms the lexer
+# and parser once, and keeps a uptcache.MemoryCache per cache directory in
+# front of the disk cache, so a file compiled before is not even unpickled
+# again. Requests run in parallel up to --jobs, the rest wait their turn.
+
+_caches = {}
+
+def _init_worker():
+    # every table and module a compile needs, loaded once per worker
+    from uptlexer import get_lexer
+    from uptparser import get_parser
+    import uptc
+    import uptcheck
+    import uptvm
+    get_lexer()
+    get_parser()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)    # the server shuts the pool down
+
+def _cache_for(cache_dir):
+    directory = os.path.abspath(cache_dir or uptcache.default_cache_dir())
+    cache = _caches.get(directory)
+    if cache is None:
+        cache = _caches[directory] = uptcache.MemoryCache(uptcache.CompileCache(directory))
+    return cache
+
+def _run_uptc(message):
+    import uptc
+    start = time.perf_counter()
+    out = io.StringIO()
+    err = io.StringIO()
+    saved_env = {name: os.environ.get(name) for name in message.get('env', {})}
+    saved_cwd = os.getcwd()
+    saved_stdin = sys.stdin
+    try:
+        os.environ.update(message.get('env', {}))
+        os.chdir(message.get('cwd') or saved_cwd)
+        sys.stdin = io.StringIO(message.get('stdin', ''))
+        with redirect_stdout(out), redirect_stderr(err):
+            try:
+                status = uptc.main(message['argv'], cache_for=_cache_for)
+            except SystemExit as e:
+                # argparse errors and --help
+                status = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                if isinstance(e.code, str):
+                    print(e.code, file=sys.stderr)
+            except Exception:
+                # what python prints when uptc.py dies of it
+                traceback.print_exc()
+                status = 1
+    finally:
+        sys.stdin = saved_stdin
+        os.chdir(saved_cwd)
+        for name, value in saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    return {'status': status or 0, 'stdout': out.getvalue(), 'stderr': err.getvalue(),
+            'seconds': time.perf_counter() - start}
+
+class Server:
+    def __init__(self, path, jobs):
+        self.path = path
+        self.jobs = jobs
+        self.requests = 0
+        self.busy = 0
+        self.pool = None
+        self.stopped = None
+
+    async def handle(self, reader, writer):
+        try:
+            uid = peer_uid(writer.get_extra_info('socket'))
+            if uid is not None and uid != os.getuid():
+                return
+            try:
+                size = int.from_bytes(await reader.readexactly(8), 'big')
+                message = marshal.loads(await reader.readexactly(size))
+            except (asyncio.IncompleteReadError, EOFError, ValueError, TypeError):
+                return
+            try:
+                response = await self.respond(message)
+            except Exception as e:
+                response = {'status': 1, 'stdout': '', 'stderr': f"uptserver: {e}\n"}
+            writer.write(encode(response))
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def respond(self, message):
+        op = message.get('op')
+        if op == 'uptc':
+            self.requests += 1
+            self.busy += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self.pool, _run_uptc, message)
+            finally:
+                self.busy -= 1
+        if op == 'ping':
+            return {'status': 0, 'pid': os.getpid(), 'jobs': self.jobs}
+        if op == 'stats':
+            return {'status': 0, 'requests': self.requests, 'busy': self.busy}
+        if op == 'shutdown':
+            self.stopped.set()
+            return {'status': 0}
+        raise Exception(f"unknown request '{op}'")
+
+    async def serve(self):
+        self.stopped = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stopped.set)
+        self.pool = ProcessPoolExecutor(self.jobs, initializer=_init_worker)
+        # start every worker now, not on the first requests
+        await asyncio.gather(*[loop.run_in_executor(self.pool, os.getpid) for _ in range(self.jobs)])
+        # the socket is created 0600: only this user may have files compiled
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self.handle, self.path)
+        finally:
+            os.umask(umask)
+        try:
+            async with server:
+                await self.stopped.wait()
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+def _private_dir(directory):
+    # the default socket's directory, made if missing; nobody else may
+    # have made it or be let in
+    os.makedirs(directory, 0o700, exist_ok=True)
+    if not is_private_dir(directory):
+        raise Exception(f"{directory} must be a directory of this user that only it can access")
+
+def _claim(path):
+    # a socket file nobody listens on is left from a server that died,
+    # and is removed; any other file at path is left alone
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if st.st_uid != os.getuid():
+        raise Exception(f"{path} belongs to uid {st.st_uid}, not removing it")
+    if not stat.S_ISSOCK(st.st_mode):
+        raise Exception(f"{path} is not a socket, not removing it")
+    try:
+        request({'op': 'ping'}, path)
+    except PermissionError:
+        raise Exception(f"{path} is served by another user") from None
+    except OSError:
+        os.unlink(path)
+        return
+    raise Exception(f"a compile server already listens on {path}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog='uptserver', description='Serve uptclient.py compile requests')
+    ap.add_argument('--socket', default=None, help='Unix socket to listen on (default $UPTC_SOCKET, or '
+                                                   'uptc.sock in $XDG_RUNTIME_DIR or in a private '
+                                                   'uptc-<uid> directory of $TMPDIR or /tmp)')
+    ap.add_argument('-j', '--jobs', type=int, default=0, help='worker processes (default: one per core)')
+    args = ap.parse_args(argv)
+    path = args.socket or default_socket_path()
+    if not args.socket and 'UPTC_SOCKET' not in os.environ:
+        _private_dir(os.path.dirname(path))
+    _claim(path)
+    server = Server(path, args.jobs or os.cpu_count() or 1)
+    print(f"uptserver: listening on {path} with {server.jobs} workers", file=sys.stderr)
+    asyncio.run(server.serve())
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+import mmap
+import os
+import re
+from array import array
+from bisect import bisect_left
+
+# ---------------- Source files and positions -------------------------
+#
+# SourceFile maps a file into memory instead of reading it into one str.
+# uptscan tokenizes the mapped bytes directly and tokens and AST nodes only
+# record offsets; line and column are computed when a diagnostic needs them,
+# from a LineIndex of newline offsets built once per source.
+#
+#   with SourceFile('big.upt') as src:
+#       ast = Compiler(scanner='fast').parse(src.data)
+#       line, column = src.position(ast.funcs[0].offset)
+
+_NEWLINE = {str: re.compile('\n'), bytes: re.compile(b'\n')}
+
+class LineIndex:
+    # data is a str, bytes or mmap; offsets and columns are in the same
+    # units (characters for str, bytes otherwise)
+    def __init__(self, data):
+        newline = _NEWLINE[str if isinstance(data, str) else bytes]
+        self.data = data
+        self.newlines = array('q', map(re.Match.start, newline.finditer(data)))
+
+    def position(self, offset):
+        # (line, column), both starting at 1
+        line = bisect_left(self.newlines, offset)
+        start = self.newlines[line - 1] + 1 if line else 0
+        return line + 1, offset - start + 1
+
+def line_index(lexer):
+    # the index of the input the lexer (PLY or uptscan) is reading, built on
+    # first use and kept on the lexer until the next input
+    index = getattr(lexer, 'line_index', None)
+    if index is None or index.data is not lexer.lexdata:
+        index = lexer.line_index = LineIndex(lexer.lexdata)
+    return index
+
+def describe(lexer, offset):
+    line, column = line_index(lexer).position(offset)
+    return f"line {line}, column {column}"
+
+class SourceFile:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            # empty files cannot be mapped
+            if os.fstat(f.fileno()).st_size:
+                self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.data = b''
+        self._lines = None
+
+    @property
+    def lines(self):
+        if self._lines is None:
+            self._lines = LineIndex(self.data)
+        return self._lines
+
+    def position(self, offset):
+        return self.lines.position(offset)
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
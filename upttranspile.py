@@ -0,0 +1,363 @@
+import types
+
+from uptast import expr_kind, is_assign, default_value, cmd_names
+from uptruntime import int_div, int_mod, int_pow, make_reader, make_printer
+
+# ---------------- Transpiler: AST -> python source -> code objects -------------------------
+#
+# Each UPT function becomes a python function whose parameters and local
+# variables are python locals. Program variables that no function touches
+# stay locals of main(), the others are module globals.
+# UPT names are prefixed (v_ for variables, f_ for functions) so they never
+# clash with python keywords or builtins.
+#
+# Python refuses expressions nested much deeper than MAX_NESTING (it allows
+# 200 levels of parentheses, and its compiler recurses once per level), so
+# a deeper one is computed by a run of statements, one temporary per
+# operation, in the order the expression evaluates its operands. Nesting
+# no statement can avoid (more than 20 loops inside each other, 100 levels
+# of indentation) makes compile_program run the program on the VM instead.
+
+PY_OPS = {
+    '+': '+', '-': '-', '*': '*',
+    '==': '==', '!=': '!=', '<': '<', '>': '>', '<=': '<=', '>=': '>=',
+    'and': 'and', 'or': 'or',
+}
+
+RUNTIME_OPS = {'/': '_div', '%': '_mod', '**': '_pow'}
+
+MAX_NESTING = 64
+
+class _TooDeep(Exception):
+    pass
+
+def _var(name):
+    return 'v_' + name
+
+def _func(name):
+    return 'f_' + name
+
+# ---- code generation ----
+
+class _FunctionWriter:
+    def __init__(self, functions, fast, is_main):
+        self.functions = functions    # UPT name -> number of parameters
+        self.fast = fast              # UPT names held in python locals
+        self.is_main = is_main
+        self.lines = []
+        self.depth = 1
+        self.loops = 0
+        self.temps = 0
+
+    def line(self, text):
+        self.lines.append('    ' * self.depth + text)
+
+    def block(self, node):
+        self.depth += 1
+        start = len(self.lines)
+        self.cmd(node)
+        if len(self.lines) == start:
+            self.line('pass')
+        self.depth -= 1
+
+    def cmd(self, node):
+        tag = node.tag
+        if tag == 'CmdAtrib':
+            self.expr_stmt(node.expr)
+        elif tag == 'CmdSeq':
+            for cmd in node.cmds:
+                self.cmd(cmd)
+        elif tag == 'CmdIf':
+            self.line(f"if {self.value(node.cond)}:")
+            self.block(node.then)
+            if node.orelse is not None:
+                self.line('else:')
+                self.block(node.orelse)
+        elif tag == 'CmdWhile':
+            try:
+                cond = self.expr(node.cond)
+            except _TooDeep:
+                # the statements computing the condition run before each test
+                self.line('while True:')
+                self.depth += 1
+                self.line(f"if not {self.spill(node.cond)}:")
+                self.line('    break')
+                self.depth -= 1
+            else:
+                self.line(f"while {cond}:")
+            self.loops += 1
+            self.block(node.body)
+            self.loops -= 1
+        elif tag == 'CmdFor':
+            self.for_loop(node)
+        elif tag == 'CmdBreak':
+            if not self.loops:
+                raise Exception("Semantic error: break outside of a loop")
+            self.line('break')
+        elif tag == 'CmdPrint':
+            try:
+                values = [self.expr(e) for e in node.args]
+            except _TooDeep:
+                # every argument, or one would run before those left of it
+                values = [self.spill(e) for e in node.args]
+            values = ''.join(v + ', ' for v in values)
+            self.line(f"_print(({values}))")
+        elif tag == 'CmdReturn':
+            if self.is_main:
+                self.expr_stmt(node.value)
+                self.line('return')
+            else:
+                self.line(f"return {self.value(node.value)}")
+        else:
+            raise Exception(f"Unknown command '{tag}'")
+
+    def for_loop(self, node):
+        init = node.init
+        var = init.left if is_assign(init) else init
+        if expr_kind(var) != 'ID':
+            raise Exception("Semantic error: for loop needs a variable")
+        self.expr_stmt(init)
+        limit = f"_limit{self.temps}"
+        self.temps += 1
+        self.line(f"{limit} = {self.value(node.limit)}")
+        body_used, body_assigned = set(), set()
+        cmd_names(node.body, body_used, body_assigned)
+        v = _var(var)
+        self.loops += 1
+        if var in self.fast and var not in body_assigned:
+            # nothing else can change the counter, iterate a range and
+            # leave it at limit + 1 afterwards like the generic loop does
+            self.line(f"for {v} in range({v}, {limit} + 1):")
+            self.block(node.body)
+            self.line('else:')
+            self.line(f"    if {v} <= {limit}:")
+            self.line(f"        {v} = {limit} + 1")
+        else:
+            self.line(f"while {v} <= {limit}:")
+            self.depth += 1
+            self.cmd(node.body)
+            self.line(f"{v} = {v} + 1")
+            self.depth -= 1
+        self.loops -= 1
+
+    def expr_stmt(self, e):
+        kind = expr_kind(e)
+        if kind == 'BinOp' and e.op == '=':
+            self.line(f"{_var(e.left)} = {self.value(e.right)}")
+        elif kind in ('BinOp', 'UnOp', 'Group', 'FunctionCall', 'Read'):
+            self.line(self.value(e))
+
+    def value(self, e):
+        # e as python source, a temporary if it nests too deep for python
+        try:
+            return self.expr(e)
+        except _TooDeep:
+            return self.spill(e)
+
+    def temp(self):
+        name = f"_t{self.temps}"
+        self.temps += 1
+        return name
+
+    def callee(self, e):
+        name = e.name
+        if name not in self.functions:
+            raise Exception(f"Symbol '{name}' not declared")
+        if len(e.args) != self.functions[name]:
+            raise Exception(f"Semantic error: Function '{name}' expects {self.functions[name]} arguments, got {len(e.args)}")
+        return _func(name)
+
+    def spill(self, e):
+        # the name of a temporary holding e, computed by the statements
+        # _spill emits; iterative, each _spill yields the operands it needs
+        # and is sent back where they are
+        stack = [self._spill(e, None)]
+        result = None
+        while True:
+            try:
+                operand, guard = stack[-1].send(result)
+            except StopIteration as stop:
+                stack.pop()
+                if not stack:
+                    return stop.value
+                result = stop.value
+            else:
+                stack.append(self._spill(operand, guard))
+                result = None
+
+    def _spill(self, e, guard):
+        # statements under a guard only run if it holds: the right operand
+        # of and/or gets a guard variable, not a nested if
+        def emit(text):
+            self.line(text if guard is None else f"if {guard}: {text}")
+        kind = expr_kind(e)
+        try:
+            text = self.expr(e)
+        except _TooDeep:
+            pass
+        else:
+            if kind == 'INT' or kind == 'BOOL':
+                return text
+            t = self.temp()
+            emit(f"{t} = {text}")
+            return t
+        if kind == 'BinOp':
+            op = e.op
+            if op == '=':
+                right = yield e.right, guard
+                emit(f"{_var(e.left)} = {right}")
+                return right
+            left = yield e.left, guard
+            if op == 'and' or op == 'or':
+                g = self.temp()
+                cond = left if op == 'and' else f"not {left}"
+                self.line(f"{g} = {cond}" if guard is None else f"{g} = {guard} and {cond}")
+                right = yield e.right, g
+                text = f"{right} if {g} else {left}"
+            else:
+                right = yield e.right, guard
+                if op in RUNTIME_OPS:
+                    text = f"{RUNTIME_OPS[op]}({left}, {right})"
+                else:
+                    text = f"{left} {PY_OPS[op]} {right}"
+        elif kind == 'UnOp':
+            operand = yield e.operand, guard
+            text = f"-{operand}" if e.op == '-' else f"not {operand}"
+        elif kind == 'Group':
+            return (yield e.expr, guard)
+        elif kind == 'FunctionCall':
+            callee = self.callee(e)
+            args = []
+            for a in e.args:
+                args.append((yield a, guard))
+            text = f"{callee}({', '.join(args)})"
+        else:
+            raise Exception(f"Unknown expression '{kind}'")
+        t = self.temp()
+        emit(f"{t} = {text}")
+        return t
+
+    def expr(self, e, depth=0):
+        if depth > MAX_NESTING:
+            raise _TooDeep()
+        depth += 1
+        kind = expr_kind(e)
+        if kind == 'INT':
+            return repr(e)
+        if kind == 'BOOL':
+            return 'True' if e == 'true' else 'False'
+        if kind == 'ID':
+            return _var(e)
+        if kind == 'Read':
+            return '_read()'
+        if kind == 'BinOp':
+            op = e.op
+            if op == '=':
+                return f"({_var(e.left)} := {self.expr(e.right, depth)})"
+            if op in RUNTIME_OPS:
+                return f"{RUNTIME_OPS[op]}({self.expr(e.left, depth)}, {self.expr(e.right, depth)})"
+            return f"({self.expr(e.left, depth)} {PY_OPS[op]} {self.expr(e.right, depth)})"
+        if kind == 'UnOp':
+            if e.op == '-':
+                return f"(-{self.expr(e.operand, depth)})"
+            return f"(not {self.expr(e.operand, depth)})"
+        if kind == 'Group':
+            return self.expr(e.expr, depth)
+        if kind == 'FunctionCall':
+            callee = self.callee(e)
+            return f"{callee}({', '.join(self.expr(a, depth) for a in e.args)})"
+        raise Exception(f"Unknown expression '{kind}'")
+
+def transpile(ast):
+    functions = {}
+    for fn in ast.funcs:
+        if fn.name in functions:
+            raise Exception(f"Symbol '{fn.name}' already declared")
+        functions[fn.name] = len(fn.params)
+
+    out = [f"# UPT program {ast.name}", '']
+    shared = set()
+    for fn in ast.funcs:
+        local_names = {}
+        for var in fn.params + fn.local_vars:
+            if var.name in local_names:
+                raise Exception(f"Symbol '{var.name}' already declared")
+            local_names[var.name] = var.type
+        used, assigned = set(), set()
+        for cmd in fn.body:
+            cmd_names(cmd, used, assigned)
+        shared |= used - set(local_names)
+
+        writer = _FunctionWriter(functions, set(local_names), False)
+        out.append(f"def {_func(fn.name)}({', '.join(_var(p.name) for p in fn.params)}):")
+        globals_written = sorted(assigned - set(local_names))
+        if globals_written:
+            writer.line('global ' + ', '.join(_var(g) for g in globals_written))
+        for var in fn.local_vars:
+            writer.line(f"{_var(var.name)} = {default_value(var.type)!r}")
+        for cmd in fn.body:
+            writer.cmd(cmd)
+        writer.line(f"return {default_value(fn.rtype)!r}")
+        out.extend(writer.lines)
+        out.append('')
+
+    declared = {v.name: v.type for v in ast.global_vars}
+    used, assigned = set(), set()
+    cmd_names(ast.main, used, assigned)
+    program_vars = sorted(set(declared) | used | shared)
+    writer = _FunctionWriter(functions, set(program_vars) - shared, True)
+    out.append('def main(inputs=None, out=None):')
+    writer.line('global ' + ', '.join(['_read', '_print'] + [_var(v) for v in program_vars if v in shared]))
+    writer.line('_read = _make_reader(inputs)')
+    writer.line('_print = _make_printer(out)')
+    for var in program_vars:
+        writer.line(f"{_var(var)} = {default_value(declared.get(var))!r}")
+    writer.cmd(ast.main)
+    out.extend(writer.lines)
+    out.append('')
+    return '\n'.join(out)
+
+class UptModule(types.ModuleType):
+    # calling the module runs the program: module(inputs, out)
+    def __call__(self, inputs=None, out=None):
+        return self.main(inputs, out)
+
+def compile_program(ast, memo=None):
+    # memo: a uptpure.MemoTable, its pure functions are wrapped in their
+    # Memo (recursive calls go through the module globals, so they too)
+    name = ast.name
+    try:
+        source = transpile(ast)
+        code = compile(source, f"<upt {name}>", 'exec')
+    except (SyntaxError, RecursionError, MemoryError):
+        # nested deeper than python compiles (its parser reports a source
+        # too complex with a MemoryError)
+        return _vm_module(ast, memo)
+    module = UptModule(name)
+    module.__dict__.update(
+        _div=int_div, _mod=int_mod, _pow=int_pow,
+        _make_reader=make_reader, _make_printer=make_printer,
+        _read=make_reader(), _print=make_printer(),
+        __source__=source,
+    )
+    exec(code, module.__dict__)
+    if memo is not None:
+        for fn_name, fn_memo in memo.memos.items():
+            key = _func(fn_name)
+            module.__dict__[key] = fn_memo.wrap(module.__dict__[key])
+    # expose UPT functions under their own names as well
+    for key, value in list(module.__dict__.items()):
+        if key.startswith('f_') and not hasattr(module, key[2:]):
+            setattr(module, key[2:], value)
+    return module
+
+def _vm_module(ast, memo):
+    # a module that runs the program on the VM, with no python functions
+    import uptvm
+    program = uptvm.compile_program(ast)
+    module = UptModule(ast.name)
+    module.main = lambda inputs=None, out=None: uptvm.run(program, inputs, out, memo)
+    return module
+
+def execute(ast, inputs=None, out=None, memo=None):
+    compile_program(ast, memo)(inputs, out)
@@ -0,0 +1,321 @@
+import io
+
+from uptast import Node, default_value
+from uptruntime import format_value
+
+# ---------------- Vectorized batch execution -------------------------
+#
+#   for output, error in uptvector.run_batch(ast, [[10], [20], [30]]):
+#       ...
+#
+# Runs one program over a whole batch of input vectors at once, one lane
+# per input vector: every variable is a NumPy array with a value per lane,
+# and the AST is walked once for all of them, each operation done on whole
+# arrays. numpy is only needed here and only imported when a batch runs.
+#
+# Lanes diverge at every branch, so each command runs under a mask of the
+# lanes taking it and returns the mask of those that go on to the next
+# command. An if runs both arms under complementary masks; a loop runs
+# until its mask is empty; a lane leaves it when its condition fails, at
+# break, or at return. Side effects only touch masked lanes: assignments
+# merge with np.where, read() takes the next input of each masked lane and
+# print appends a line to each masked lane's output. The right side of
+# and/or and function bodies run under the narrower mask of the lanes that
+# get there, so a call nobody makes (the end of a recursion) is not made.
+#
+# Values are int64 kept below 2**62 in magnitude, where every +, - and *
+# is exact and overflow shows before it wraps (ints are unbounded in the
+# other back ends). A lane that would leave that range, that divides by
+# zero, reads past its inputs, or meets any other runtime error spills: it
+# drops out of the vector run and is run again from the start on the VM
+# (uptvm), whose output and error it gets, so every lane's result is the
+# one the VM gives for its inputs. A program recursing deeper than python
+# allows spills every lane.
+#
+# run_batch() returns, per input vector, (output, error): everything the
+# program printed and None, or the runtime error message.
+
+# |value| < SAFE for every int a lane holds, so a sum or difference of two
+# fits int64 and is then checked; products are estimated in float64 first
+SAFE = 1 << 62
+_FLOAT_SAFE = float(1 << 61)
+
+class _Frame:
+    # vars is None for the program's main, whose variables are the globals;
+    # returned holds the lanes that ran a return (in main: that stopped)
+    __slots__ = ('vars', 'returned', 'value')
+
+    def __init__(self, vars, returned, value):
+        self.vars = vars
+        self.returned = returned
+        self.value = value
+
+class VectorMachine:
+    def __init__(self, ast, inputs):
+        try:
+            import numpy
+        except ImportError:
+            raise Exception("Vector back end: numpy is not installed") from None
+        np = self.np = numpy
+        self.ast = ast
+        self.inputs = [[int(v) for v in vector] for vector in inputs]
+        lanes = self.lanes = len(self.inputs)
+        self.functions = {fn.name: fn for fn in ast.funcs}
+        self.globals = {v.name: self.full(default_value(v.type)) for v in ast.global_vars}
+        self.outputs = [[] for _ in range(lanes)]
+        self.dead = np.zeros(lanes, bool)      # spilled to the VM
+        self.spilled = 0
+
+        # read(): lane i reads table[i, cursor[i]] while cursor[i] < lengths[i]
+        width = max(map(len, self.inputs), default=0)
+        self.table = np.zeros((lanes, max(width, 1)), np.int64)
+        self.lengths = np.array([len(vector) for vector in self.inputs], np.int64)
+        self.cursor = np.zeros(lanes, np.int64)
+        for lane, vector in enumerate(self.inputs):
+            if any(not -SAFE < v < SAFE for v in vector):
+                self.dead[lane] = True
+            else:
+                self.table[lane, :len(vector)] = vector
+
+    def full(self, value):
+        np = self.np
+        return np.full(self.lanes, value, bool if type(value) is bool else np.int64)
+
+    def spill(self, lanes):
+        self.dead |= lanes
+
+    def run(self):
+        np = self.np
+        if self.lanes:
+            main = _Frame(None, np.zeros(self.lanes, bool), None)
+            try:
+                with np.errstate(all='ignore'):
+                    self.exec_cmd(self.ast.main, ~self.dead, main)
+            except RecursionError:
+                self.dead[:] = True
+        return self.results()
+
+    def results(self):
+        # lanes that spilled run again, alone, on the VM
+        import uptvm
+        results = [(''.join(lines), None) for lines in self.outputs]
+        spilled = self.np.flatnonzero(self.dead).tolist()
+        self.spilled = len(spilled)
+        if spilled:
+            program = uptvm.compile_program(self.ast)
+            for lane in spilled:
+                out = io.StringIO()
+                try:
+                    uptvm.run(program, self.inputs[lane], out)
+                    error = None
+                except Exception as e:
+                    error = str(e)
+                results[lane] = (out.getvalue(), error)
+        return results
+
+    # ---- commands: each returns the mask of lanes that go on ----
+
+    def exec_cmd(self, node, mask, frame):
+        tag = node.tag
+        if tag == 'CmdAtrib':
+            if isinstance(node.expr, Node):
+                self.eval_expr(node.expr, mask, frame)
+            return mask & ~self.dead
+        if tag == 'CmdSeq':
+            return self.exec_block(node.cmds, mask, frame)
+        if tag == 'CmdIf':
+            cond = self.eval_expr(node.cond, mask, frame)
+            then = mask & cond
+            orelse = mask & ~cond
+            if then.any():
+                then = self.exec_cmd(node.then, then, frame)
+            if node.orelse is not None and orelse.any():
+                orelse = self.exec_cmd(node.orelse, orelse, frame)
+            return (then | orelse) & ~self.dead
+        if tag == 'CmdWhile':
+            active = mask
+            while True:
+                active = active & ~self.dead
+                if not active.any():
+                    break
+                active = active & self.eval_expr(node.cond, active, frame) & ~self.dead
+                if not active.any():
+                    break
+                # break and return take lanes out of active
+                active = self.exec_cmd(node.body, active, frame)
+            return mask & ~frame.returned & ~self.dead
+        if tag == 'CmdFor':
+            init = node.init
+            self.eval_expr(init, mask, frame)
+            var = init.left if isinstance(init, Node) else init
+            limit = self.eval_expr(node.limit, mask, frame)
+            active = mask & ~self.dead
+            while True:
+                active = active & (self.lookup(var, frame) <= limit)
+                if not active.any():
+                    break
+                active = self.exec_cmd(node.body, active, frame)
+                # lanes that finished the body count on, not those that broke
+                self.assign(var, self.arith('+', self.lookup(var, frame), 1, active), active, frame)
+                active = active & ~self.dead
+            return mask & ~frame.returned & ~self.dead
+        if tag == 'CmdBreak':
+            return mask & False
+        if tag == 'CmdPrint':
+            values = [self.eval_expr(e, mask, frame) for e in node.args]
+            self.print_lanes(values, mask & ~self.dead)
+            return mask & ~self.dead
+        if tag == 'CmdReturn':
+            value = self.eval_expr(node.value, mask, frame)
+            if frame.vars is not None:
+                frame.value = self.np.where(mask, value, frame.value)
+            frame.returned |= mask
+            return mask & False
+        raise Exception(f"Unknown command '{tag}'")
+
+    def exec_block(self, cmds, mask, frame):
+        for cmd in cmds:
+            if not mask.any():
+                break
+            mask = self.exec_cmd(cmd, mask, frame)
+        return mask
+
+    def print_lanes(self, values, mask):
+        np = self.np
+        lanes = np.flatnonzero(mask)
+        if not len(lanes):
+            return
+        columns = [np.broadcast_to(v, (self.lanes,))[lanes].tolist() for v in values]
+        outputs = self.outputs
+        for lane, row in zip(lanes.tolist(), zip(*columns)):
+            outputs[lane].append(' '.join([format_value(v) for v in row]) + '\n')
+
+    # ---- expressions: arrays of one value per lane, meaningful in mask ----
+
+    def lookup(self, name, frame):
+        if frame.vars is not None and name in frame.vars:
+            return frame.vars[name]
+        value = self.globals.get(name)
+        return self.full(0) if value is None else value
+
+    def assign(self, name, value, mask, frame):
+        np = self.np
+        if frame.vars is not None and name in frame.vars:
+            frame.vars[name] = np.where(mask, value, frame.vars[name])
+        else:
+            old = self.globals.get(name)
+            self.globals[name] = np.where(mask, value, self.full(0) if old is None else old)
+
+    def eval_expr(self, node, mask, frame):
+        np = self.np
+        if type(node) is int:
+            if not -SAFE < node < SAFE:
+                self.spill(mask)
+                return self.full(0)
+            return np.int64(node)
+        if type(node) is str:
+            if node == 'true':
+                return np.True_
+            if node == 'false':
+                return np.False_
+            return self.lookup(node, frame)
+        tag = node.tag
+        if tag == 'BinOp':
+            op = node.op
+            if op == '=':
+                value = self.eval_expr(node.right, mask, frame)
+                self.assign(node.left, value, mask, frame)
+                return value
+            if op == 'and' or op == 'or':
+                left = self.eval_expr(node.left, mask, frame).astype(bool)
+                # the right side only for lanes the left side does not decide
+                rest = mask & left if op == 'and' else mask & ~left
+                if not rest.any():
+                    return left
+                right = self.eval_expr(node.right, rest, frame).astype(bool)
+                return left & right if op == 'and' else left | right
+            a = self.eval_expr(node.left, mask, frame)
+            b = self.eval_expr(node.right, mask, frame)
+            if op == '==':
+                return a == b
+            if op == '!=':
+                return a != b
+            if op == '<':
+                return a < b
+            if op == '>':
+                return a > b
+            if op == '<=':
+                return a <= b
+            if op == '>=':
+                return a >= b
+            return self.arith(op, a, b, mask)
+        if tag == 'UnOp':
+            value = self.eval_expr(node.operand, mask, frame)
+            return -value if node.op == '-' else ~value
+        if tag == 'Group':
+            return self.eval_expr(node.expr, mask, frame)
+        if tag == 'Read':
+            return self.read(mask)
+        if tag == 'FunctionCall':
+            args = [self.eval_expr(e, mask, frame) for e in node.args]
+            return self.call(node.name, args, mask & ~self.dead)
+        raise Exception(f"Unknown expression '{tag}'")
+
+    def arith(self, op, a, b, mask):
+        # uptruntime's rules, lane by lane; lanes of mask that break one, or
+        # leave the safe range, spill
+        np = self.np
+        if op == '+' or op == '-':
+            value = a + b if op == '+' else a - b
+        elif op == '*':
+            estimate = np.multiply(a, b, dtype=np.float64)
+            self.spill(mask & ~(np.abs(estimate) < _FLOAT_SAFE))
+            value = a * b
+        elif op == '/' or op == '%':
+            zero = b == 0
+            self.spill(mask & zero)
+            b = np.where(zero, 1, b)
+            q = np.abs(a) // np.abs(b)
+            q = np.where((a < 0) != (b < 0), -q, q)
+            value = q if op == '/' else a - b * q
+        elif op == '**':
+            self.spill(mask & (b < 0))
+            estimate = np.power(np.abs(a).astype(np.float64), np.maximum(b, 0))
+            bad = ~(estimate < _FLOAT_SAFE)
+            self.spill(mask & bad)
+            value = np.power(np.where(bad, 0, a), np.where(bad | (b < 0), 0, b))
+        else:
+            raise Exception(f"Unknown operator '{op}'")
+        self.spill(mask & ((value >= SAFE) | (value <= -SAFE)))
+        return value
+
+    def read(self, mask):
+        np = self.np
+        past = mask & (self.cursor >= self.lengths)
+        self.spill(past)
+        lanes = np.flatnonzero(mask & ~past & ~self.dead)
+        value = self.full(0)
+        value[lanes] = self.table[lanes, self.cursor[lanes]]
+        self.cursor[lanes] += 1
+        return value
+
+    def call(self, name, args, mask):
+        np = self.np
+        fn = self.functions.get(name)
+        if fn is None or len(args) != len(fn.params):
+            # the VM says what is wrong, for the lanes that get here
+            self.spill(mask)
+            return self.full(0)
+        result = self.full(default_value(fn.rtype))
+        if not mask.any():
+            return result
+        vars = {v.name: self.full(default_value(v.type)) for v in fn.local_vars}
+        for param, value in zip(fn.params, args):
+            vars[param.name] = np.array(np.broadcast_to(value, (self.lanes,)))
+        frame = _Frame(vars, np.zeros(self.lanes, bool), result)
+        self.exec_block(fn.body, mask, frame)
+        return frame.value
+
+def run_batch(ast, inputs):
+    # [(output, error)], one per vector of read() values in inputs
+    return VectorMachine(ast, inputs).run()
@@ -0,0 +1,526 @@
+from array import array
+
+from uptast import expr_kind, is_assign, default_value
+from uptruntime import int_div, int_mod, int_pow, make_reader, make_printer
+from uptpure import MISSING
+from uptscope import resolve
+
+# ---------------- Bytecode -------------------------
+#
+# Every instruction is two ints, (opcode, argument), stored in an array('i').
+# Jump arguments are absolute positions in the same code array.
+
+LOAD_LOCAL = 0
+LOAD_CONST = 1
+STORE_LOCAL = 2
+LOAD_GLOBAL = 3
+STORE_GLOBAL = 4
+ADD = 5
+SUB = 6
+MUL = 7
+DIV = 8
+MOD = 9
+POW = 10
+EQ = 11
+NE = 12
+LT = 13
+GT = 14
+LE = 15
+GE = 16
+NEG = 17
+NOT = 18
+POP = 19
+DUP = 20
+JUMP = 21
+JUMP_IF_FALSE = 22
+JUMP_IF_TRUE = 23
+JUMP_IF_FALSE_OR_POP = 24
+JUMP_IF_TRUE_OR_POP = 25
+CALL = 26
+RETURN = 27
+READ = 28
+PRINT = 29
+HALT = 30
+# superinstructions: LOAD_CONST + arithmetic, comparison + conditional jump
+ADD_CONST = 31
+SUB_CONST = 32
+MUL_CONST = 33
+JUMP_IF_EQ = 34
+JUMP_IF_NE = 35
+JUMP_IF_LT = 36
+JUMP_IF_GT = 37
+JUMP_IF_LE = 38
+JUMP_IF_GE = 39
+
+OPNAMES = [
+    'LOAD_LOCAL', 'LOAD_CONST', 'STORE_LOCAL', 'LOAD_GLOBAL', 'STORE_GLOBAL',
+    'ADD', 'SUB', 'MUL', 'DIV', 'MOD', 'POW',
+    'EQ', 'NE', 'LT', 'GT', 'LE', 'GE', 'NEG', 'NOT', 'POP', 'DUP',
+    'JUMP', 'JUMP_IF_FALSE', 'JUMP_IF_TRUE', 'JUMP_IF_FALSE_OR_POP', 'JUMP_IF_TRUE_OR_POP',
+    'CALL', 'RETURN', 'READ', 'PRINT', 'HALT',
+    'ADD_CONST', 'SUB_CONST', 'MUL_CONST',
+    'JUMP_IF_EQ', 'JUMP_IF_NE', 'JUMP_IF_LT', 'JUMP_IF_GT', 'JUMP_IF_LE', 'JUMP_IF_GE',
+]
+
+BINARY_OPS = {
+    '+': ADD, '-': SUB, '*': MUL, '/': DIV, '%': MOD, '**': POW,
+    '==': EQ, '!=': NE, '<': LT, '>': GT, '<=': LE, '>=': GE,
+}
+
+CONST_OPS = {ADD: ADD_CONST, SUB: SUB_CONST, MUL: MUL_CONST}
+
+# comparison -> (jump if it holds, jump if it does not)
+COMPARE_JUMPS = {
+    '==': (JUMP_IF_EQ, JUMP_IF_NE), '!=': (JUMP_IF_NE, JUMP_IF_EQ),
+    '<': (JUMP_IF_LT, JUMP_IF_GE), '>=': (JUMP_IF_GE, JUMP_IF_LT),
+    '>': (JUMP_IF_GT, JUMP_IF_LE), '<=': (JUMP_IF_LE, JUMP_IF_GT),
+}
+
+class CodeObject:
+    __slots__ = ('name', 'rtype', 'nparams', 'local_init', 'code', 'consts')
+
+    def __init__(self, name, rtype, nparams):
+        self.name = name
+        self.rtype = rtype
+        self.nparams = nparams
+        self.local_init = []
+        self.code = array('i')
+        self.consts = []
+
+class Program:
+    # main runs with the globals as its local slots
+    def __init__(self, name, main, functions):
+        self.name = name
+        self.main = main
+        self.functions = functions
+
+_ARG_OPS = (LOAD_LOCAL, STORE_LOCAL, LOAD_GLOBAL, STORE_GLOBAL, CALL, PRINT,
+            JUMP, JUMP_IF_FALSE, JUMP_IF_TRUE, JUMP_IF_FALSE_OR_POP, JUMP_IF_TRUE_OR_POP,
+            JUMP_IF_EQ, JUMP_IF_NE, JUMP_IF_LT, JUMP_IF_GT, JUMP_IF_LE, JUMP_IF_GE)
+
+def disassemble(co):
+    lines = [f"{co.name}:"]
+    code = co.code
+    for pc in range(0, len(code), 2):
+        op, arg = code[pc], code[pc + 1]
+        text = f"{pc:6d} {OPNAMES[op]:<22}"
+        if op in (LOAD_CONST, ADD_CONST, SUB_CONST, MUL_CONST):
+            text += f"{arg} ({co.consts[arg]!r})"
+        elif op in _ARG_OPS:
+            text += str(arg)
+        lines.append(text.rstrip())
+    return '\n'.join(lines)
+
+# ---------------- Compiler: AST -> code objects -------------------------
+
+class _CodeGen:
+    def __init__(self, compiler, co, scope):
+        self.compiler = compiler
+        self.co = co
+        self.scope = scope    # uptscope.Scope of the code, names are resolved in it
+        self.const_index = {}
+        self.loops = []    # one list of pending break jumps per enclosing loop
+        self.last_label = -1
+
+    def emit(self, op, arg=0):
+        code = self.co.code
+        code.append(op)
+        code.append(arg)
+        return len(code) - 2
+
+    def patch(self, at, target):
+        self.co.code[at + 1] = target
+
+    def label(self):
+        # a jump target, instructions must not be fused across it
+        self.last_label = len(self.co.code)
+        return self.last_label
+
+    def emit_binary(self, op):
+        code = self.co.code
+        if op in CONST_OPS and len(code) >= 2 and code[-2] == LOAD_CONST and self.last_label != len(code):
+            code[-2] = CONST_OPS[op]
+        else:
+            self.emit(op)
+
+    def cond_jump(self, e, when, target=0):
+        # jump to target when e evaluates to `when`, comparisons fuse into one instruction
+        while expr_kind(e) == 'Group':
+            e = e.expr
+        if expr_kind(e) == 'BinOp' and e.op in COMPARE_JUMPS:
+            self.expr(e.left)
+            self.expr(e.right)
+            return self.emit(COMPARE_JUMPS[e.op][0 if when else 1], target)
+        self.expr(e)
+        return self.emit(JUMP_IF_TRUE if when else JUMP_IF_FALSE, target)
+
+    def const(self, value):
+        key = (type(value), value)
+        if key not in self.const_index:
+            self.const_index[key] = len(self.co.consts)
+            self.co.consts.append(value)
+        return self.emit(LOAD_CONST, self.const_index[key])
+
+    def new_local(self, value):
+        if self.co.name == '<main>':
+            return self.compiler.new_global(value)
+        self.co.local_init.append(value)
+        return len(self.co.local_init) - 1
+
+    def load(self, name):
+        symbol = self.scope.uses[name]
+        self.emit(LOAD_LOCAL if symbol.depth == self.scope.depth else LOAD_GLOBAL, symbol.slot)
+
+    def store(self, name):
+        symbol = self.scope.uses[name]
+        self.emit(STORE_LOCAL if symbol.depth == self.scope.depth else STORE_GLOBAL, symbol.slot)
+
+    # ---- commands ----
+
+    def cmd(self, node):
+        tag = node.tag
+        if tag == 'CmdAtrib':
+            self.expr_stmt(node.expr)
+        elif tag == 'CmdSeq':
+            for cmd in node.cmds:
+                self.cmd(cmd)
+        elif tag == 'CmdIf':
+            jump_else = self.cond_jump(node.cond, False)
+            self.cmd(node.then)
+            if node.orelse is not None:
+                jump_end = self.emit(JUMP)
+                self.patch(jump_else, self.label())
+                self.cmd(node.orelse)
+                self.patch(jump_end, self.label())
+            else:
+                self.patch(jump_else, self.label())
+        elif tag == 'CmdWhile':
+            # the condition is placed after the body so each iteration runs one jump
+            jump_cond = self.emit(JUMP)
+            body = self.label()
+            self.loops.append([])
+            self.cmd(node.body)
+            self.patch(jump_cond, self.label())
+            self.cond_jump(node.cond, True, body)
+            self.end_loop()
+        elif tag == 'CmdFor':
+            init = node.init
+            self.expr_stmt(init)
+            var = init.left if is_assign(init) else init
+            if expr_kind(var) != 'ID':
+                raise Exception("Semantic error: for loop needs a variable")
+            limit = self.new_local(0)
+            self.expr(node.limit)
+            self.emit(STORE_LOCAL, limit)
+            jump_cond = self.emit(JUMP)
+            body = self.label()
+            self.loops.append([])
+            self.cmd(node.body)
+            self.load(var)
+            self.const(1)
+            self.emit_binary(ADD)
+            self.store(var)
+            self.patch(jump_cond, self.label())
+            self.load(var)
+            self.emit(LOAD_LOCAL, limit)
+            self.emit(JUMP_IF_LE, body)
+            self.end_loop()
+        elif tag == 'CmdBreak':
+            if not self.loops:
+                raise Exception("Semantic error: break outside of a loop")
+            self.loops[-1].append(self.emit(JUMP))
+        elif tag == 'CmdPrint':
+            exprs = node.args
+            for e in exprs:
+                self.expr(e)
+            self.emit(PRINT, len(exprs))
+        elif tag == 'CmdReturn':
+            self.expr(node.value)
+            self.emit(HALT if self.co.name == '<main>' else RETURN)
+        else:
+            raise Exception(f"Unknown command '{tag}'")
+
+    def end_loop(self):
+        end = self.label()
+        for at in self.loops.pop():
+            self.patch(at, end)
+
+    def expr_stmt(self, e):
+        kind = expr_kind(e)
+        if kind == 'BinOp' and e.op == '=':
+            self.assign(e)
+        elif kind in ('BinOp', 'UnOp', 'Group', 'FunctionCall', 'Read'):
+            self.expr(e)
+            self.emit(POP)
+
+    def assign(self, e):
+        if expr_kind(e.left) != 'ID':
+            raise Exception("Semantic error: Invalid assignment target")
+        self.expr(e.right)
+        self.store(e.left)
+
+    # ---- expressions ----
+
+    def expr(self, e):
+        # iterative, a chain of thousands of operators nests as deep: the
+        # stack holds the expressions left to compile and, between them,
+        # (method, args...) to call once the operands before are compiled
+        stack = [e]
+        while stack:
+            e = stack.pop()
+            if type(e) is tuple:
+                e[0](*e[1:])
+                continue
+            kind = expr_kind(e)
+            if kind == 'INT':
+                self.const(e)
+            elif kind == 'BOOL':
+                self.const(e == 'true')
+            elif kind == 'ID':
+                self.load(e)
+            elif kind == 'Read':
+                self.emit(READ)
+            elif kind == 'BinOp':
+                op = e.op
+                if op == '=':
+                    if expr_kind(e.left) != 'ID':
+                        raise Exception("Semantic error: Invalid assignment target")
+                    stack += ((self.load, e.left), (self.store, e.left), e.right)
+                elif op == 'and' or op == 'or':
+                    jump = []
+                    op = JUMP_IF_FALSE_OR_POP if op == 'and' else JUMP_IF_TRUE_OR_POP
+                    stack += ((self.patch_pending, jump), e.right, (self.emit_pending, op, jump), e.left)
+                else:
+                    stack += ((self.emit_binary, BINARY_OPS[op]), e.right, e.left)
+            elif kind == 'UnOp':
+                if e.op == '-' and expr_kind(e.operand) == 'INT':
+                    self.const(-e.operand)
+                else:
+                    stack += ((self.emit, NEG if e.op == '-' else NOT), e.operand)
+            elif kind == 'Group':
+                stack.append(e.expr)
+            elif kind == 'FunctionCall':
+                index, callee = self.compiler.function(e.name)
+                args = e.args
+                if len(args) != callee.nparams:
+                    raise Exception(f"Semantic error: Function '{e.name}' expects {callee.nparams} arguments, got {len(args)}")
+                stack.append((self.emit, CALL, index))
+                stack.extend(reversed(args))
+            else:
+                raise Exception(f"Unknown expression '{kind}'")
+
+    def emit_pending(self, op, pending):
+        # a jump whose target patch_pending sets once it is known
+        pending.append(self.emit(op))
+
+    def patch_pending(self, pending):
+        self.patch(pending[0], self.label())
+
+class Compiler:
+    def __init__(self):
+        self.main = CodeObject('<main>', 'void', 0)
+        self.functions = []
+        self.function_index = {}
+
+    def new_global(self, value):
+        self.main.local_init.append(value)
+        return len(self.main.local_init) - 1
+
+    def function(self, name):
+        if name not in self.function_index:
+            raise Exception(f"Symbol '{name}' not declared")
+        index = self.function_index[name]
+        return index, self.functions[index]
+
+    def compile(self, ast):
+        # the slots of the resolved scopes are the frame layouts: main runs
+        # on the global frame, every function on a copy of its local_init
+        resolution = resolve(ast)
+        for symbol in resolution.globals.variables:
+            self.new_global(default_value(symbol.type))
+        for symbol in resolution.globals.functions:
+            self.function_index[symbol.name] = symbol.slot
+            self.functions.append(CodeObject(symbol.name, symbol.type, len(symbol.params)))
+
+        for co, fn, scope in zip(self.functions, ast.funcs, resolution.scopes):
+            co.local_init = [default_value(symbol.type) for symbol in scope.variables]
+            gen = _CodeGen(self, co, scope)
+            for cmd in fn.body:
+                gen.cmd(cmd)
+            gen.const(default_value(co.rtype))
+            gen.emit(RETURN)
+
+        gen = _CodeGen(self, self.main, resolution.globals)
+        gen.cmd(ast.main)
+        gen.emit(HALT)
+        return Program(ast.name, self.main, self.functions)
+
+def compile_program(ast):
+    return Compiler().compile(ast)
+
+# ---------------- Virtual machine -------------------------
+
+def run(program, inputs=None, out=None, memo=None):
+    # memo: a uptpure.MemoTable for the program, calls to its pure
+    # functions are looked up in it first
+    read = make_reader(inputs)
+    print_values = make_printer(out)
+    functions = program.functions
+    main = program.main
+    global_vars = list(main.local_init)
+    # code stays a compact array('i'), lists are faster to index in the loop
+    codes = [co.code.tolist() for co in functions]
+
+    code = main.code.tolist()
+    consts = main.consts
+    frame = global_vars
+    frames = []
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    pc = 0
+    # per function its uptpure.Memo, None if not memoized; pending holds
+    # (len(frames) at the call, memo, args) per memoized call running, its
+    # result is stored when the RETURN that brings frames back to it runs
+    memos = None if memo is None else [memo.get(co.name) for co in functions]
+    pending = []
+
+    # the chain is ordered roughly by how often each opcode runs in loops
+    while True:
+        op = code[pc]
+        arg = code[pc + 1]
+        pc += 2
+        if op == LOAD_LOCAL:
+            push(frame[arg])
+        elif op == LOAD_CONST:
+            push(consts[arg])
+        elif op == STORE_LOCAL:
+            frame[arg] = pop()
+        elif op == LOAD_GLOBAL:
+            push(global_vars[arg])
+        elif op == STORE_GLOBAL:
+            global_vars[arg] = pop()
+        elif op == ADD:
+            b = pop()
+            stack[-1] += b
+        elif op == SUB:
+            b = pop()
+            stack[-1] -= b
+        elif op == MUL:
+            b = pop()
+            stack[-1] *= b
+        elif op == ADD_CONST:
+            stack[-1] += consts[arg]
+        elif op == SUB_CONST:
+            stack[-1] -= consts[arg]
+        elif op == MUL_CONST:
+            stack[-1] *= consts[arg]
+        elif op >= JUMP_IF_EQ:
+            b = pop()
+            a = pop()
+            if op == JUMP_IF_LE:
+                if a <= b:
+                    pc = arg
+            elif op == JUMP_IF_LT:
+                if a < b:
+                    pc = arg
+            elif op == JUMP_IF_GT:
+                if a > b:
+                    pc = arg
+            elif op == JUMP_IF_GE:
+                if a >= b:
+                    pc = arg
+            elif op == JUMP_IF_EQ:
+                if a == b:
+                    pc = arg
+            elif a != b:
+                pc = arg
+        elif op == JUMP_IF_TRUE:
+            if pop():
+                pc = arg
+        elif op == JUMP_IF_FALSE:
+            if not pop():
+                pc = arg
+        elif op == JUMP:
+            pc = arg
+        elif op <= GE:
+            b = pop()
+            a = stack[-1]
+            if op == LE:
+                stack[-1] = a <= b
+            elif op == LT:
+                stack[-1] = a < b
+            elif op == GT:
+                stack[-1] = a > b
+            elif op == GE:
+                stack[-1] = a >= b
+            elif op == EQ:
+                stack[-1] = a == b
+            elif op == NE:
+                stack[-1] = a != b
+            elif op == DIV:
+                stack[-1] = int_div(a, b)
+            elif op == MOD:
+                stack[-1] = int_mod(a, b)
+            else:
+                stack[-1] = int_pow(a, b)
+        elif op == CALL:
+            callee = functions[arg]
+            n = callee.nparams
+            if memos is not None and memos[arg] is not None:
+                args = tuple(stack[-n:]) if n else ()
+                value = memos[arg].lookup(args)
+                if value is not MISSING:
+                    if n:
+                        del stack[-n:]
+                    push(value)
+                    continue
+                pending.append((len(frames), memos[arg], args))
+            frames.append((code, consts, pc, frame))
+            frame = callee.local_init[:]
+            if n:
+                frame[:n] = stack[-n:]
+                del stack[-n:]
+            code = codes[arg]
+            consts = callee.consts
+            pc = 0
+        elif op == RETURN:
+            # the return value stays on top of the shared stack
+            code, consts, pc, frame = frames.pop()
+            if pending and pending[-1][0] == len(frames):
+                _, callee_memo, args = pending.pop()
+                callee_memo.store(args, stack[-1])
+        elif op == POP:
+            pop()
+        elif op == JUMP_IF_FALSE_OR_POP:
+            if stack[-1]:
+                pop()
+            else:
+                pc = arg
+        elif op == JUMP_IF_TRUE_OR_POP:
+            if stack[-1]:
+                pc = arg
+            else:
+                pop()
+        elif op == NEG:
+            stack[-1] = -stack[-1]
+        elif op == NOT:
+            stack[-1] = not stack[-1]
+        elif op == READ:
+            push(read())
+        elif op == PRINT:
+            if arg:
+                values = stack[-arg:]
+                del stack[-arg:]
+            else:
+                values = []
+            print_values(values)
+        elif op == DUP:
+            push(stack[-1])
+        elif op == HALT:
+            return global_vars
+        else:
+            raise Exception(f"Bad opcode {op}")
+
+def execute(ast, inputs=None, out=None, memo=None):
+    return run(compile_program(ast), inputs, out, memo)